@@ -0,0 +1,206 @@
+"""
+Embedding Batch Scheduler
+
+Size-aware batching for document embedding. Transformer encoders pad every
+text in a batch to the longest one, so mixing 500- and 2000-character
+hierarchical chunks in one batch wastes most of the compute on padding.
+
+The scheduler:
+1. Measures each text in tokens (model tokenizer, or a character estimate)
+2. Sorts texts by length so each batch holds similarly sized texts
+3. Cuts batches by a padded-token budget (batch_size × longest text)
+4. Restores the caller's original order in the output
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio for WordPiece/BPE tokenizers on prose
+_CHARS_PER_TOKEN = 4
+
+
+class EmbeddingBatchScheduler:
+    """
+    Token-budgeted, length-sorted batching with throughput metrics
+
+    Usage:
+        >>> scheduler = EmbeddingBatchScheduler(token_budget=8192, max_batch_size=64)
+        >>> vectors = scheduler.run(texts, encode_batch, count_tokens)
+        >>> scheduler.get_stats()["padding_ratio"]
+    """
+
+    def __init__(
+        self,
+        token_budget: int,
+        max_batch_size: int,
+        max_seq_length: Optional[int] = None
+    ):
+        """
+        Initialize Embedding Batch Scheduler
+
+        Args:
+            token_budget: Max padded tokens per batch (batch size × longest text)
+            max_batch_size: Max texts per batch regardless of length
+            max_seq_length: Model truncation length (caps measured lengths)
+        """
+        self.token_budget = token_budget
+        self.max_batch_size = max_batch_size
+        self.max_seq_length = max_seq_length
+
+        self._lock = threading.Lock()
+        self._stats = {
+            "texts": 0,
+            "batches": 0,
+            "tokens": 0,
+            "padded_tokens": 0,
+            "encode_seconds": 0.0
+        }
+
+    def measure(
+        self,
+        texts: List[str],
+        count_tokens: Optional[Callable[[List[str]], List[int]]] = None
+    ) -> List[int]:
+        """
+        Token length of each text (truncated to max_seq_length)
+
+        Args:
+            texts: Texts to measure
+            count_tokens: Tokenizer-backed counter; falls back to a
+                character-based estimate when missing or failing
+
+        Returns:
+            Token count per text
+        """
+        lengths = None
+        if count_tokens is not None:
+            try:
+                lengths = count_tokens(texts)
+            except Exception as e:
+                logger.debug(f"Tokenizer length count failed, estimating: {str(e)}")
+
+        if lengths is None:
+            lengths = [max(1, len(text) // _CHARS_PER_TOKEN) for text in texts]
+
+        if self.max_seq_length:
+            lengths = [min(length, self.max_seq_length) for length in lengths]
+
+        return lengths
+
+    def plan(self, lengths: List[int]) -> List[List[int]]:
+        """
+        Group text indices into length-sorted, token-budgeted batches
+
+        Args:
+            lengths: Token count per text
+
+        Returns:
+            List of batches, each a list of indices into the input
+        """
+        # Longest first: the first batch fails fast if the budget is too small
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+
+        batches: List[List[int]] = []
+        current: List[int] = []
+        longest = 0
+
+        for index in order:
+            length = lengths[index]
+            padded = max(longest, length) * (len(current) + 1)
+
+            if current and (padded > self.token_budget or len(current) >= self.max_batch_size):
+                batches.append(current)
+                current, longest = [], 0
+
+            current.append(index)
+            longest = max(longest, length)
+
+        if current:
+            batches.append(current)
+
+        return batches
+
+    def run(
+        self,
+        texts: List[str],
+        encode_batch: Callable[[List[str]], List[Any]],
+        count_tokens: Optional[Callable[[List[str]], List[int]]] = None
+    ) -> List[Any]:
+        """
+        Embed texts in scheduled batches and return vectors in input order
+
+        Args:
+            texts: Texts to embed
+            encode_batch: Encodes one batch, returning one vector per text
+            count_tokens: Optional tokenizer-backed length counter
+
+        Returns:
+            Embedding vectors aligned with texts
+        """
+        if not texts:
+            return []
+
+        lengths = self.measure(texts, count_tokens)
+        results: List[Any] = [None] * len(texts)
+
+        for batch in self.plan(lengths):
+            started = time.perf_counter()
+            vectors = encode_batch([texts[i] for i in batch])
+            elapsed = time.perf_counter() - started
+
+            for index, vector in zip(batch, vectors):
+                results[index] = vector
+
+            batch_lengths = [lengths[i] for i in batch]
+            self._record(
+                texts=len(batch),
+                tokens=sum(batch_lengths),
+                padded_tokens=max(batch_lengths) * len(batch),
+                seconds=elapsed
+            )
+
+        return results
+
+    def _record(self, texts: int, tokens: int, padded_tokens: int, seconds: float):
+        """Accumulate metrics for one encoded batch"""
+        with self._lock:
+            self._stats["texts"] += texts
+            self._stats["batches"] += 1
+            self._stats["tokens"] += tokens
+            self._stats["padded_tokens"] += padded_tokens
+            self._stats["encode_seconds"] += seconds
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Throughput and padding metrics since startup (or last reset)
+
+        Returns:
+            Dict with texts, batches, tokens, padded_tokens, encode_seconds,
+            texts_per_second, tokens_per_second, avg_batch_size and
+            padding_ratio (share of encoded tokens that were padding)
+        """
+        with self._lock:
+            stats = dict(self._stats)
+
+        seconds = stats["encode_seconds"]
+        stats["encode_seconds"] = round(seconds, 3)
+        stats["texts_per_second"] = round(stats["texts"] / seconds, 2) if seconds else 0.0
+        stats["tokens_per_second"] = round(stats["tokens"] / seconds, 2) if seconds else 0.0
+        stats["avg_batch_size"] = (
+            round(stats["texts"] / stats["batches"], 2) if stats["batches"] else 0.0
+        )
+        stats["padding_ratio"] = (
+            round(1 - stats["tokens"] / stats["padded_tokens"], 4)
+            if stats["padded_tokens"] else 0.0
+        )
+        return stats
+
+    def reset_stats(self):
+        """Reset accumulated metrics"""
+        with self._lock:
+            for key in self._stats:
+                self._stats[key] = 0.0 if key == "encode_seconds" else 0
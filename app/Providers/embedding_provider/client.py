@@ -6,13 +6,19 @@ Converts text chunks and queries into dense vectors for similarity search.
 """
 
 import logging
-from typing import List, Optional, Union
+from typing import List, Optional, Union, Dict, Any
 import os
 
+from langchain.embeddings.base import Embeddings
+
+from app.Providers.embedding_provider.batching import EmbeddingBatchScheduler
+from app.Providers.embedding_provider.disk_cache import DiskEmbeddingCache
+from app.Providers.embedding_provider.coalescer import QueryEmbeddingCoalescer
+
 logger = logging.getLogger(__name__)
 
 
-class EmbeddingProvider:
+class EmbeddingProvider(Embeddings):
     """
     Embedding Provider for text vectorization
 
@@ -20,6 +26,9 @@ class EmbeddingProvider:
     - SentenceTransformer models (recommended)
     - HuggingFace embedding models
     - Local model loading for offline/airgapped environments
+
+    Implements LangChain's Embeddings interface, so vector stores can embed
+    through the provider (and its batching) instead of the raw model.
     """
 
     def __init__(
@@ -49,6 +58,24 @@ class EmbeddingProvider:
         self._model = None  # Lazy loading
         self._initialized = False
 
+        # Length-sorted, token-budgeted batching for embed_documents
+        self.batch_scheduler = EmbeddingBatchScheduler(
+            token_budget=settings.EMBEDDING_BATCH_TOKEN_BUDGET,
+            max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE
+        )
+
+        # On-disk embedding cache (opened once the loaded model is known)
+        self.cache_enabled = settings.EMBEDDING_CACHE_ENABLED
+        self.active_model_name: Optional[str] = None
+        self.disk_cache: Optional[DiskEmbeddingCache] = None
+
+        # Single-flight + micro-batching for concurrent query embeddings
+        self.query_coalescer = QueryEmbeddingCoalescer(
+            encode_batch=self.embed_queries,
+            window_ms=settings.QUERY_EMBED_BATCH_WINDOW_MS,
+            max_batch=settings.QUERY_EMBED_MAX_BATCH
+        )
+
         logger.info(f"Embedding Provider configured with model: {self.model_name}")
 
     def _lazy_load_model(self):
@@ -75,6 +102,7 @@ class EmbeddingProvider:
                 encode_kwargs=self.encode_kwargs,
             )
             self._initialized = True
+            self.active_model_name = self.model_name
             logger.info(f"Successfully loaded embedding model: {self.model_name}")
 
         except Exception as e:
@@ -92,6 +120,7 @@ class EmbeddingProvider:
                         encode_kwargs=self.encode_kwargs,
                     )
                     self._initialized = True
+                    self.active_model_name = self.fallback_model
                     logger.info(f"Successfully loaded fallback model: {self.fallback_model}")
                 except Exception as fallback_error:
                     logger.error(f"Fallback model also failed: {str(fallback_error)}")
@@ -106,10 +135,66 @@ class EmbeddingProvider:
                     f"Set EMBEDDING_MODEL to a local path or ensure network access to Hugging Face Hub."
                 ) from e
 
+        # Measured lengths beyond the model's truncation length are not encoded
+        client = getattr(self._model, "client", None)
+        self.batch_scheduler.max_seq_length = getattr(client, "max_seq_length", None)
+
+        if self.cache_enabled:
+            self._open_disk_cache()
+
+    def _open_disk_cache(self):
+        """Open the on-disk embedding cache for the loaded model configuration"""
+        from app.core.config import settings
+
+        namespace = f"{self.active_model_name}|{sorted(self.encode_kwargs.items())}"
+        try:
+            self.disk_cache = DiskEmbeddingCache(
+                cache_dir=settings.EMBEDDING_CACHE_DIR,
+                namespace=namespace,
+                max_rows=settings.EMBEDDING_CACHE_MAX_ROWS
+            )
+        except Exception as e:
+            # Caching is an optimization: embed without it rather than fail
+            logger.warning(f"Embedding cache unavailable, continuing without it: {str(e)}")
+            self.disk_cache = None
+
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        """Token length of each text using the model's own tokenizer"""
+        client = self._model.client
+        encoded = client.tokenizer(
+            texts,
+            add_special_tokens=True,
+            truncation=True,
+            max_length=client.max_seq_length
+        )
+        return [len(ids) for ids in encoded["input_ids"]]
+
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Encode one scheduled batch in a single forward pass
+
+        Mirrors HuggingFaceEmbeddings.embed_documents (newline handling,
+        encode_kwargs) but pins batch_size to the scheduled batch so the
+        encoder does not re-split it.
+        """
+        client = getattr(self._model, "client", None)
+        if client is None or not hasattr(client, "encode"):
+            return self._model.embed_documents(texts)
+
+        texts = [text.replace("\n", " ") for text in texts]
+        encode_kwargs = {**self._model.encode_kwargs, "batch_size": len(texts)}
+        return client.encode(texts, **encode_kwargs).tolist()
+
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """
         Embed multiple text documents
 
+        Vectors already in the on-disk cache are reused. Remaining texts are
+        de-duplicated, sorted by token length and encoded in token-budgeted
+        batches (EMBEDDING_BATCH_TOKEN_BUDGET, EMBEDDING_MAX_BATCH_SIZE) so
+        short chunks are not padded to the length of long ones. Vectors are
+        returned in the input order.
+
         Args:
             texts: List of text strings to embed
 
@@ -123,7 +208,32 @@ class EmbeddingProvider:
             >>> len(embeddings[0])  # 384 (model-dependent)
         """
         self._lazy_load_model()
-        return self._model.embed_documents(texts)
+
+        if self.disk_cache is None:
+            return self.batch_scheduler.run(texts, self._encode_batch, self._count_tokens)
+
+        try:
+            cached = self.disk_cache.get_many(texts)
+        except Exception as e:
+            logger.warning(f"Failed to read embedding cache: {str(e)}")
+            cached = [None] * len(texts)
+        missing = list(dict.fromkeys(
+            text for text, vector in zip(texts, cached) if vector is None
+        ))
+
+        computed: Dict[str, List[float]] = {}
+        if missing:
+            vectors = self.batch_scheduler.run(missing, self._encode_batch, self._count_tokens)
+            computed = dict(zip(missing, vectors))
+            try:
+                self.disk_cache.put_many(missing, vectors)
+            except Exception as e:
+                logger.warning(f"Failed to write embedding cache: {str(e)}")
+
+        return [
+            vector.tolist() if vector is not None else computed[text]
+            for text, vector in zip(texts, cached)
+        ]
 
     def embed_query(self, text: str) -> List[float]:
         """
@@ -142,6 +252,60 @@ class EmbeddingProvider:
         self._lazy_load_model()
         return self._model.embed_query(text)
 
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed several query texts in one encoder call
+
+        Args:
+            texts: Query strings to embed
+
+        Returns:
+            Embedding vectors aligned with texts
+        """
+        self._lazy_load_model()
+        return self._encode_batch(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """
+        Embed a query without blocking the event loop, coalescing concurrent calls
+
+        Identical in-flight queries share one computation; distinct queries
+        arriving within QUERY_EMBED_BATCH_WINDOW_MS are encoded together.
+
+        Args:
+            text: Query string to embed
+
+        Returns:
+            Embedding vector (list of floats)
+
+        Example:
+            >>> vectors = await asyncio.gather(*(provider.aembed_query(q) for q in questions))
+        """
+        return await self.query_coalescer.embed(text)
+
+    def get_batching_stats(self) -> Dict[str, Any]:
+        """
+        Document embedding throughput and padding metrics
+
+        Returns:
+            Dict with texts, batches, tokens, padded_tokens, encode_seconds,
+            texts_per_second, tokens_per_second, avg_batch_size, padding_ratio
+
+        Example:
+            >>> stats = provider.get_batching_stats()
+            >>> print(f"{stats['texts_per_second']} texts/s, padding {stats['padding_ratio']:.0%}")
+        """
+        return self.batch_scheduler.get_stats()
+
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        On-disk embedding cache statistics
+
+        Returns:
+            Dict with rows, hits, misses, hit_rate, size_bytes (None if disabled)
+        """
+        return self.disk_cache.get_stats() if self.disk_cache is not None else None
+
     def get_underlying_model(self):
         """
         Get the underlying HuggingFaceEmbeddings model instance
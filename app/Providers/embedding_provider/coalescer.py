@@ -0,0 +1,140 @@
+"""
+Query Embedding Coalescer
+
+In-process request coalescing for query embeddings on the chat path:
+
+- Single-flight: concurrent requests for the same query text share one
+  pending computation instead of encoding it again.
+- Micro-batching: distinct queries arriving within a short window
+  (QUERY_EMBED_BATCH_WINDOW_MS) are encoded together in one encoder call,
+  flushed early once QUERY_EMBED_MAX_BATCH queries are waiting.
+
+Encoding runs off the event loop, so chat streams keep flowing while a
+batch is being embedded.
+"""
+
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEmbeddingCoalescer:
+    """
+    Single-flight + micro-batching front end for query embeddings
+
+    Usage:
+        >>> coalescer = QueryEmbeddingCoalescer(provider.embed_queries, window_ms=5, max_batch=32)
+        >>> vector = await coalescer.embed("What is RAG?")
+    """
+
+    def __init__(
+        self,
+        encode_batch: Callable[[List[str]], List[List[float]]],
+        window_ms: float,
+        max_batch: int
+    ):
+        """
+        Initialize Query Embedding Coalescer
+
+        Args:
+            encode_batch: Blocking function embedding a list of queries
+            window_ms: How long the first query of a batch waits for company
+            max_batch: Flush immediately once this many distinct queries wait
+        """
+        self.encode_batch = encode_batch
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+
+        # Query text → future shared by every waiter (pending or encoding)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Distinct queries waiting for the next flush, in arrival order
+        self._pending: List[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Running encode tasks (the loop only keeps weak references)
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.stats = {
+            "requests": 0,
+            "coalesced": 0,
+            "batches": 0,
+            "encoded": 0
+        }
+
+    async def embed(self, text: str) -> List[float]:
+        """
+        Embed a query, sharing work with concurrent identical and nearby queries
+
+        Args:
+            text: Query text
+
+        Returns:
+            Embedding vector
+        """
+        self.stats["requests"] += 1
+
+        future = self._inflight.get(text)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[text] = future
+        self._pending.append(text)
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        # Shield: one cancelled waiter must not cancel the shared result
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        """Hand the pending queries to one encoder call"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._encode(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _encode(self, batch: List[str]):
+        """Encode a batch off the event loop and resolve its futures"""
+        loop = asyncio.get_running_loop()
+        self.stats["batches"] += 1
+        self.stats["encoded"] += len(batch)
+
+        try:
+            vectors = await loop.run_in_executor(None, self.encode_batch, batch)
+        except Exception as e:
+            logger.error(f"Query embedding batch failed ({len(batch)} queries): {str(e)}")
+            for text in batch:
+                future = self._inflight.pop(text, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        for text, vector in zip(batch, vectors):
+            future = self._inflight.pop(text, None)
+            if future is not None and not future.done():
+                future.set_result(vector)
+
+    def get_stats(self):
+        """
+        Coalescing statistics
+
+        Returns:
+            Dict with requests, coalesced (shared in-flight), batches,
+            encoded and avg_batch_size
+        """
+        stats = dict(self.stats)
+        stats["avg_batch_size"] = (
+            round(stats["encoded"] / stats["batches"], 2) if stats["batches"] else 0.0
+        )
+        return stats
@@ -0,0 +1,358 @@
+"""
+Disk Embedding Cache
+
+Local, persistent embedding cache consulted by EmbeddingProvider before
+encoding. Works without Redis (air-gapped deployments).
+
+Layout (one pair of files per model configuration, under EMBEDDING_CACHE_DIR):
+- {namespace}.f32: float32 rows in a numpy memmap (row = one vector)
+- {namespace}.sqlite: index mapping SHA256(text) → row slot, with an
+  access tick per row for LRU eviction
+
+The namespace is derived from the model name and encode settings, so the
+effective key is (model configuration, text hash). When the cache holds
+EMBEDDING_CACHE_MAX_ROWS rows, the least recently used rows are overwritten.
+
+Several processes (uvicorn workers) may share the files: writes hold an
+exclusive flock on {namespace}.lock across slot allocation, the vector
+write and the index update; reads hold a shared one.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking (single worker only)
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Rows added per file growth step (the memmap is grown, not preallocated)
+_GROWTH_ROWS = 4096
+
+# SQLite host parameter limit safety margin for IN (...) lookups
+_LOOKUP_BATCH = 500
+
+
+class DiskEmbeddingCache:
+    """
+    Memory-mapped float32 embedding cache with SQLite index and LRU eviction
+
+    Thread-safe (embedding runs on the ingestion embedding pool) and safe to
+    share between processes.
+
+    Usage:
+        >>> cache = DiskEmbeddingCache("data/embedding_cache", "all-MiniLM-L6-v2", max_rows=200_000)
+        >>> vectors = cache.get_many(texts)      # None for misses
+        >>> cache.put_many(missed_texts, new_vectors)
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        namespace: str,
+        max_rows: int
+    ):
+        """
+        Initialize Disk Embedding Cache
+
+        Args:
+            cache_dir: Directory holding cache files
+            namespace: Model configuration identifier (model name, encode settings)
+            max_rows: Maximum cached vectors before LRU eviction
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.namespace = namespace
+        self.max_rows = max_rows
+
+        slug = hashlib.sha256(namespace.encode("utf-8")).hexdigest()[:16]
+        self.vectors_path = self.cache_dir / f"{slug}.f32"
+        self.index_path = self.cache_dir / f"{slug}.sqlite"
+        self._lock_file = (self.cache_dir / f"{slug}.lock").open("a+b")
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_index()
+
+        self.dimension: Optional[int] = self._get_meta("dimension", int)
+        self._capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        if self.dimension:
+            self._open_vectors()
+
+        # Monotonic access counter (persisted implicitly as max(last_access))
+        row = self._conn.execute("SELECT COALESCE(MAX(last_access), 0) FROM embeddings").fetchone()
+        self._tick = row[0]
+
+        self.hits = 0
+        self.misses = 0
+
+        logger.info(
+            f"Disk embedding cache opened: {self.index_path} "
+            f"(namespace={namespace}, rows={self._row_count()}, max_rows={max_rows})"
+        )
+
+    # =========================================================================
+    # Storage Setup
+    # =========================================================================
+
+    def _init_index(self):
+        """Create index tables if they don't exist"""
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                text_hash TEXT PRIMARY KEY,
+                slot INTEGER NOT NULL UNIQUE,
+                last_access INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_embeddings_last_access
+            ON embeddings(last_access)
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "INSERT OR IGNORE INTO meta (key, value) VALUES ('namespace', ?)",
+            (self.namespace,)
+        )
+        self._conn.commit()
+
+    def _get_meta(self, key: str, cast=str) -> Optional[Any]:
+        """Read a metadata value"""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return cast(row[0]) if row else None
+
+    def _open_vectors(self, min_rows: int = 0):
+        """Open (and grow if needed) the vector memmap to hold at least min_rows"""
+        row_bytes = self.dimension * 4
+        current_rows = self.vectors_path.stat().st_size // row_bytes if self.vectors_path.exists() else 0
+
+        capacity = max(current_rows, min(self.max_rows, max(min_rows, _GROWTH_ROWS)))
+        if capacity > current_rows:
+            with self.vectors_path.open("ab") as f:
+                f.truncate(capacity * row_bytes)
+
+        if self._vectors is not None:
+            self._vectors.flush()
+            del self._vectors
+
+        self._vectors = np.memmap(
+            self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension)
+        )
+        self._capacity = capacity
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        """Cross-process lock on the cache files (hold self._lock first)"""
+        if fcntl is None:
+            yield
+            return
+
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _sync_vectors(self):
+        """Pick up a dimension set or a memmap grown by another process"""
+        if self.dimension is None:
+            self.dimension = self._get_meta("dimension", int)
+        if self.dimension is None:
+            return
+
+        file_rows = (
+            self.vectors_path.stat().st_size // (self.dimension * 4)
+            if self.vectors_path.exists() else 0
+        )
+        if self._vectors is None or file_rows > self._capacity:
+            self._open_vectors()
+
+    def _row_count(self) -> int:
+        """Number of cached vectors"""
+        return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    # =========================================================================
+    # Cache Operations
+    # =========================================================================
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """SHA256 of the text (cache key within the namespace)"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up cached vectors
+
+        Args:
+            texts: Texts to look up
+
+        Returns:
+            List aligned with texts: float32 vector copy, or None on a miss
+        """
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        if not texts:
+            return results
+
+        hashes = [self.hash_text(text) for text in texts]
+
+        with self._lock, self._file_lock(exclusive=False):
+            self._sync_vectors()
+            if self._vectors is None:
+                self.misses += len(texts)
+                return results
+
+            slots = self._lookup_slots(list(dict.fromkeys(hashes)))
+
+            if slots:
+                self._tick += 1
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE text_hash = ?",
+                    [(self._tick, text_hash) for text_hash in slots]
+                )
+                self._conn.commit()
+
+            for i, text_hash in enumerate(hashes):
+                slot = slots.get(text_hash)
+                if slot is not None:
+                    results[i] = np.array(self._vectors[slot])
+
+        hit_count = sum(1 for vector in results if vector is not None)
+        self.hits += hit_count
+        self.misses += len(texts) - hit_count
+        return results
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """
+        Store vectors, evicting least recently used rows when full
+
+        Args:
+            texts: Texts that were embedded
+            vectors: Embedding vectors aligned with texts
+        """
+        if not texts:
+            return
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        entries = dict(zip((self.hash_text(text) for text in texts), matrix))
+
+        with self._lock, self._file_lock(exclusive=True):
+            self._sync_vectors()
+            if self.dimension is None:
+                self.dimension = matrix.shape[1]
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('dimension', ?)",
+                    (str(self.dimension),)
+                )
+                self._open_vectors()
+            elif matrix.shape[1] != self.dimension:
+                logger.warning(
+                    f"Embedding dimension {matrix.shape[1]} does not match cache "
+                    f"dimension {self.dimension}; not caching"
+                )
+                return
+
+            existing = self._lookup_slots(list(entries))
+            new_hashes = [h for h in entries if h not in existing][:self.max_rows]
+            if not new_hashes:
+                return
+
+            slots = self._allocate_slots(len(new_hashes))
+            # Other processes advance the access counter too
+            row = self._conn.execute("SELECT COALESCE(MAX(last_access), 0) FROM embeddings").fetchone()
+            self._tick = max(self._tick, row[0]) + 1
+
+            for text_hash, slot in zip(new_hashes, slots):
+                self._vectors[slot] = entries[text_hash]
+            self._vectors.flush()
+
+            self._conn.executemany(
+                "INSERT INTO embeddings (text_hash, slot, last_access) VALUES (?, ?, ?)",
+                [(text_hash, slot, self._tick) for text_hash, slot in zip(new_hashes, slots)]
+            )
+            self._conn.commit()
+
+    def _lookup_slots(self, hashes: List[str]) -> Dict[str, int]:
+        """Map cached text hashes to their row slots"""
+        slots: Dict[str, int] = {}
+        for start in range(0, len(hashes), _LOOKUP_BATCH):
+            batch = hashes[start:start + _LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT text_hash, slot FROM embeddings WHERE text_hash IN ({placeholders})",
+                batch
+            ).fetchall()
+            slots.update(rows)
+        return slots
+
+    def _allocate_slots(self, count: int) -> List[int]:
+        """Free slots for count new rows (growing the file, then evicting LRU rows)"""
+        used = self._row_count()
+        free = min(count, self.max_rows - used)
+
+        slots: List[int] = []
+        if free > 0:
+            if used + free > self._capacity:
+                self._open_vectors(min_rows=max(used + free, self._capacity + _GROWTH_ROWS))
+            # Slots are dense: 0..used-1 are occupied until eviction starts
+            slots = list(range(used, used + free))
+
+        evict = count - len(slots)
+        if evict > 0:
+            victims = self._conn.execute(
+                "SELECT text_hash, slot FROM embeddings ORDER BY last_access LIMIT ?",
+                (evict,)
+            ).fetchall()
+            self._conn.executemany(
+                "DELETE FROM embeddings WHERE text_hash = ?",
+                [(text_hash,) for text_hash, _ in victims]
+            )
+            slots.extend(slot for _, slot in victims)
+
+        return slots
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Cache statistics
+
+        Returns:
+            Dict with rows, max_rows, dimension, hits, misses, hit_rate, size_bytes
+        """
+        with self._lock:
+            rows = self._row_count()
+
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "rows": rows,
+            "max_rows": self.max_rows,
+            "dimension": self.dimension,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size_bytes": self.vectors_path.stat().st_size if self.vectors_path.exists() else 0
+        }
+
+    def close(self):
+        """Flush vectors and close the index"""
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            self._conn.close()
+            self._lock_file.close()
@@ -8,7 +8,7 @@ Implements async operations using aiosqlite.
 import logging
 import json
 from typing import List, Dict, Optional, Any
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import aiosqlite
 
@@ -23,11 +23,32 @@ class FileMetadataProvider:
     1. file_metadata: File-level information
        - file_id (PK), filename, file_type, file_size
        - upload_time, user_id, chunk_count
-       - embedding_status, milvus_partition, metadata_json
+       - embedding_status, milvus_partition, metadata_json, content_hash
 
     2. chunks_metadata (optional): Chunk-level tracking
        - chunk_id (PK), file_id (FK), chunk_index
-       - chunk_text, milvus_id
+       - chunk_text, milvus_id, start_index, end_index
+
+    3. ingestion_jobs: Persistent background ingestion queue
+       - job_id (PK), file_id (FK), user_id, filename, file_path, file_size
+       - status, stage, progress_json, error, attempts
+       - created_at, updated_at
+
+    4. ingestion_cache: Content-addressed ingestion results
+       - cache_key (PK: content hash + config fingerprint)
+       - content_hash, config_fingerprint, source_file_id (FK), chunk_count
+       - created_at
+
+    5. chunk_signatures: Duplicate-detection signatures of indexed chunks
+       - (file_id, chunk_index) PK, user_id, exact_hash, simhash, band0-band3
+
+    6. chunk_references: Chunks skipped as duplicates of an indexed chunk
+       - (file_id, chunk_index) PK, user_id, canonical_file_id,
+         canonical_chunk_index, chunk_text, metadata_json
+
+    7. index_manifests: Config each file's current index was built with
+       - file_id (PK, FK), version, config_fingerprint, config_json
+       - chunk_count, indexed_at
     """
 
     def __init__(self, db_path: Optional[str] = None):
@@ -81,10 +102,17 @@ class FileMetadataProvider:
                     chunk_count INTEGER,
                     embedding_status TEXT,
                     milvus_partition TEXT,
-                    metadata_json TEXT
+                    metadata_json TEXT,
+                    content_hash TEXT
                 )
         """)
 
+        # Databases created before content hashing lack the column
+        async with conn.execute("PRAGMA table_info(file_metadata)") as cursor:
+            columns = {row["name"] for row in await cursor.fetchall()}
+        if "content_hash" not in columns:
+            await conn.execute("ALTER TABLE file_metadata ADD COLUMN content_hash TEXT")
+
         # Create chunks_metadata table (optional, for detailed tracking)
         await conn.execute("""
             CREATE TABLE IF NOT EXISTS chunks_metadata (
@@ -93,6 +121,100 @@ class FileMetadataProvider:
                 chunk_index INTEGER,
                 chunk_text TEXT,
                 milvus_id INTEGER,
+                start_index INTEGER,
+                end_index INTEGER,
+                FOREIGN KEY (file_id) REFERENCES file_metadata(file_id)
+            )
+        """)
+
+        # Databases created before chunk offsets lack the span columns
+        async with conn.execute("PRAGMA table_info(chunks_metadata)") as cursor:
+            columns = {row["name"] for row in await cursor.fetchall()}
+        for column in ("start_index", "end_index"):
+            if column not in columns:
+                await conn.execute(f"ALTER TABLE chunks_metadata ADD COLUMN {column} INTEGER")
+
+        # Create ingestion_jobs table (persistent background ingestion queue)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS ingestion_jobs (
+                job_id TEXT PRIMARY KEY,
+                file_id TEXT NOT NULL,
+                user_id TEXT,
+                filename TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                file_size INTEGER,
+                status TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                progress_json TEXT,
+                error TEXT,
+                attempts INTEGER DEFAULT 0,
+                created_at TIMESTAMP,
+                updated_at TIMESTAMP,
+                worker_id TEXT,
+                lease_expires_at TIMESTAMP,
+                FOREIGN KEY (file_id) REFERENCES file_metadata(file_id)
+            )
+        """)
+
+        # Databases created before job leases lack the lease columns
+        async with conn.execute("PRAGMA table_info(ingestion_jobs)") as cursor:
+            columns = {row["name"] for row in await cursor.fetchall()}
+        for column, column_type in (("worker_id", "TEXT"), ("lease_expires_at", "TIMESTAMP")):
+            if column not in columns:
+                await conn.execute(f"ALTER TABLE ingestion_jobs ADD COLUMN {column} {column_type}")
+
+        # Create ingestion_cache table (content-addressed ingestion results)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS ingestion_cache (
+                cache_key TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                config_fingerprint TEXT NOT NULL,
+                source_file_id TEXT NOT NULL,
+                chunk_count INTEGER,
+                created_at TIMESTAMP,
+                FOREIGN KEY (source_file_id) REFERENCES file_metadata(file_id)
+            )
+        """)
+
+        # Create chunk_signatures table (ingest-time duplicate detection)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunk_signatures (
+                file_id TEXT NOT NULL,
+                chunk_index INTEGER NOT NULL,
+                user_id TEXT,
+                exact_hash TEXT NOT NULL,
+                simhash INTEGER,
+                band0 INTEGER,
+                band1 INTEGER,
+                band2 INTEGER,
+                band3 INTEGER,
+                PRIMARY KEY (file_id, chunk_index)
+            )
+        """)
+
+        # Create chunk_references table (duplicates pointing at indexed chunks)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunk_references (
+                file_id TEXT NOT NULL,
+                chunk_index INTEGER NOT NULL,
+                user_id TEXT,
+                canonical_file_id TEXT NOT NULL,
+                canonical_chunk_index INTEGER NOT NULL,
+                chunk_text TEXT,
+                metadata_json TEXT,
+                PRIMARY KEY (file_id, chunk_index)
+            )
+        """)
+
+        # Create index_manifests table (config each file's index was built with)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS index_manifests (
+                file_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                config_fingerprint TEXT NOT NULL,
+                config_json TEXT NOT NULL,
+                chunk_count INTEGER,
+                indexed_at TIMESTAMP,
                 FOREIGN KEY (file_id) REFERENCES file_metadata(file_id)
             )
         """)
@@ -113,6 +235,37 @@ class FileMetadataProvider:
             ON chunks_metadata(file_id)
         """)
 
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_job_status_created
+            ON ingestion_jobs(status, created_at)
+        """)
+
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_job_file_id
+            ON ingestion_jobs(file_id)
+        """)
+
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_cache_source_file_id
+            ON ingestion_cache(source_file_id)
+        """)
+
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_signature_user_hash
+            ON chunk_signatures(user_id, exact_hash)
+        """)
+
+        for band in range(4):
+            await conn.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_signature_user_band{band}
+                ON chunk_signatures(user_id, band{band})
+            """)
+
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_reference_canonical
+            ON chunk_references(canonical_file_id)
+        """)
+
         await conn.commit()
 
         logger.info("Database tables initialized")
@@ -130,7 +283,9 @@ class FileMetadataProvider:
         user_id: Optional[str] = None,
         chunk_count: Optional[int] = None,
         milvus_partition: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        content_hash: Optional[str] = None,
+        embedding_status: str = "pending"
     ):
         """
         Add file metadata record
@@ -144,6 +299,8 @@ class FileMetadataProvider:
             chunk_count: Number of chunks generated
             milvus_partition: Partition name in Milvus
             metadata: Additional metadata as dict
+            content_hash: Full SHA256 hex digest of the file content
+            embedding_status: Initial status ('completed' for deduplicated uploads)
 
         Example:
             >>> await provider.add_file(
@@ -162,13 +319,15 @@ class FileMetadataProvider:
                 INSERT INTO file_metadata (
                     file_id, filename, file_type, file_size,
                     upload_time, user_id, chunk_count,
-                    embedding_status, milvus_partition, metadata_json
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    embedding_status, milvus_partition, metadata_json,
+                    content_hash
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 file_id, filename, file_type, file_size,
                 datetime.now(timezone.utc).isoformat(),
                 user_id, chunk_count,
-                'pending', milvus_partition, metadata_json
+                embedding_status, milvus_partition, metadata_json,
+                content_hash
             ))
 
             await conn.commit()
@@ -249,6 +408,39 @@ class FileMetadataProvider:
                 logger.error(f"Failed to update embedding status: {str(e)}")
                 raise
 
+    async def update_chunk_count(
+        self,
+        file_id: str,
+        chunk_count: int
+    ):
+        """
+        Update file chunk count
+
+        Streaming ingestion only knows the final chunk count once the last
+        batch has been stored.
+
+        Args:
+            file_id: File identifier
+            chunk_count: Number of chunks generated
+
+        Example:
+            >>> await provider.update_chunk_count("file_abc", 150)
+        """
+        conn = await self._get_connection()
+        try:
+            await conn.execute("""
+                UPDATE file_metadata
+                SET chunk_count = ?
+                WHERE file_id = ?
+            """, (chunk_count, file_id))
+
+            await conn.commit()
+            logger.debug(f"Updated chunk count for {file_id}: {chunk_count}")
+
+        except Exception as e:
+                logger.error(f"Failed to update chunk count: {str(e)}")
+                raise
+
     async def list_files(
         self,
         user_id: Optional[str] = None,
@@ -321,12 +513,37 @@ class FileMetadataProvider:
         """
         conn = await self._get_connection()
         try:
-            # Delete chunks first (foreign key constraint)
+            # Delete chunks and jobs first (foreign key constraint)
             await conn.execute(
                 "DELETE FROM chunks_metadata WHERE file_id = ?",
                 (file_id,)
             )
 
+            await conn.execute(
+                "DELETE FROM ingestion_jobs WHERE file_id = ?",
+                (file_id,)
+            )
+
+            await conn.execute(
+                "DELETE FROM ingestion_cache WHERE source_file_id = ?",
+                (file_id,)
+            )
+
+            await conn.execute(
+                "DELETE FROM chunk_signatures WHERE file_id = ?",
+                (file_id,)
+            )
+
+            await conn.execute(
+                "DELETE FROM chunk_references WHERE file_id = ? OR canonical_file_id = ?",
+                (file_id, file_id)
+            )
+
+            await conn.execute(
+                "DELETE FROM index_manifests WHERE file_id = ?",
+                (file_id,)
+            )
+
             # Delete file metadata
             await conn.execute(
                 "DELETE FROM file_metadata WHERE file_id = ?",
@@ -354,7 +571,8 @@ class FileMetadataProvider:
 
         Args:
             file_id: File identifier
-            chunks: List of chunk dicts with keys: chunk_id, chunk_index, chunk_text, milvus_id
+            chunks: List of chunk dicts with keys: chunk_id, chunk_index, chunk_text, milvus_id,
+                and optionally start_index, end_index (character span in the document)
 
         Example:
             >>> chunks = [
@@ -368,14 +586,17 @@ class FileMetadataProvider:
             for chunk in chunks:
                 await conn.execute("""
                     INSERT INTO chunks_metadata (
-                        chunk_id, file_id, chunk_index, chunk_text, milvus_id
-                    ) VALUES (?, ?, ?, ?, ?)
+                        chunk_id, file_id, chunk_index, chunk_text, milvus_id,
+                        start_index, end_index
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
                 """, (
                     chunk['chunk_id'],
                     file_id,
                     chunk['chunk_index'],
                     chunk.get('chunk_text', ''),
-                    chunk.get('milvus_id')
+                    chunk.get('milvus_id'),
+                    chunk.get('start_index'),
+                    chunk.get('end_index')
                 ))
 
             await conn.commit()
@@ -408,6 +629,803 @@ class FileMetadataProvider:
                 logger.error(f"Failed to get file chunks: {str(e)}")
                 return []
 
+    async def get_chunks(self, chunk_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieve chunks by chunk_id
+
+        Args:
+            chunk_ids: Chunk identifiers (duplicates are fetched once)
+
+        Returns:
+            Dict mapping chunk_id to chunk metadata dict (missing ids omitted)
+
+        Example:
+            >>> parents = await provider.get_chunks(["chunk_0", "chunk_1"])
+            >>> print(parents["chunk_0"]["chunk_text"])
+        """
+        unique_ids = list(dict.fromkeys(chunk_ids))
+        if not unique_ids:
+            return {}
+
+        conn = await self._get_connection()
+        chunks: Dict[str, Dict[str, Any]] = {}
+        try:
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(unique_ids), 500):
+                batch = unique_ids[start:start + 500]
+                placeholders = ", ".join("?" * len(batch))
+                async with conn.execute(
+                    f"SELECT * FROM chunks_metadata WHERE chunk_id IN ({placeholders})",
+                    batch
+                ) as cursor:
+                    for row in await cursor.fetchall():
+                        chunks[row["chunk_id"]] = dict(row)
+
+            return chunks
+
+        except Exception as e:
+                logger.error(f"Failed to get chunks: {str(e)}")
+                return {}
+
+    async def delete_file_chunks(self, file_id: str) -> int:
+        """
+        Delete all chunk records of a file (file metadata is kept)
+
+        Args:
+            file_id: File identifier
+
+        Returns:
+            Number of deleted chunk records
+        """
+        conn = await self._get_connection()
+        try:
+            cursor = await conn.execute(
+                "DELETE FROM chunks_metadata WHERE file_id = ?",
+                (file_id,)
+            )
+            await conn.commit()
+            return cursor.rowcount
+
+        except Exception as e:
+                logger.error(f"Failed to delete file chunks: {str(e)}")
+                raise
+
+    # =========================================================================
+    # Chunk Deduplication Operations
+    # =========================================================================
+
+    async def add_chunk_signatures(self, signatures: List[Dict[str, Any]]):
+        """
+        Register signatures of indexed (canonical) chunks
+
+        Args:
+            signatures: Rows with file_id, chunk_index, user_id, exact_hash,
+                simhash and band0-band3 (see chunk_dedup_service.signature_row)
+        """
+        conn = await self._get_connection()
+        try:
+            await conn.executemany("""
+                INSERT OR REPLACE INTO chunk_signatures (
+                    file_id, chunk_index, user_id, exact_hash, simhash,
+                    band0, band1, band2, band3
+                ) VALUES (
+                    :file_id, :chunk_index, :user_id, :exact_hash, :simhash,
+                    :band0, :band1, :band2, :band3
+                )
+            """, signatures)
+            await conn.commit()
+
+        except Exception as e:
+            logger.error(f"Failed to add chunk signatures: {str(e)}")
+            raise
+
+    async def find_chunk_signatures(
+        self,
+        exact_hashes: List[str],
+        bands: List[List[int]],
+        user_id: Optional[str] = None,
+        file_id: Optional[str] = None,
+        exclude_file_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find stored signatures sharing an exact hash or a SimHash band
+
+        Args:
+            exact_hashes: Exact hashes of the chunks being checked
+            bands: The four SimHash bands of each chunk being checked
+            user_id: Search this owner's files
+            file_id: Search a single file (used when user_id is None)
+            exclude_file_id: Skip this file's signatures (the index being
+                replaced during a re-index)
+
+        Returns:
+            Candidate signature rows (confirm near duplicates by Hamming distance)
+        """
+        if user_id is not None:
+            scope, scope_values = "user_id = ?", [user_id]
+        else:
+            scope, scope_values = "file_id = ?", [file_id]
+
+        if exclude_file_id is not None:
+            scope += " AND file_id != ?"
+            scope_values.append(exclude_file_id)
+
+        band_values = [sorted({chunk_bands[band] for chunk_bands in bands}) for band in range(4)]
+        conditions = [(f"exact_hash IN ({', '.join('?' * len(exact_hashes))})", list(exact_hashes))]
+        conditions += [
+            (f"band{band} IN ({', '.join('?' * len(values))})", values)
+            for band, values in enumerate(band_values) if values
+        ]
+
+        conn = await self._get_connection()
+        try:
+            async with conn.execute(
+                f"SELECT * FROM chunk_signatures WHERE {scope} AND "
+                f"({' OR '.join(condition for condition, _ in conditions)})",
+                scope_values + [value for _, values in conditions for value in values]
+            ) as cursor:
+                return [dict(row) for row in await cursor.fetchall()]
+
+        except Exception as e:
+            logger.error(f"Failed to find chunk signatures: {str(e)}")
+            return []
+
+    async def add_chunk_references(self, references: List[Dict[str, Any]]):
+        """
+        Record chunks skipped as duplicates
+
+        Args:
+            references: Rows with file_id, chunk_index, user_id,
+                canonical_file_id, canonical_chunk_index, chunk_text, metadata_json
+        """
+        conn = await self._get_connection()
+        try:
+            await conn.executemany("""
+                INSERT OR REPLACE INTO chunk_references (
+                    file_id, chunk_index, user_id, canonical_file_id,
+                    canonical_chunk_index, chunk_text, metadata_json
+                ) VALUES (
+                    :file_id, :chunk_index, :user_id, :canonical_file_id,
+                    :canonical_chunk_index, :chunk_text, :metadata_json
+                )
+            """, references)
+            await conn.commit()
+
+        except Exception as e:
+            logger.error(f"Failed to add chunk references: {str(e)}")
+            raise
+
+    async def get_chunk_references(
+        self,
+        file_ids: List[str],
+        external_only: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Duplicate references recorded for files
+
+        Args:
+            file_ids: Files whose skipped chunks to list
+            external_only: Only references to chunks of other files
+
+        Returns:
+            List of reference dicts
+        """
+        if not file_ids:
+            return []
+
+        conn = await self._get_connection()
+        try:
+            placeholders = ", ".join("?" * len(file_ids))
+            query = f"SELECT * FROM chunk_references WHERE file_id IN ({placeholders})"
+            if external_only:
+                query += " AND canonical_file_id != file_id"
+
+            async with conn.execute(query, list(file_ids)) as cursor:
+                return [dict(row) for row in await cursor.fetchall()]
+
+        except Exception as e:
+            logger.error(f"Failed to get chunk references: {str(e)}")
+            return []
+
+    async def get_references_to(self, canonical_file_id: str) -> List[Dict[str, Any]]:
+        """
+        References from other files to a file's chunks
+
+        Args:
+            canonical_file_id: File holding the indexed chunks
+
+        Returns:
+            List of reference dicts
+        """
+        conn = await self._get_connection()
+        try:
+            async with conn.execute(
+                "SELECT * FROM chunk_references WHERE canonical_file_id = ? AND file_id != ?",
+                (canonical_file_id, canonical_file_id)
+            ) as cursor:
+                return [dict(row) for row in await cursor.fetchall()]
+
+        except Exception as e:
+            logger.error(f"Failed to get references to {canonical_file_id}: {str(e)}")
+            return []
+
+    async def copy_chunk_references(
+        self,
+        source_file_id: str,
+        file_id: str,
+        user_id: Optional[str] = None
+    ):
+        """
+        Give a file (sharing source_file_id's vectors) the source's references
+
+        References within the source file are rewritten to point at the copy.
+
+        Args:
+            source_file_id: File whose references are copied
+            file_id: File receiving them
+            user_id: Owner of file_id
+        """
+        conn = await self._get_connection()
+        try:
+            await conn.execute("""
+                INSERT OR REPLACE INTO chunk_references (
+                    file_id, chunk_index, user_id, canonical_file_id,
+                    canonical_chunk_index, chunk_text, metadata_json
+                )
+                SELECT ?, chunk_index, ?,
+                       CASE WHEN canonical_file_id = file_id THEN ? ELSE canonical_file_id END,
+                       canonical_chunk_index, chunk_text, metadata_json
+                FROM chunk_references WHERE file_id = ?
+            """, (file_id, user_id, file_id, source_file_id))
+            await conn.commit()
+
+        except Exception as e:
+            logger.error(f"Failed to copy chunk references: {str(e)}")
+            raise
+
+    async def delete_chunk_dedup(self, file_id: str):
+        """
+        Delete a file's signatures and references (both from and to it)
+
+        Args:
+            file_id: File identifier
+        """
+        conn = await self._get_connection()
+        try:
+            await conn.execute("DELETE FROM chunk_signatures WHERE file_id = ?", (file_id,))
+            await conn.execute(
+                "DELETE FROM chunk_references WHERE file_id = ? OR canonical_file_id = ?",
+                (file_id, file_id)
+            )
+            await conn.commit()
+
+        except Exception as e:
+            logger.error(f"Failed to delete deduplication data: {str(e)}")
+            raise
+
+    async def replace_file_records(self, staging_file_id: str, file_id: str):
+        """
+        Move a re-indexed file's chunk records from its staging id to file_id
+
+        In one transaction, file_id's parent chunks, signatures, references
+        and ingestion cache entries are deleted and the staging rows renamed.
+
+        Args:
+            staging_file_id: Identifier the new index was built under
+            file_id: File identifier
+        """
+        conn = await self._get_connection()
+        try:
+            await conn.execute("DELETE FROM chunks_metadata WHERE file_id = ?", (file_id,))
+            await conn.execute("DELETE FROM chunk_signatures WHERE file_id = ?", (file_id,))
+            await conn.execute(
+                "DELETE FROM chunk_references WHERE file_id = ? OR canonical_file_id = ?",
+                (file_id, file_id)
+            )
+            await conn.execute("DELETE FROM ingestion_cache WHERE source_file_id = ?", (file_id,))
+
+            await conn.execute(
+                "UPDATE chunks_metadata SET file_id = ? WHERE file_id = ?",
+                (file_id, staging_file_id)
+            )
+            await conn.execute(
+                "UPDATE chunk_signatures SET file_id = ? WHERE file_id = ?",
+                (file_id, staging_file_id)
+            )
+            await conn.execute(
+                "UPDATE chunk_references SET canonical_file_id = ? WHERE canonical_file_id = ?",
+                (file_id, staging_file_id)
+            )
+            await conn.execute(
+                "UPDATE chunk_references SET file_id = ? WHERE file_id = ?",
+                (file_id, staging_file_id)
+            )
+            await conn.commit()
+
+        except Exception as e:
+            logger.error(f"Failed to replace records of {file_id}: {str(e)}")
+            await conn.rollback()
+            raise
+
+    # =========================================================================
+    # Index Manifest Operations
+    # =========================================================================
+
+    async def put_index_manifest(
+        self,
+        file_id: str,
+        config_fingerprint: str,
+        config: Dict[str, Any],
+        chunk_count: int
+    ) -> int:
+        """
+        Record the config a file's index was built with
+
+        Args:
+            file_id: File identifier
+            config_fingerprint: Hash of the chunking and embedding config
+            config: The config itself (strategy, sizes, model)
+            chunk_count: Number of chunks indexed
+
+        Returns:
+            Manifest version (1 for the first index, +1 per re-index)
+
+        Example:
+            >>> version = await provider.put_index_manifest("file_abc", "9a8b...", config, 150)
+        """
+        conn = await self._get_connection()
+        try:
+            await conn.execute("""
+                INSERT INTO index_manifests (
+                    file_id, version, config_fingerprint, config_json,
+                    chunk_count, indexed_at
+                ) VALUES (?, 1, ?, ?, ?, ?)
+                ON CONFLICT(file_id) DO UPDATE SET
+                    version = version + 1,
+                    config_fingerprint = excluded.config_fingerprint,
+                    config_json = excluded.config_json,
+                    chunk_count = excluded.chunk_count,
+                    indexed_at = excluded.indexed_at
+            """, (
+                file_id, config_fingerprint, json.dumps(config, sort_keys=True),
+                chunk_count, datetime.now(timezone.utc).isoformat()
+            ))
+            await conn.commit()
+
+            async with conn.execute(
+                "SELECT version FROM index_manifests WHERE file_id = ?",
+                (file_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                return row["version"]
+
+        except Exception as e:
+            logger.error(f"Failed to record index manifest: {str(e)}")
+            raise
+
+    async def get_index_manifest(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the manifest of a file's current index
+
+        Args:
+            file_id: File identifier
+
+        Returns:
+            Manifest dict (version, config_fingerprint, config, chunk_count,
+            indexed_at) or None if the file predates manifests
+        """
+        conn = await self._get_connection()
+        try:
+            async with conn.execute(
+                "SELECT * FROM index_manifests WHERE file_id = ?",
+                (file_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                if not row:
+                    return None
+
+                manifest = dict(row)
+                manifest['config'] = json.loads(manifest.pop('config_json'))
+                return manifest
+
+        except Exception as e:
+            logger.error(f"Failed to get index manifest: {str(e)}")
+            return None
+
+    async def list_stale_files(
+        self,
+        config_fingerprint: str,
+        limit: int = 50,
+        exclude_file_ids: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Completed files whose index was built with another config
+
+        Files without a manifest (indexed before manifests existed) are
+        stale too. Oldest uploads first.
+
+        Args:
+            config_fingerprint: Current config fingerprint
+            limit: Max number of files to return
+            exclude_file_ids: Files to skip (e.g. whose upload is gone)
+
+        Returns:
+            List of file metadata dicts
+        """
+        exclude_file_ids = list(exclude_file_ids or [])
+        exclusion = (
+            f"AND f.file_id NOT IN ({', '.join('?' * len(exclude_file_ids))})"
+            if exclude_file_ids else ""
+        )
+
+        conn = await self._get_connection()
+        try:
+            async with conn.execute(f"""
+                SELECT f.* FROM file_metadata f
+                LEFT JOIN index_manifests m ON m.file_id = f.file_id
+                WHERE f.embedding_status = 'completed'
+                  AND (m.file_id IS NULL OR m.config_fingerprint != ?)
+                  {exclusion}
+                ORDER BY f.upload_time
+                LIMIT ?
+            """, [config_fingerprint] + exclude_file_ids + [limit]) as cursor:
+                return [dict(row) for row in await cursor.fetchall()]
+
+        except Exception as e:
+            logger.error(f"Failed to list stale files: {str(e)}")
+            return []
+
+    # =========================================================================
+    # Ingestion Job Queue Operations
+    # =========================================================================
+
+    def _job_row_to_dict(self, row) -> Dict[str, Any]:
+        """Convert an ingestion_jobs row to a dict with parsed progress"""
+        job = dict(row)
+        job["progress"] = json.loads(job.pop("progress_json") or "{}")
+        return job
+
+    async def enqueue_job(
+        self,
+        job_id: str,
+        file_id: str,
+        filename: str,
+        file_path: str,
+        file_size: int,
+        user_id: Optional[str] = None
+    ):
+        """
+        Add an ingestion job to the persistent queue
+
+        Args:
+            job_id: Unique job identifier
+            file_id: File the job ingests (must exist in file_metadata)
+            filename: Original filename
+            file_path: Path to the stored upload on disk
+            file_size: File size in bytes
+            user_id: Optional user identifier
+
+        Example:
+            >>> await provider.enqueue_job("job_abc", "file_abc", "doc.pdf", "/path/doc.pdf", 1024)
+        """
+        conn = await self._get_connection()
+        try:
+            now = datetime.now(timezone.utc).isoformat()
+
+            await conn.execute("""
+                INSERT INTO ingestion_jobs (
+                    job_id, file_id, user_id, filename, file_path, file_size,
+                    status, stage, progress_json, attempts, created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, 'queued', 'queued', '{}', 0, ?, ?)
+            """, (job_id, file_id, user_id, filename, file_path, file_size, now, now))
+
+            await conn.commit()
+            logger.info(f"Enqueued ingestion job {job_id} for file {file_id}")
+
+        except Exception as e:
+            logger.error(f"Failed to enqueue ingestion job: {str(e)}")
+            raise
+
+    async def claim_next_job(
+        self,
+        worker_id: Optional[str] = None,
+        lease_seconds: float = 60.0
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim the oldest queued job
+
+        The UPDATE only succeeds while the job is still 'queued', so two
+        workers can never claim the same job. The claim is a lease: the
+        worker renews it (renew_job_lease) while the job runs, and
+        requeue_interrupted_jobs only requeues jobs whose lease expired.
+
+        Args:
+            worker_id: Identifier of the claiming worker
+            lease_seconds: Lease duration
+
+        Returns:
+            Claimed job dict (status 'running') or None if the queue is empty
+        """
+        conn = await self._get_connection()
+        try:
+            while True:
+                async with conn.execute("""
+                    SELECT job_id FROM ingestion_jobs
+                    WHERE status = 'queued'
+                    ORDER BY created_at
+                    LIMIT 1
+                """) as cursor:
+                    row = await cursor.fetchone()
+
+                if row is None:
+                    return None
+
+                now = datetime.now(timezone.utc)
+                cursor = await conn.execute("""
+                    UPDATE ingestion_jobs
+                    SET status = 'running', attempts = attempts + 1, updated_at = ?,
+                        worker_id = ?, lease_expires_at = ?
+                    WHERE job_id = ? AND status = 'queued'
+                """, (
+                    now.isoformat(),
+                    worker_id,
+                    (now + timedelta(seconds=lease_seconds)).isoformat(),
+                    row["job_id"]
+                ))
+                await conn.commit()
+
+                if cursor.rowcount == 1:
+                    return await self.get_job(row["job_id"])
+
+        except Exception as e:
+            logger.error(f"Failed to claim ingestion job: {str(e)}")
+            raise
+
+    async def renew_job_lease(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """
+        Extend the lease of a running job held by worker_id
+
+        Args:
+            job_id: Job identifier
+            worker_id: Worker holding the lease
+            lease_seconds: New lease duration from now
+
+        Returns:
+            False if the job is no longer running under this worker's lease
+        """
+        conn = await self._get_connection()
+        try:
+            cursor = await conn.execute("""
+                UPDATE ingestion_jobs
+                SET lease_expires_at = ?
+                WHERE job_id = ? AND worker_id = ? AND status = 'running'
+            """, (
+                (datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)).isoformat(),
+                job_id,
+                worker_id
+            ))
+
+            await conn.commit()
+            return cursor.rowcount == 1
+
+        except Exception as e:
+            logger.error(f"Failed to renew lease of ingestion job {job_id}: {str(e)}")
+            raise
+
+    async def update_job(
+        self,
+        job_id: str,
+        status: Optional[str] = None,
+        stage: Optional[str] = None,
+        progress: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None
+    ):
+        """
+        Update job status, stage, progress counters or error
+
+        Args:
+            job_id: Job identifier
+            status: 'queued', 'running', 'completed' or 'failed'
+            stage: Current pipeline stage (e.g. 'extracting', 'embedding')
+            progress: Per-stage progress counters
+            error: Error message for failed jobs
+
+        Example:
+            >>> await provider.update_job("job_abc", stage="embedding", progress={"chunks_stored": 64})
+        """
+        conn = await self._get_connection()
+        try:
+            assignments = ["updated_at = ?"]
+            params: List[Any] = [datetime.now(timezone.utc).isoformat()]
+
+            for column, value in (
+                ("status", status),
+                ("stage", stage),
+                ("progress_json", json.dumps(progress) if progress is not None else None),
+                ("error", error)
+            ):
+                if value is not None:
+                    assignments.append(f"{column} = ?")
+                    params.append(value)
+
+            params.append(job_id)
+            await conn.execute(
+                f"UPDATE ingestion_jobs SET {', '.join(assignments)} WHERE job_id = ?",
+                params
+            )
+
+            await conn.commit()
+
+        except Exception as e:
+            logger.error(f"Failed to update ingestion job {job_id}: {str(e)}")
+            raise
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve an ingestion job
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Job dict or None if not found
+        """
+        conn = await self._get_connection()
+        try:
+            async with conn.execute(
+                "SELECT * FROM ingestion_jobs WHERE job_id = ?",
+                (job_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                return self._job_row_to_dict(row) if row else None
+
+        except Exception as e:
+            logger.error(f"Failed to get ingestion job: {str(e)}")
+            return None
+
+    async def get_latest_job_for_file(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve the most recent ingestion job for a file
+
+        Args:
+            file_id: File identifier
+
+        Returns:
+            Job dict or None if the file has no jobs
+        """
+        conn = await self._get_connection()
+        try:
+            async with conn.execute("""
+                SELECT * FROM ingestion_jobs
+                WHERE file_id = ?
+                ORDER BY created_at DESC
+                LIMIT 1
+            """, (file_id,)) as cursor:
+                row = await cursor.fetchone()
+                return self._job_row_to_dict(row) if row else None
+
+        except Exception as e:
+            logger.error(f"Failed to get ingestion job for file {file_id}: {str(e)}")
+            return None
+
+    async def requeue_interrupted_jobs(self) -> int:
+        """
+        Put running jobs whose worker stopped renewing its lease back in the queue
+
+        Jobs a live worker (of this or a sibling process) is running keep a
+        current lease and are left alone; jobs of a crashed or restarted
+        process are requeued once their lease expires.
+
+        Returns:
+            Number of jobs requeued
+        """
+        conn = await self._get_connection()
+        try:
+            now = datetime.now(timezone.utc).isoformat()
+            cursor = await conn.execute("""
+                UPDATE ingestion_jobs
+                SET status = 'queued', stage = 'queued', updated_at = ?,
+                    worker_id = NULL, lease_expires_at = NULL
+                WHERE status = 'running'
+                  AND (lease_expires_at IS NULL OR lease_expires_at < ?)
+            """, (now, now))
+
+            await conn.commit()
+
+            if cursor.rowcount:
+                logger.info(f"Requeued {cursor.rowcount} interrupted ingestion jobs")
+            return cursor.rowcount
+
+        except Exception as e:
+            logger.error(f"Failed to requeue interrupted jobs: {str(e)}")
+            raise
+
+    # =========================================================================
+    # Ingestion Cache Operations (Content-Hash Deduplication)
+    # =========================================================================
+
+    async def get_ingestion_cache(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a completed ingestion by content hash and config fingerprint
+
+        Args:
+            cache_key: "{content_hash}:{config_fingerprint}"
+
+        Returns:
+            Cache entry dict (source_file_id, chunk_count, ...) or None
+        """
+        conn = await self._get_connection()
+        try:
+            async with conn.execute(
+                "SELECT * FROM ingestion_cache WHERE cache_key = ?",
+                (cache_key,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                return dict(row) if row else None
+
+        except Exception as e:
+            logger.error(f"Failed to get ingestion cache entry: {str(e)}")
+            return None
+
+    async def put_ingestion_cache(
+        self,
+        cache_key: str,
+        content_hash: str,
+        config_fingerprint: str,
+        source_file_id: str,
+        chunk_count: int
+    ):
+        """
+        Record a completed ingestion for reuse by identical uploads
+
+        Args:
+            cache_key: "{content_hash}:{config_fingerprint}"
+            content_hash: Full SHA256 hex digest of the file content
+            config_fingerprint: Hash of the chunking and embedding config
+            source_file_id: File whose vector store holds the chunks
+            chunk_count: Number of chunks stored
+
+        Example:
+            >>> await provider.put_ingestion_cache("e5f6...:9a8b...", "e5f6...", "9a8b...", "file_abc", 150)
+        """
+        conn = await self._get_connection()
+        try:
+            await conn.execute("""
+                INSERT OR REPLACE INTO ingestion_cache (
+                    cache_key, content_hash, config_fingerprint,
+                    source_file_id, chunk_count, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            """, (
+                cache_key, content_hash, config_fingerprint,
+                source_file_id, chunk_count,
+                datetime.now(timezone.utc).isoformat()
+            ))
+
+            await conn.commit()
+
+        except Exception as e:
+            logger.error(f"Failed to record ingestion cache entry: {str(e)}")
+            raise
+
+    async def delete_ingestion_cache(self, cache_key: str):
+        """
+        Drop a stale ingestion cache entry
+
+        Args:
+            cache_key: "{content_hash}:{config_fingerprint}"
+        """
+        conn = await self._get_connection()
+        try:
+            await conn.execute(
+                "DELETE FROM ingestion_cache WHERE cache_key = ?",
+                (cache_key,)
+            )
+            await conn.commit()
+
+        except Exception as e:
+            logger.error(f"Failed to delete ingestion cache entry: {str(e)}")
+            raise
+
     # =========================================================================
     # Statistics and Utilities
     # =========================================================================
@@ -520,12 +1538,37 @@ class FileMetadataProvider:
         """
         conn = await self._get_connection()
         try:
-            # Delete associated chunks first (foreign key constraint)
+            # Delete associated chunks and jobs first (foreign key constraint)
             await conn.execute(
                 "DELETE FROM chunks_metadata WHERE file_id = ?",
                 (file_id,)
             )
 
+            await conn.execute(
+                "DELETE FROM ingestion_jobs WHERE file_id = ?",
+                (file_id,)
+            )
+
+            await conn.execute(
+                "DELETE FROM ingestion_cache WHERE source_file_id = ?",
+                (file_id,)
+            )
+
+            await conn.execute(
+                "DELETE FROM chunk_signatures WHERE file_id = ?",
+                (file_id,)
+            )
+
+            await conn.execute(
+                "DELETE FROM chunk_references WHERE file_id = ? OR canonical_file_id = ?",
+                (file_id, file_id)
+            )
+
+            await conn.execute(
+                "DELETE FROM index_manifests WHERE file_id = ?",
+                (file_id,)
+            )
+
             # Delete file metadata
             await conn.execute(
                 "DELETE FROM file_metadata WHERE file_id = ?",
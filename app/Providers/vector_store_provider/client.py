@@ -6,9 +6,21 @@ Supports FAISS (in-memory) and ChromaDB (persistent) backends.
 """
 
 import logging
-from typing import List, Dict, Optional, Any
+import pickle
+import shutil
+import threading
+import uuid
+from typing import List, Dict, Optional, Any, Union
 from pathlib import Path
 
+import numpy as np
+
+from app.Providers.vector_store_provider.ranking import merge_top_k, normalize_distances
+from app.Providers.vector_store_provider.residency import (
+    StoreResidencyManager,
+    estimate_store_bytes
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,11 +32,29 @@ class VectorStoreProvider:
     Currently supports:
     - FAISS (fast in-memory search)
     - ChromaDB (persistent storage)
+    - Milvus (shared server; see MilvusClient)
+
+    FAISS layouts (FAISS_INDEX_LAYOUT):
+    - per_file: one LangChain FAISS store per file in self._stores
+    - global: one shared GlobalFaissIndex; store ids are file ids used as
+      an allow-list filter, so multi-file search is a single index query.
+      Saved under VECTOR_STORE_PATH/faiss_global whenever its files change
+      (VECTOR_STORE_PERSIST) and loaded at startup
+
+    The Milvus backend uses the same shared-index code path with MilvusClient
+    (one partition per file), so vectors are shared across uvicorn workers.
+
+    Per-file FAISS stores are saved under VECTOR_STORE_PATH/faiss/{store_id}
+    once built (VECTOR_STORE_PERSIST) and loaded lazily, memory-mapped where
+    the index type allows, on first access after a restart.
+    Resident stores are kept within VECTOR_STORE_MEMORY_BUDGET_MB: the least
+    recently used persisted stores are dropped from memory and reloaded on
+    demand.
     """
 
     def __init__(
         self,
-        backend: str = "faiss",
+        backend: Optional[str] = None,
         persist_directory: Optional[str] = None,
         collection_name: str = "documents"
     ):
@@ -32,25 +62,219 @@ class VectorStoreProvider:
         Initialize Vector Store Provider
 
         Args:
-            backend: Vector store backend ("faiss" or "chroma")
+            backend: Vector store backend ("faiss", "chroma" or "milvus";
+                default: VECTOR_STORE_BACKEND)
             persist_directory: Directory for persistent storage (ChromaDB only)
             collection_name: Name of the vector collection
         """
         from app.core.config import settings
 
-        self.backend = backend.lower()
+        self.backend = (backend or settings.VECTOR_STORE_BACKEND).lower()
         self.persist_directory = persist_directory or settings.VECTOR_STORE_PATH
         self.collection_name = collection_name
 
         # Storage for file-specific vector stores (in-memory mapping)
         self._stores: Dict[str, Any] = {}
 
-        logger.info(f"Vector Store Provider initialized with backend: {self.backend}")
+        # Shared index: global FAISS layout or Milvus
+        self._global_index = None
+        self._query_embedding: Any = None  # Embeddings used for string queries
+        self._global_index_path: Optional[Path] = None
+        if self.backend == "faiss" and settings.FAISS_INDEX_LAYOUT == "global":
+            from app.Providers.vector_store_provider.global_index import GlobalFaissIndex
+            if settings.VECTOR_STORE_PERSIST:
+                self._global_index_path = Path(self.persist_directory) / "faiss_global"
+                self._global_index = GlobalFaissIndex.load(self._global_index_path)
+            else:
+                self._global_index = GlobalFaissIndex()
+        elif self.backend == "milvus":
+            from app.Providers.vector_store_provider.milvus_client import get_milvus_client
+            self._global_index = get_milvus_client()
+
+        # On-disk FAISS stores (per-file layout), loaded on first access
+        self.persist_enabled = (
+            settings.VECTOR_STORE_PERSIST
+            and self.backend == "faiss"
+            and self._global_index is None
+        )
+        self._faiss_root = Path(self.persist_directory) / "faiss"
+        self._load_lock = threading.Lock()
+        self._residency = StoreResidencyManager(
+            budget_bytes=settings.VECTOR_STORE_MEMORY_BUDGET_MB * 1024 * 1024
+        )
+
+        logger.info(
+            f"Vector Store Provider initialized with backend: {self.backend}"
+            + (" (global index)" if self.backend == "faiss" and self._global_index is not None else "")
+        )
+
+    @property
+    def uses_global_index(self) -> bool:
+        """Whether stores live in one shared index (global FAISS layout or Milvus)"""
+        return self._global_index is not None
+
+    # =========================================================================
+    # FAISS Persistence
+    # =========================================================================
+
+    def _store_path(self, store_id: str) -> Path:
+        """Directory holding a persisted FAISS store"""
+        return self._faiss_root / store_id
+
+    def _is_persisted(self, store_id: str) -> bool:
+        """Whether a complete persisted copy of the store exists"""
+        path = self._store_path(store_id)
+        return (path / "index.faiss").exists() and (path / "index.pkl").exists()
+
+    @staticmethod
+    def _read_faiss_index(index_path: Path) -> Any:
+        """Read a FAISS index, memory-mapping it when the index type supports it"""
+        import faiss
+
+        try:
+            return faiss.read_index(str(index_path), faiss.IO_FLAG_MMAP)
+        except Exception:
+            # Not every index type can be memory-mapped; read it into memory
+            return faiss.read_index(str(index_path))
+
+    def _load_store(self, store_id: str) -> Any:
+        """Load a persisted FAISS store into self._stores"""
+        from langchain_community.vectorstores import FAISS
+        from app.Providers.embedding_provider.client import get_embedding_provider
+
+        with self._load_lock:
+            if store_id in self._stores:
+                return self._stores[store_id]
+
+            path = self._store_path(store_id)
+            index = self._read_faiss_index(path / "index.faiss")
+            with (path / "index.pkl").open("rb") as f:
+                docstore, index_to_docstore_id = pickle.load(f)
+
+            vector_store = FAISS(
+                embedding_function=get_embedding_provider(),
+                index=index,
+                docstore=docstore,
+                index_to_docstore_id=index_to_docstore_id
+            )
+            self._stores[store_id] = vector_store
+
+        logger.info(f"Loaded persisted FAISS store '{store_id}' ({index.ntotal} vectors)")
+        self._residency.record_miss()
+        self._admit_store(store_id)
+        return vector_store
+
+    def _admit_store(self, store_id: str):
+        """Account a resident store's size and evict cold stores over budget"""
+        vector_store = self._stores.get(store_id)
+        if vector_store is None or not hasattr(vector_store, "index"):
+            return
+
+        evict = self._residency.admit(
+            store_id,
+            estimate_store_bytes(vector_store),
+            can_evict=self._is_persisted if self.persist_enabled else (lambda _: False)
+        )
+        for evicted_id in evict:
+            self._stores.pop(evicted_id, None)
+
+    def _resolve_store(self, store_id: str) -> Any:
+        """
+        Get a store from memory, loading it from disk if it was persisted
+
+        Raises:
+            ValueError: If the store does not exist
+        """
+        vector_store = self._stores.get(store_id)
+        if vector_store is not None:
+            self._residency.record_hit(store_id)
+            return vector_store
+
+        if self.persist_enabled and self._is_persisted(store_id):
+            return self._load_store(store_id)
+
+        raise ValueError(f"Vector store '{store_id}' not found")
+
+    def persist_store(self, store_id: str) -> Optional[Path]:
+        """
+        Save a FAISS store and its docstore under VECTOR_STORE_PATH
+
+        Written to a temporary directory and renamed into place, so a crash
+        never leaves a half-written store behind.
+
+        With the Milvus backend this commits buffered inserts instead
+        (the server persists them); with the global FAISS layout the whole
+        shared index is saved.
+
+        Args:
+            store_id: Vector store identifier
+
+        Returns:
+            Path of the persisted store, or None when persistence is disabled
+
+        Example:
+            >>> provider.persist_store("file_123")
+        """
+        if self.backend == "milvus":
+            self._global_index.commit()
+            return None
+
+        if self._global_index_path is not None:
+            self._save_global_index()
+            return self._global_index_path
+
+        if not self.persist_enabled:
+            return None
+
+        vector_store = self._resolve_store(store_id)
+        target = self._store_path(store_id)
+        staging = self._faiss_root / f".{store_id}.{uuid.uuid4().hex}.tmp"
+
+        previous = self._faiss_root / f".{store_id}.{uuid.uuid4().hex}.old"
+
+        self._faiss_root.mkdir(parents=True, exist_ok=True)
+        try:
+            vector_store.save_local(str(staging))
+            # Move the previous copy aside first: a complete store is on disk throughout
+            if target.exists():
+                target.rename(previous)
+            staging.rename(target)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+            shutil.rmtree(previous, ignore_errors=True)
+
+        logger.info(f"Persisted FAISS store '{store_id}' to {target}")
+
+        # Now evictable: account for it against the memory budget
+        self._admit_store(store_id)
+        return target
+
+    def _save_global_index(self):
+        """Save the global FAISS index (global layout with VECTOR_STORE_PERSIST)"""
+        if self._global_index_path is None:
+            return
+
+        self._global_index.save(self._global_index_path)
+        logger.info(f"Persisted global FAISS index to {self._global_index_path}")
+
+    def get_residency_stats(self) -> Dict[str, Any]:
+        """
+        Memory residency statistics for per-file stores
+
+        Returns:
+            Dict with resident_stores, bytes_in_use, budget_bytes, hits,
+            misses (loads from disk), evictions and hit_rate
+
+        Example:
+            >>> stats = provider.get_residency_stats()
+            >>> print(f"{stats['bytes_in_use'] / 2**20:.0f}MB resident, hit rate {stats['hit_rate']}")
+        """
+        return self._residency.get_stats()
 
     def create_store_from_texts(
         self,
         texts: List[str],
-        embeddings: Any,  # HuggingFaceEmbeddings instance
+        embeddings: Any,  # LangChain Embeddings (e.g. EmbeddingProvider)
         metadatas: Optional[List[dict]] = None,
         file_id: Optional[str] = None
     ) -> str:
@@ -73,6 +297,16 @@ class VectorStoreProvider:
         """
         from langchain_community.vectorstores import FAISS
 
+        if self.uses_global_index:
+            store_id = file_id or f"store_{len(self._global_index.list_files())}"
+            return self.add_embeddings(
+                store_id=store_id,
+                texts=texts,
+                embeddings=embeddings.embed_documents(texts),
+                embedding_model=embeddings,
+                metadatas=metadatas
+            )
+
         if self.backend == "faiss":
             # Create FAISS vector store
             vector_store = FAISS.from_texts(
@@ -118,6 +352,119 @@ class VectorStoreProvider:
         else:
             raise ValueError(f"Unsupported backend: {self.backend}")
 
+    def add_embeddings(
+        self,
+        store_id: str,
+        texts: List[str],
+        embeddings: Union[List[List[float]], np.ndarray],
+        embedding_model: Any,
+        metadatas: Optional[List[dict]] = None
+    ) -> str:
+        """
+        Add precomputed embeddings to a vector store, creating it if needed
+
+        Used by the streaming ingestion pipeline: each embedded batch is
+        appended to the file's store and becomes searchable immediately.
+
+        Args:
+            store_id: Vector store identifier (file_id)
+            texts: Text chunks for this batch
+            embeddings: Embedding vectors aligned with texts (lists or matrix)
+            embedding_model: Embedding model used for query embedding at search time
+            metadatas: Metadata for each chunk
+
+        Returns:
+            str: Store identifier
+
+        Example:
+            >>> provider.add_embeddings("file_123", ["chunk1"], [[0.1, ...]], model)
+        """
+        return self.add_vectors(
+            store_id=store_id,
+            texts=texts,
+            vectors=np.asarray(embeddings, dtype=np.float32),
+            metadatas=metadatas,
+            embedding_model=embedding_model
+        )
+
+    def add_vectors(
+        self,
+        store_id: str,
+        texts: List[str],
+        vectors: np.ndarray,
+        metadatas: Optional[List[dict]] = None,
+        embedding_model: Any = None
+    ) -> str:
+        """
+        Add a precomputed (n, d) embedding matrix to a vector store
+
+        Nothing is re-embedded: vectors from caches or batch encoders are
+        written to the index as-is.
+
+        Args:
+            store_id: Vector store identifier (file_id)
+            texts: Text chunks aligned with matrix rows
+            vectors: (n, d) float32 embedding matrix
+            metadatas: Metadata for each chunk
+            embedding_model: Embeddings used for string queries at search time
+                (default: the shared EmbeddingProvider)
+
+        Returns:
+            str: Store identifier
+
+        Example:
+            >>> matrix = np.asarray(embedding_provider.embed_documents(chunks), dtype=np.float32)
+            >>> provider.add_vectors("file_123", chunks, matrix, metadatas)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(texts) != len(vectors):
+            raise ValueError(
+                f"Length mismatch: texts({len(texts)}), embeddings({len(vectors)})"
+            )
+
+        if embedding_model is None:
+            from app.Providers.embedding_provider.client import get_embedding_provider
+            embedding_model = get_embedding_provider()
+
+        if self.uses_global_index:
+            self._query_embedding = embedding_model
+            self._global_index.add(store_id, texts, vectors, metadatas)
+            logger.debug(f"Added {len(texts)} embeddings for '{store_id}' to shared {self.backend} index")
+            return store_id
+
+        if self.backend == "faiss":
+            from langchain_community.vectorstores import FAISS
+
+            # Rows stay float32 arrays; FAISS stacks them without a float round-trip
+            text_embeddings = list(zip(texts, vectors))
+
+            if self.has_store(store_id):
+                self._resolve_store(store_id).add_embeddings(text_embeddings, metadatas=metadatas)
+            else:
+                self._stores[store_id] = FAISS.from_embeddings(
+                    text_embeddings=text_embeddings,
+                    embedding=embedding_model,
+                    metadatas=metadatas
+                )
+
+            logger.debug(f"Added {len(texts)} embeddings to FAISS store '{store_id}'")
+            return store_id
+
+        elif self.backend == "chroma":
+            # Chroma's LangChain wrapper only accepts raw texts; it re-embeds them
+            if store_id in self._stores:
+                self._stores[store_id].add_texts(texts=texts, metadatas=metadatas)
+                return store_id
+
+            return self.create_store_from_texts(
+                texts=texts,
+                embeddings=embedding_model,
+                metadatas=metadatas,
+                file_id=store_id
+            )
+        else:
+            raise ValueError(f"Unsupported backend: {self.backend}")
+
     def similarity_search(
         self,
         store_id: str,
@@ -145,10 +492,12 @@ class VectorStoreProvider:
             ... )
             >>> print(results[0]['content'])
         """
-        if store_id not in self._stores:
-            raise ValueError(f"Vector store '{store_id}' not found")
+        if self.uses_global_index:
+            return self.similarity_search_by_vector(
+                store_id, self._embed_query(query), k=k, filter_dict=filter_dict
+            )
 
-        vector_store = self._stores[store_id]
+        vector_store = self._resolve_store(store_id)
 
         try:
             # Perform similarity search
@@ -203,10 +552,13 @@ class VectorStoreProvider:
             ... )
             >>> print(f"Score: {results[0]['score']}, Content: {results[0]['content']}")
         """
-        if store_id not in self._stores:
-            raise ValueError(f"Vector store '{store_id}' not found")
+        if self.uses_global_index:
+            return self.similarity_search_by_vector(
+                store_id, self._embed_query(query), k=k, filter_dict=filter_dict,
+                include_scores=True
+            )
 
-        vector_store = self._stores[store_id]
+        vector_store = self._resolve_store(store_id)
 
         try:
             # Perform similarity search with scores
@@ -235,6 +587,363 @@ class VectorStoreProvider:
             logger.error(f"Error during similarity search with score: {str(e)}")
             raise
 
+    def similarity_search_by_vector(
+        self,
+        store_id: str,
+        embedding: List[float],
+        k: int = 5,
+        filter_dict: Optional[dict] = None,
+        include_scores: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Perform similarity search with a precomputed query embedding
+
+        Lets callers embed a query once and search many stores with it.
+
+        Args:
+            store_id: Vector store identifier
+            embedding: Query embedding vector
+            k: Number of results to return
+            filter_dict: Metadata filters
+            include_scores: Whether to include similarity scores
+
+        Returns:
+            List of dicts with 'content', 'metadata', and optionally 'score'
+
+        Example:
+            >>> vector = embedding_provider.embed_query("What is RAG?")
+            >>> results = provider.similarity_search_by_vector("file_123", vector, k=3)
+        """
+        if self.uses_global_index:
+            if not self._global_index.has_file(store_id):
+                raise ValueError(f"Vector store '{store_id}' not found")
+            return self._search_global([store_id], embedding, k, filter_dict, include_scores)
+
+        vector_store = self._resolve_store(store_id)
+        search_kwargs = {"k": k}
+        if filter_dict:
+            search_kwargs["filter"] = filter_dict
+
+        try:
+            results = []
+
+            if include_scores:
+                if hasattr(vector_store, "similarity_search_with_score_by_vector"):
+                    docs_with_scores = vector_store.similarity_search_with_score_by_vector(
+                        embedding, **search_kwargs
+                    )
+                else:
+                    docs_with_scores = vector_store.similarity_search_by_vector_with_relevance_scores(
+                        embedding, **search_kwargs
+                    )
+
+                scores = [score for _, score in docs_with_scores]
+                if hasattr(vector_store, "index"):
+                    scores = normalize_distances(scores, vector_store.index.metric_type)
+
+                for (doc, _), score in zip(docs_with_scores, scores):
+                    results.append({
+                        "content": doc.page_content,
+                        "metadata": doc.metadata,
+                        "score": float(score)
+                    })
+            else:
+                for doc in vector_store.similarity_search_by_vector(embedding, **search_kwargs):
+                    results.append({
+                        "content": doc.page_content,
+                        "metadata": doc.metadata
+                    })
+
+            logger.info(f"Found {len(results)} similar documents by vector for store '{store_id}'")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error during similarity search by vector: {str(e)}")
+            raise
+
+    def search_by_vectors(
+        self,
+        store_id: str,
+        query_vectors: np.ndarray,
+        k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Batched search: many query vectors against one store in one call
+
+        Args:
+            store_id: Vector store identifier
+            query_vectors: (m, d) float32 query matrix (a single vector is accepted)
+            k: Number of results per query
+
+        Returns:
+            One hit list per query row; hits are dicts with 'content',
+            'metadata' and 'score' (normalized distance, lower is better)
+
+        Raises:
+            ValueError: If the store does not exist
+
+        Example:
+            >>> queries = np.asarray(embedding_provider.embed_queries(questions), dtype=np.float32)
+            >>> per_question = provider.search_by_vectors("file_123", queries, k=5)
+        """
+        queries = np.ascontiguousarray(query_vectors, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+
+        if self.uses_global_index:
+            if not self._global_index.has_file(store_id):
+                raise ValueError(f"Vector store '{store_id}' not found")
+            return self._global_index.search_batch(queries, [store_id], k)
+
+        vector_store = self._resolve_store(store_id)
+
+        if not hasattr(vector_store, "index"):
+            # Non-FAISS backends: one search per query vector
+            return [
+                self.similarity_search_by_vector(store_id, query.tolist(), k=k, include_scores=True)
+                for query in queries
+            ]
+
+        index = vector_store.index
+        if index.ntotal == 0:
+            return [[] for _ in range(len(queries))]
+
+        distances, ids = index.search(queries, min(k, index.ntotal))
+
+        results = []
+        for distance_row, id_row in zip(distances.tolist(), ids.tolist()):
+            hits = []
+            distance_row = normalize_distances(distance_row, index.metric_type)
+            for distance, position in zip(distance_row, id_row):
+                if position < 0:
+                    continue
+                doc = vector_store.docstore.search(vector_store.index_to_docstore_id[position])
+                hits.append({
+                    "content": doc.page_content,
+                    "metadata": doc.metadata,
+                    "score": distance
+                })
+            results.append(hits)
+
+        return results
+
+    def search_stores_by_vectors(
+        self,
+        store_ids: List[str],
+        query_vectors: np.ndarray,
+        k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Batched search of many query vectors across several stores
+
+        Each store is searched once with the whole query matrix; per-query
+        hit lists from all stores are then heap-merged by normalized score
+        (see ranking.py), so later stores contribute on equal terms.
+
+        Args:
+            store_ids: Vector store identifiers (missing stores are skipped)
+            query_vectors: (m, d) float32 query matrix
+            k: Number of results per query overall
+
+        Returns:
+            One top-k hit list per query row, with 'score' on every hit
+        """
+        queries = np.ascontiguousarray(query_vectors, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+
+        if self.uses_global_index:
+            # One vectorized search over the union of the files' vectors
+            return self._global_index.search_batch(queries, store_ids, k)
+
+        # Per query: one sorted hit list per store
+        per_store: List[List[List[Dict[str, Any]]]] = [[] for _ in range(len(queries))]
+
+        for store_id in store_ids:
+            if not self.has_store(store_id):
+                logger.warning(f"Store not found for file_id '{store_id}', skipping")
+                continue
+
+            try:
+                per_query = self.search_by_vectors(store_id, queries, k=k)
+            except Exception as e:
+                logger.error(f"Error searching in store '{store_id}': {str(e)}")
+                continue
+
+            for hit_lists, store_hits in zip(per_store, per_query):
+                hit_lists.append(store_hits)
+
+        return [merge_top_k(hit_lists, k) for hit_lists in per_store]
+
+    def search_chunks_by_vectors(
+        self,
+        chunks: Dict[str, List[int]],
+        query_vectors: np.ndarray,
+        k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Batched search restricted to individual chunks of several stores
+
+        Only the listed chunks are candidates (an IDSelectorBatch for FAISS,
+        a chunk_index filter expression for Milvus), so a chunk is found
+        however low it ranks within its whole store.
+
+        Args:
+            chunks: store_id → chunk_index values to search (missing stores are skipped)
+            query_vectors: (m, d) float32 query matrix
+            k: Number of results per query overall
+
+        Returns:
+            One top-k hit list per query row, with 'score' on every hit
+        """
+        queries = np.ascontiguousarray(query_vectors, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+
+        if self.uses_global_index:
+            return self._global_index.search_chunks(queries, chunks, k)
+
+        per_store: List[List[List[Dict[str, Any]]]] = [[] for _ in range(len(queries))]
+
+        for store_id, chunk_indexes in chunks.items():
+            if not self.has_store(store_id):
+                logger.warning(f"Store not found for file_id '{store_id}', skipping")
+                continue
+
+            try:
+                per_query = self._search_store_chunks(store_id, set(chunk_indexes), queries, k)
+            except Exception as e:
+                logger.error(f"Error searching chunks in store '{store_id}': {str(e)}")
+                continue
+
+            for hit_lists, store_hits in zip(per_store, per_query):
+                hit_lists.append(store_hits)
+
+        return [merge_top_k(hit_lists, k) for hit_lists in per_store]
+
+    def _search_store_chunks(
+        self,
+        store_id: str,
+        chunk_indexes: set,
+        queries: np.ndarray,
+        k: int
+    ) -> List[List[Dict[str, Any]]]:
+        """Search one per-file store restricted to the given chunk_index values"""
+        import faiss
+
+        vector_store = self._resolve_store(store_id)
+
+        if not hasattr(vector_store, "index"):
+            # Non-FAISS backends: over-fetch the whole store and filter
+            return [
+                [
+                    hit for hit in self.similarity_search_by_vector(
+                        store_id, query.tolist(), k=k * 4, include_scores=True
+                    )
+                    if hit["metadata"].get("chunk_index") in chunk_indexes
+                ][:k]
+                for query in queries
+            ]
+
+        positions = np.asarray([
+            position for position, docstore_id in vector_store.index_to_docstore_id.items()
+            if vector_store.docstore.search(docstore_id).metadata.get("chunk_index") in chunk_indexes
+        ], dtype=np.int64)
+        if len(positions) == 0:
+            return [[] for _ in range(len(queries))]
+
+        index = vector_store.index
+        selector = faiss.IDSelectorBatch(len(positions), faiss.swig_ptr(positions))
+        distances, ids = index.search(
+            queries, min(k, len(positions)), params=faiss.SearchParameters(sel=selector)
+        )
+
+        results = []
+        for distance_row, id_row in zip(distances.tolist(), ids.tolist()):
+            hits = []
+            distance_row = normalize_distances(distance_row, index.metric_type)
+            for distance, position in zip(distance_row, id_row):
+                if position < 0:
+                    continue
+                doc = vector_store.docstore.search(vector_store.index_to_docstore_id[position])
+                hits.append({
+                    "content": doc.page_content,
+                    "metadata": doc.metadata,
+                    "score": distance
+                })
+            results.append(hits)
+
+        return results
+
+    def search_stores_by_vector(
+        self,
+        store_ids: List[str],
+        embedding: List[float],
+        k: int = 5,
+        include_scores: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Search several stores with one precomputed query embedding
+
+        The query is embedded once by the caller, so the cost of embedding
+        does not grow with the number of stores searched. Results from all
+        stores are ranked together by distance (lower is better for FAISS).
+
+        Args:
+            store_ids: Vector store identifiers (missing stores are skipped)
+            embedding: Query embedding vector
+            k: Number of results to return overall
+            include_scores: Whether to keep similarity scores in the results
+
+        Returns:
+            Top-k dicts with 'content', 'metadata', and optionally 'score'
+
+        Example:
+            >>> vector = await embedding_provider.aembed_query("What is RAG?")
+            >>> results = provider.search_stores_by_vector(["file_123", "file_456"], vector, k=5)
+        """
+        results = self.search_stores_by_vectors(store_ids, np.asarray([embedding]), k=k)[0]
+
+        if not include_scores:
+            for result in results:
+                del result["score"]
+
+        return results
+
+    def _embed_query(self, query: str) -> List[float]:
+        """Embed a string query for the shared index (no per-store embedding function)"""
+        if self._query_embedding is None:
+            from app.Providers.embedding_provider.client import get_embedding_provider
+            self._query_embedding = get_embedding_provider()
+
+        return self._query_embedding.embed_query(query)
+
+    def _search_global(
+        self,
+        store_ids: List[str],
+        embedding: List[float],
+        k: int,
+        filter_dict: Optional[dict],
+        include_scores: bool
+    ) -> List[Dict[str, Any]]:
+        """Search the shared index restricted to store_ids"""
+        # Metadata filters are applied after the search, so over-fetch
+        fetch_k = k * 4 if filter_dict else k
+        results = self._global_index.search(embedding, store_ids, k=fetch_k)
+
+        if filter_dict:
+            results = [
+                result for result in results
+                if all(result["metadata"].get(key) == value for key, value in filter_dict.items())
+            ][:k]
+
+        if not include_scores:
+            for result in results:
+                del result["score"]
+
+        logger.info(f"Found {len(results)} similar documents in shared index for {len(store_ids)} files")
+        return results
+
     def get_store(self, store_id: str) -> Any:
         """
         Get raw vector store instance
@@ -245,10 +954,147 @@ class VectorStoreProvider:
         Returns:
             Vector store instance (FAISS or Chroma)
         """
-        if store_id not in self._stores:
-            raise ValueError(f"Vector store '{store_id}' not found")
+        if self.uses_global_index:
+            raise ValueError(f"Raw store access is not available with the shared {self.backend} index")
+
+        return self._resolve_store(store_id)
+
+    def has_store(self, store_id: str) -> bool:
+        """
+        Check whether a vector store exists (loaded or persisted)
+
+        Args:
+            store_id: Vector store identifier
+
+        Returns:
+            True if the store exists
+        """
+        if self.uses_global_index:
+            return self._global_index.has_file(store_id)
+
+        return store_id in self._stores or (
+            self.persist_enabled and self._is_persisted(store_id)
+        )
+
+    def share_store(
+        self,
+        source_store_id: str,
+        store_id: str,
+        user_id: Optional[str] = None
+    ) -> str:
+        """
+        Register an existing vector store's vectors under another identifier
+
+        Nothing is re-embedded. Shared indexes (global FAISS, Milvus) register
+        the vectors for store_id; per-file FAISS stores get an in-memory clone
+        of the index and docstore, so appending to or deleting either
+        identifier never changes the other. The relabelled clone is persisted
+        on its own, so evicting or reloading it never brings back the
+        source's metadata.
 
-        return self._stores[store_id]
+        Copied chunk metadata is relabelled with store_id and its owner
+        (Milvus stores user_id as the tenant partition key).
+
+        Args:
+            source_store_id: Existing vector store identifier
+            store_id: New identifier for the same store
+            user_id: Owner of store_id
+
+        Returns:
+            str: The new store identifier
+
+        Raises:
+            ValueError: If the source store does not exist
+        """
+        if self.uses_global_index:
+            self._global_index.share(source_store_id, store_id, user_id=user_id)
+            self._save_global_index()
+        else:
+            self._stores[store_id] = self._clone_store(
+                self.get_store(source_store_id), store_id, user_id
+            )
+            if self.persist_enabled:
+                self.persist_store(store_id)
+            else:
+                self._admit_store(store_id)
+        logger.info(f"Shared vector store '{source_store_id}' as '{store_id}'")
+        return store_id
+
+    def replace_store(
+        self,
+        staging_store_id: str,
+        store_id: str,
+        user_id: Optional[str] = None
+    ) -> str:
+        """
+        Swap a fully built staging store in as store_id, then drop the staging id
+
+        Used for re-indexing: the new index is built under staging_store_id
+        while store_id keeps serving searches. FAISS stores switch in one
+        step (the persisted copy is replaced by rename); Milvus copies the
+        staged rows in before deleting the old ones, so store_id is never
+        empty in between.
+
+        Args:
+            staging_store_id: Store holding the new vectors
+            store_id: Store to replace
+            user_id: Owner of store_id (copied Milvus rows' partition key)
+
+        Returns:
+            str: The replaced store identifier
+
+        Raises:
+            ValueError: If the staging store does not exist
+        """
+        if self.uses_global_index:
+            self._global_index.replace(staging_store_id, store_id, user_id=user_id)
+            self._save_global_index()
+        else:
+            self._stores[store_id] = self._resolve_store(staging_store_id)
+            self._stores.pop(staging_store_id, None)
+            self._residency.forget(staging_store_id)
+
+            if self.persist_enabled:
+                self.persist_store(store_id)
+                shutil.rmtree(self._store_path(staging_store_id), ignore_errors=True)
+            else:
+                self._admit_store(store_id)
+
+        logger.info(f"Replaced vector store '{store_id}' with '{staging_store_id}'")
+        return store_id
+
+    def _clone_store(self, vector_store: Any, store_id: str, user_id: Optional[str]) -> Any:
+        """Independent copy of a FAISS store (index, docstore and id map) for store_id"""
+        if self.backend != "faiss":
+            raise ValueError(f"Sharing stores is not supported by the {self.backend} backend")
+
+        import faiss
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+        from langchain_community.vectorstores import FAISS
+        from langchain.docstore.document import Document
+
+        return FAISS(
+            embedding_function=vector_store.embedding_function,
+            index=faiss.clone_index(vector_store.index),
+            docstore=InMemoryDocstore({
+                doc_id: Document(
+                    page_content=doc.page_content,
+                    metadata=self._owned_metadata(doc.metadata, store_id, user_id)
+                )
+                for doc_id, doc in vector_store.docstore._dict.items()
+            }),
+            index_to_docstore_id=dict(vector_store.index_to_docstore_id)
+        )
+
+    @staticmethod
+    def _owned_metadata(metadata: Optional[dict], store_id: str, user_id: Optional[str]) -> dict:
+        """Copied chunk metadata relabelled with the target store and its owner"""
+        metadata = {**(metadata or {}), "file_id": store_id}
+        if user_id:
+            metadata["user_id"] = user_id
+        else:
+            metadata.pop("user_id", None)
+        return metadata
 
     def list_stores(self) -> List[str]:
         """
@@ -257,7 +1103,17 @@ class VectorStoreProvider:
         Returns:
             List of store identifiers
         """
-        return list(self._stores.keys())
+        if self.uses_global_index:
+            return self._global_index.list_files()
+
+        store_ids = list(self._stores.keys())
+        if self.persist_enabled and self._faiss_root.exists():
+            store_ids.extend(
+                path.name for path in self._faiss_root.iterdir()
+                if path.is_dir() and not path.name.startswith(".")
+                and path.name not in self._stores
+            )
+        return store_ids
 
     def delete_store(self, store_id: str):
         """
@@ -266,8 +1122,17 @@ class VectorStoreProvider:
         Args:
             store_id: Vector store identifier
         """
-        if store_id in self._stores:
-            del self._stores[store_id]
+        if self.uses_global_index:
+            if self._global_index.remove(store_id):
+                self._save_global_index()
+                logger.info(f"Deleted vectors of '{store_id}' from shared index")
+            else:
+                logger.warning(f"Attempted to delete non-existent store '{store_id}'")
+        elif self.has_store(store_id):
+            self._stores.pop(store_id, None)
+            self._residency.forget(store_id)
+            if self.persist_enabled:
+                shutil.rmtree(self._store_path(store_id), ignore_errors=True)
             logger.info(f"Deleted vector store '{store_id}'")
         else:
             logger.warning(f"Attempted to delete non-existent store '{store_id}'")
@@ -0,0 +1,408 @@
+"""
+Global FAISS Index
+
+One FAISS index shared by every file, used when FAISS_INDEX_LAYOUT="global".
+
+Each vector gets an int64 id; per-file id arrays map files to their vectors
+and an id-keyed docstore holds chunk text and metadata. A query across any
+set of files is a single vectorized search restricted by an IDSelectorBatch
+allow-list, so its cost depends on the number of vectors rather than the
+number of files.
+
+The index and its id map are saved together (save/load) so the layout
+survives a restart; VectorStoreProvider saves it whenever files change.
+"""
+
+import logging
+import pickle
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class GlobalFaissIndex:
+    """
+    Single flat L2 index with file-level allow-list filtering
+
+    Every file owns its vector ids: identical uploads (see
+    VectorStoreProvider.share_store) get a copy of the source's vectors with
+    relabelled metadata, so adding to or removing one file never touches
+    another.
+
+    Usage:
+        >>> index = GlobalFaissIndex()
+        >>> index.add("file_a", texts, vectors, metadatas)
+        >>> results = index.search(query_vector, ["file_a", "file_b"], k=5)
+    """
+
+    def __init__(self):
+        """Initialize an empty index (dimension fixed by the first add)"""
+        self._index: Optional[faiss.IndexIDMap2] = None
+        self.dimension: Optional[int] = None
+        self._next_id = 0
+
+        # file_id → arrays of its vector ids
+        self._file_ids: Dict[str, List[np.ndarray]] = {}
+
+        # vector id → (text, metadata)
+        self._docstore: Dict[int, Tuple[str, Dict[str, Any]]] = {}
+
+        self._lock = threading.RLock()
+
+    # =========================================================================
+    # File Management
+    # =========================================================================
+
+    def has_file(self, file_id: str) -> bool:
+        """Whether any vectors are registered for file_id"""
+        return file_id in self._file_ids
+
+    def list_files(self) -> List[str]:
+        """Registered file ids"""
+        return list(self._file_ids)
+
+    def file_vector_ids(self, file_id: str) -> np.ndarray:
+        """All vector ids belonging to a file"""
+        with self._lock:
+            parts = self._file_ids.get(file_id, [])
+            return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def add(
+        self,
+        file_id: str,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: Optional[List[dict]] = None
+    ) -> int:
+        """
+        Append vectors for a file
+
+        Args:
+            file_id: Owning file identifier
+            texts: Chunk texts
+            embeddings: Vectors aligned with texts
+            metadatas: Chunk metadata aligned with texts
+
+        Returns:
+            Number of vectors added
+        """
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(texts):
+            raise ValueError(
+                f"Length mismatch: texts({len(texts)}), embeddings({len(vectors)})"
+            )
+
+        metadatas = metadatas or [{} for _ in texts]
+
+        with self._lock:
+            if self._index is None:
+                self.dimension = vectors.shape[1]
+                self._index = faiss.IndexIDMap2(faiss.IndexFlatL2(self.dimension))
+                logger.info(f"Global FAISS index created: dimension={self.dimension}")
+
+            ids = np.arange(self._next_id, self._next_id + len(vectors), dtype=np.int64)
+            self._next_id += len(vectors)
+            self._index.add_with_ids(vectors, ids)
+
+            for vector_id, text, metadata in zip(ids.tolist(), texts, metadatas):
+                self._docstore[vector_id] = (text, metadata)
+
+            self._file_ids.setdefault(file_id, []).append(ids)
+
+        return len(vectors)
+
+    def share(self, source_file_id: str, file_id: str, user_id: Optional[str] = None):
+        """
+        Copy source_file_id's vectors to file_id (no re-embedding)
+
+        The copy gets its own vector ids and metadata relabelled with file_id
+        and its owner, as MilvusClient.share does.
+
+        Args:
+            source_file_id: File whose vectors are copied
+            file_id: File receiving the copy
+            user_id: Owner of file_id
+
+        Raises:
+            ValueError: If source_file_id has no vectors
+        """
+        with self._lock:
+            if source_file_id not in self._file_ids:
+                raise ValueError(f"Vector store '{source_file_id}' not found")
+
+            source_ids = self.file_vector_ids(source_file_id)
+            vectors = self._index.reconstruct_batch(source_ids)
+            entries = [self._docstore[vector_id] for vector_id in source_ids.tolist()]
+
+            self.remove(file_id)
+            self.add(
+                file_id,
+                [text for text, _ in entries],
+                vectors,
+                [self._owned_metadata(metadata, file_id, user_id) for _, metadata in entries]
+            )
+
+    def replace(self, source_file_id: str, file_id: str, user_id: Optional[str] = None):
+        """
+        Make source_file_id's vectors the vectors of file_id in one step
+
+        The source's vector ids are re-keyed (and their metadata relabelled)
+        under the lock, so searches see either the old or the new vectors of
+        file_id.
+
+        Args:
+            source_file_id: File holding the new vectors
+            file_id: File to replace
+            user_id: Owner of file_id
+
+        Raises:
+            ValueError: If source_file_id has no vectors
+        """
+        with self._lock:
+            if source_file_id not in self._file_ids:
+                raise ValueError(f"Vector store '{source_file_id}' not found")
+
+            self.remove(file_id)
+            self._file_ids[file_id] = self._file_ids.pop(source_file_id)
+            for vector_id in self.file_vector_ids(file_id).tolist():
+                text, metadata = self._docstore[vector_id]
+                self._docstore[vector_id] = (text, self._owned_metadata(metadata, file_id, user_id))
+
+    @staticmethod
+    def _owned_metadata(metadata: Optional[dict], file_id: str, user_id: Optional[str]) -> dict:
+        """Copied chunk metadata relabelled with the target file and its owner"""
+        metadata = {**(metadata or {}), "file_id": file_id}
+        if user_id:
+            metadata["user_id"] = user_id
+        else:
+            metadata.pop("user_id", None)
+        return metadata
+
+    def remove(self, file_id: str) -> bool:
+        """
+        Unregister a file and remove its vectors
+
+        Returns:
+            True if the file was registered
+        """
+        with self._lock:
+            parts = self._file_ids.pop(file_id, None)
+            if parts is None:
+                return False
+
+            if parts:
+                ids = np.concatenate(parts)
+                self._index.remove_ids(ids)
+                for vector_id in ids.tolist():
+                    self._docstore.pop(vector_id, None)
+
+            return True
+
+    # =========================================================================
+    # Persistence
+    # =========================================================================
+
+    def save(self, directory: Path):
+        """
+        Write the index and its id map / docstore to directory
+
+        Written to a temporary directory and renamed into place, so a crash
+        never leaves a half-written copy behind.
+
+        Args:
+            directory: Target directory (index.faiss + state.pkl)
+        """
+        directory = Path(directory)
+        staging = directory.parent / f".{directory.name}.{uuid.uuid4().hex}.tmp"
+        previous = directory.parent / f".{directory.name}.{uuid.uuid4().hex}.old"
+
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            staging.mkdir()
+            with self._lock:
+                if self._index is not None:
+                    faiss.write_index(self._index, str(staging / "index.faiss"))
+                with (staging / "state.pkl").open("wb") as f:
+                    pickle.dump({
+                        "dimension": self.dimension,
+                        "next_id": self._next_id,
+                        "file_ids": self._file_ids,
+                        "docstore": self._docstore
+                    }, f)
+
+            if directory.exists():
+                directory.rename(previous)
+            staging.rename(directory)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+            shutil.rmtree(previous, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: Path) -> "GlobalFaissIndex":
+        """
+        Read an index written by save(); an empty index if none was saved
+
+        Args:
+            directory: Directory passed to save()
+        """
+        directory = Path(directory)
+        index = cls()
+
+        state_path = directory / "state.pkl"
+        if not state_path.exists():
+            return index
+
+        with state_path.open("rb") as f:
+            state = pickle.load(f)
+
+        index.dimension = state["dimension"]
+        index._next_id = state["next_id"]
+        index._file_ids = state["file_ids"]
+        index._docstore = state["docstore"]
+        if (directory / "index.faiss").exists():
+            index._index = faiss.read_index(str(directory / "index.faiss"))
+
+        logger.info(
+            f"Loaded global FAISS index: {len(index._file_ids)} files, "
+            f"{index._index.ntotal if index._index is not None else 0} vectors"
+        )
+        return index
+
+    # =========================================================================
+    # Search
+    # =========================================================================
+
+    def search(
+        self,
+        embedding: List[float],
+        file_ids: List[str],
+        k: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        One vectorized search restricted to the given files
+
+        Args:
+            embedding: Query vector
+            file_ids: Files to search (unknown ids are ignored)
+            k: Number of results
+
+        Returns:
+            Up to k dicts with 'content', 'metadata' and 'score' (L2 distance)
+        """
+        return self.search_batch(np.asarray([embedding], dtype=np.float32), file_ids, k)[0]
+
+    def search_batch(
+        self,
+        query_vectors: np.ndarray,
+        file_ids: List[str],
+        k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search many query vectors at once, restricted to the given files
+
+        Args:
+            query_vectors: (m, d) float32 query matrix
+            file_ids: Files to search (unknown ids are ignored)
+            k: Number of results per query
+
+        Returns:
+            One hit list per query row (dicts with 'content', 'metadata', 'score')
+        """
+        queries = np.ascontiguousarray(query_vectors, dtype=np.float32)
+        empty: List[List[Dict[str, Any]]] = [[] for _ in range(len(queries))]
+
+        with self._lock:
+            if self._index is None or self._index.ntotal == 0:
+                return empty
+
+            parts = [part for f in set(file_ids) for part in self._file_ids.get(f, [])]
+            if not parts:
+                return empty
+
+            return self._search_ids(queries, np.concatenate(parts), k)
+
+    def search_chunks(
+        self,
+        query_vectors: np.ndarray,
+        chunks: Dict[str, List[int]],
+        k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search many query vectors, restricted to individual chunks of files
+
+        Args:
+            query_vectors: (m, d) float32 query matrix
+            chunks: file_id → chunk_index values to search (unknown files are ignored)
+            k: Number of results per query
+
+        Returns:
+            One hit list per query row (dicts with 'content', 'metadata', 'score')
+        """
+        queries = np.ascontiguousarray(query_vectors, dtype=np.float32)
+
+        with self._lock:
+            allowed = []
+            for file_id, chunk_indexes in chunks.items():
+                wanted = set(chunk_indexes)
+                allowed.extend(
+                    vector_id for vector_id in self.file_vector_ids(file_id).tolist()
+                    if self._docstore[vector_id][1].get("chunk_index") in wanted
+                )
+
+            if self._index is None or not allowed:
+                return [[] for _ in range(len(queries))]
+
+            return self._search_ids(queries, np.asarray(allowed, dtype=np.int64), k)
+
+    def _search_ids(
+        self,
+        queries: np.ndarray,
+        allowed: np.ndarray,
+        k: int
+    ) -> List[List[Dict[str, Any]]]:
+        """Search restricted to an allow-list of vector ids (caller holds the lock)"""
+        k = min(k, len(allowed))
+
+        if len(allowed) == self._index.ntotal:
+            distances, ids = self._index.search(queries, k)
+        else:
+            selector = faiss.IDSelectorBatch(len(allowed), faiss.swig_ptr(allowed))
+            params = faiss.SearchParameters(sel=selector)
+            distances, ids = self._index.search(queries, k, params=params)
+
+        results = []
+        for distance_row, id_row in zip(distances.tolist(), ids.tolist()):
+            hits = []
+            for distance, vector_id in zip(distance_row, id_row):
+                if vector_id < 0:
+                    continue
+                text, metadata = self._docstore[vector_id]
+                hits.append({
+                    "content": text,
+                    "metadata": dict(metadata),
+                    "score": float(distance)
+                })
+            results.append(hits)
+
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Index statistics
+
+        Returns:
+            Dict with files, vectors and dimension
+        """
+        with self._lock:
+            return {
+                "files": len(self._file_ids),
+                "vectors": self._index.ntotal if self._index is not None else 0,
+                "dimension": self.dimension
+            }
@@ -2,12 +2,33 @@
 Milvus Vector Database Client
 
 Enterprise-grade vector database for distributed storage and retrieval.
-Implements partition-based storage (one partition per file) for efficient management.
+
+Collection layouts (MILVUS_LAYOUT, fixed when the collection is created):
+- partition_key: user_id is the partition key (hashed into
+  MILVUS_NUM_PARTITIONS buckets), file_id and user_id carry scalar indexes,
+  and file selection is a filter expression. Scales to any number of files.
+- partition_per_file: legacy layout with one "file_{file_id}" partition
+  per file, bounded by Milvus' partition limit. Existing collections keep
+  working; see milvus_migration.py to move them to partition_key.
+
+Selected with VECTOR_STORE_BACKEND="milvus": VectorStoreProvider then uses
+this client as its shared index (same interface as GlobalFaissIndex), so
+every uvicorn worker sees the same vectors. Calls are blocking; callers run
+them off the event loop. A small pool of connections (MILVUS_POOL_SIZE)
+lets requests proceed in parallel and bounds how many run at once.
 """
 
+import json
 import logging
-from typing import List, Dict, Optional, Any
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Iterable, Iterator, Optional, Any, Tuple
+
+import numpy as np
 from pymilvus import (
+    BulkInsertState,
     connections,
     Collection,
     CollectionSchema,
@@ -16,6 +37,8 @@ from pymilvus import (
     utility
 )
 
+from app.Providers.vector_store_provider.milvus_index import MilvusIndexManager
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,14 +48,19 @@ class MilvusClient:
 
     Features:
     - Distributed vector storage with high performance
-    - Partition-based file management (one partition per file)
-    - IVF_FLAT indexing for efficient similarity search
-    - Automatic connection management and error recovery
+    - Partition-key multi-tenancy (user_id) with file_id filtering, or the
+      legacy one-partition-per-file layout
+    - Index type and search parameters adapted to the collection size
+      (see MilvusIndexManager)
+    - Pooled connections (one alias per connection) with a bounded
+      number of concurrent requests
 
     Architecture:
     - Collection: Global container (e.g., "document_embeddings")
-    - Partition: Per-file storage (e.g., "file_abc123")
-    - Fields: id, file_id, chunk_index, content, embedding, timestamp
+    - Partition: user_id hash bucket (partition_key) or per-file storage
+      (e.g., "file_abc123", partition_per_file)
+    - Fields: id, user_id, file_id, chunk_index, content, embedding,
+      timestamp, metadata
     """
 
     def __init__(
@@ -40,7 +68,10 @@ class MilvusClient:
         host: Optional[str] = None,
         port: Optional[str] = None,
         collection_name: Optional[str] = None,
-        dimension: Optional[int] = None
+        dimension: Optional[int] = None,
+        uri: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        layout: Optional[str] = None
     ):
         """
         Initialize Milvus Client
@@ -50,11 +81,18 @@ class MilvusClient:
             port: Milvus server port (default from settings)
             collection_name: Collection name (default from settings)
             dimension: Embedding dimension (default from settings)
+            uri: Full connection URI, overrides host/port (default: MILVUS_URI)
+            pool_size: Pooled connections (default: MILVUS_POOL_SIZE)
+            layout: Layout for a new collection (default: MILVUS_LAYOUT);
+                existing collections keep the layout they were created with
         """
         from app.core.config import settings
 
         self.host = host or settings.MILVUS_HOST
         self.port = port or settings.MILVUS_PORT
+        self.uri = uri or (None if host or port else settings.MILVUS_URI)
+        self.user = settings.MILVUS_USER
+        self.password = settings.MILVUS_PASSWORD
         self.collection_name = collection_name or settings.MILVUS_COLLECTION_NAME
         self.dimension = dimension or settings.EMBEDDING_DIMENSION
 
@@ -62,42 +100,138 @@ class MilvusClient:
         self.index_type = settings.MILVUS_INDEX_TYPE
         self.metric_type = settings.MILVUS_METRIC_TYPE
         self.nlist = settings.MILVUS_NLIST
+        self.layout = layout or settings.MILVUS_LAYOUT
+        self.num_partitions = settings.MILVUS_NUM_PARTITIONS
+
+        # Connection pool: aliases handed out one request at a time
+        self.pool_size = max(1, pool_size or settings.MILVUS_POOL_SIZE)
+        self.acquire_timeout = settings.MILVUS_ACQUIRE_TIMEOUT
+        self._alias_prefix = f"docai_{id(self):x}"
+        self._pool: "queue.Queue[str]" = queue.Queue()
+        self._collections: Dict[str, Collection] = {}
+        self._connect_lock = threading.Lock()
+
+        # Insert buffering: rows are sent in batches, flushed periodically
+        self.insert_batch_size = max(1, settings.MILVUS_INSERT_BATCH_SIZE)
+        self.bulk_insert_batch_size = max(1, settings.MILVUS_BULK_INSERT_BATCH_SIZE)
+        self.flush_interval = settings.MILVUS_FLUSH_INTERVAL
+        self._buffer: Dict[str, List[Dict[str, Any]]] = {}  # file_id → pending rows
+        self._buffered_rows = 0
+        self._unflushed_rows = 0
+        self._buffer_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._known_partitions = set()
+        self._stop_flushing = threading.Event()
+        self._flush_thread: Optional[threading.Thread] = None
+        self._ingest_stats = {
+            "vectors_inserted": 0,
+            "insert_batches": 0,
+            "insert_seconds": 0.0,
+            "flushes": 0
+        }
+
+        # Index selection and recall-tuned search parameters
+        self.index_manager = MilvusIndexManager(self)
 
         # Connection state
         self._connected = False
-        self._collection: Optional[Collection] = None
+        self._has_metadata_field = False
+        self._insert_fields: List[str] = []
 
         logger.info(
-            f"Milvus Client initialized: {self.host}:{self.port}, "
-            f"collection='{self.collection_name}', dimension={self.dimension}"
+            f"Milvus Client initialized: {self.uri or f'{self.host}:{self.port}'}, "
+            f"collection='{self.collection_name}', dimension={self.dimension}, "
+            f"pool_size={self.pool_size}"
         )
 
+    # =========================================================================
+    # Connection Management
+    # =========================================================================
+
+    def _connection_args(self) -> Dict[str, Any]:
+        """Keyword arguments for connections.connect"""
+        args: Dict[str, Any] = {"uri": self.uri} if self.uri else {"host": self.host, "port": self.port}
+        if self.user:
+            args["user"] = self.user
+            args["password"] = self.password or ""
+        return args
+
     def connect(self):
         """
-        Establish connection to Milvus server
+        Open the connection pool and initialize the collection
 
         Raises:
             Exception: If connection fails
         """
-        if self._connected:
-            logger.debug("Already connected to Milvus")
-            return
+        with self._connect_lock:
+            if self._connected:
+                logger.debug("Already connected to Milvus")
+                return
+
+            aliases = [f"{self._alias_prefix}_{i}" for i in range(self.pool_size)]
+
+            try:
+                for alias in aliases:
+                    connections.connect(alias=alias, **self._connection_args())
+                logger.info(
+                    f"Connected to Milvus at {self.uri or f'{self.host}:{self.port}'} "
+                    f"({self.pool_size} pooled connections)"
+                )
+
+                # Initialize or load collection once, then bind it to every alias
+                self._initialize_collection(aliases[0])
+                for alias in aliases:
+                    self._collections[alias] = Collection(self.collection_name, using=alias)
+                    self._pool.put(alias)
+
+                self._connected = True
+
+                if self.flush_interval > 0:
+                    self._stop_flushing.clear()
+                    self._flush_thread = threading.Thread(
+                        target=self._flush_loop, name="milvus-flush", daemon=True
+                    )
+                    self._flush_thread.start()
+
+            except Exception as e:
+                logger.error(f"Failed to connect to Milvus: {str(e)}")
+                for alias in aliases:
+                    try:
+                        connections.disconnect(alias)
+                    except Exception:
+                        pass
+                self._collections.clear()
+                raise
+
+    @contextmanager
+    def _acquire_alias(self) -> Iterator[str]:
+        """
+        Borrow a pooled connection alias for one request
+
+        Raises:
+            TimeoutError: If no connection frees up within MILVUS_ACQUIRE_TIMEOUT
+        """
+        if not self._connected:
+            self.connect()
 
         try:
-            connections.connect(
-                alias="default",
-                host=self.host,
-                port=self.port
+            alias = self._pool.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No Milvus connection available within {self.acquire_timeout}s "
+                f"({self.pool_size} requests in flight)"
             )
-            self._connected = True
-            logger.info(f"Connected to Milvus at {self.host}:{self.port}")
 
-            # Initialize or load collection
-            self._initialize_collection()
+        try:
+            yield alias
+        finally:
+            self._pool.put(alias)
 
-        except Exception as e:
-            logger.error(f"Failed to connect to Milvus: {str(e)}")
-            raise
+    @contextmanager
+    def _acquire(self) -> Iterator[Collection]:
+        """Borrow a pooled connection's collection handle for one request"""
+        with self._acquire_alias() as alias:
+            yield self._collections[alias]
 
     def is_service_available(self) -> bool:
         """
@@ -120,19 +254,19 @@ class MilvusClient:
 
         Note:
             This method uses a separate connection alias ('health_check')
-            to avoid interfering with the main connection.
+            to avoid interfering with the pooled connections.
         """
+        target = self.uri or f"{self.host}:{self.port}"
         try:
             # Attempt to establish a test connection with timeout
             connections.connect(
                 alias="health_check",
-                host=self.host,
-                port=self.port,
-                timeout=5  # 5 second timeout for health check
+                timeout=5,  # 5 second timeout for health check
+                **self._connection_args()
             )
 
             # Verify server is responding by getting version
-            server_version = utility.get_server_version()
+            server_version = utility.get_server_version(using="health_check")
             is_available = server_version is not None
 
             # Clean up: disconnect the health check connection
@@ -142,14 +276,9 @@ class MilvusClient:
                 pass  # Ignore disconnect errors
 
             if is_available:
-                logger.info(
-                    f"Milvus service is available at {self.host}:{self.port} "
-                    f"(version: {server_version})"
-                )
+                logger.info(f"Milvus service is available at {target} (version: {server_version})")
             else:
-                logger.warning(
-                    f"Milvus service at {self.host}:{self.port} is not responding properly"
-                )
+                logger.warning(f"Milvus service at {target} is not responding properly")
 
             return is_available
 
@@ -157,32 +286,42 @@ class MilvusClient:
             logger.warning(f"Milvus service health check failed: {str(e)}")
             return False
 
-    def _initialize_collection(self):
+    def _initialize_collection(self, alias: str):
         """
         Create collection if not exists, or load existing collection
 
         Collection Schema:
         - id: int64 (primary key, auto-increment)
-        - file_id: varchar(64) (file identifier)
+        - user_id: varchar(64) (owner; partition key, scalar index —
+          partition_key layout only)
+        - file_id: varchar(64) (file identifier; scalar index in partition_key layout)
         - chunk_index: int32 (chunk position in file)
-        - content: varchar(4096) (text content)
+        - content: varchar(65535) (text content)
         - embedding: float_vector(dim) (embedding vector)
         - timestamp: int64 (Unix timestamp)
+        - metadata: json (chunk metadata; absent in collections created
+          before it was added)
         """
-        if utility.has_collection(self.collection_name):
+        if utility.has_collection(self.collection_name, using=alias):
             # Load existing collection
-            self._collection = Collection(self.collection_name)
-            self._collection.load()
+            collection = Collection(self.collection_name, using=alias)
+            collection.load()
             logger.info(f"Loaded existing collection '{self.collection_name}'")
         else:
             # Create new collection
-            fields = [
-                FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
+            partition_key = self.layout == "partition_key"
+            fields = [FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True)]
+            if partition_key:
+                fields.append(
+                    FieldSchema(name="user_id", dtype=DataType.VARCHAR, max_length=64, is_partition_key=True)
+                )
+            fields += [
                 FieldSchema(name="file_id", dtype=DataType.VARCHAR, max_length=64),
                 FieldSchema(name="chunk_index", dtype=DataType.INT32),
-                FieldSchema(name="content", dtype=DataType.VARCHAR, max_length=4096),
+                FieldSchema(name="content", dtype=DataType.VARCHAR, max_length=65535),
                 FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=self.dimension),
-                FieldSchema(name="timestamp", dtype=DataType.INT64)
+                FieldSchema(name="timestamp", dtype=DataType.INT64),
+                FieldSchema(name="metadata", dtype=DataType.JSON)
             ]
 
             schema = CollectionSchema(
@@ -190,25 +329,84 @@ class MilvusClient:
                 description="Document embeddings for RAG system"
             )
 
-            self._collection = Collection(
+            collection = Collection(
                 name=self.collection_name,
-                schema=schema
+                schema=schema,
+                using=alias,
+                **({"num_partitions": self.num_partitions} if partition_key else {})
             )
 
-            # Create IVF_FLAT index on embedding field
-            index_params = {
-                "index_type": self.index_type,
-                "metric_type": self.metric_type,
-                "params": {"nlist": self.nlist}
-            }
-
-            self._collection.create_index(
+            # Index for an empty collection (FLAT when adaptive indexing is on)
+            index_type, build_params = self.index_manager.choose_index(0)
+            collection.create_index(
                 field_name="embedding",
-                index_params=index_params
+                index_params=self.index_manager.index_params(index_type, build_params),
+                index_name="embedding_idx"
+            )
+
+            # Scalar indexes for file and tenant filtering
+            if partition_key:
+                for field_name in ("file_id", "user_id"):
+                    collection.create_index(field_name=field_name, index_name=f"{field_name}_idx")
+
+            collection.load()
+            logger.info(
+                f"Created new collection '{self.collection_name}' with {index_type} index "
+                f"({self.layout} layout)"
             )
 
-            self._collection.load()
-            logger.info(f"Created new collection '{self.collection_name}' with {self.index_type} index")
+        self.index_manager.load_current(collection)
+
+        fields = collection.schema.fields
+        self.layout = (
+            "partition_key" if any(getattr(field, "is_partition_key", False) for field in fields)
+            else "partition_per_file"
+        )
+        self._has_metadata_field = any(field.name == "metadata" for field in fields)
+        self._insert_fields = [field.name for field in fields if not field.auto_id]
+
+        if self.layout == "partition_per_file":
+            logger.warning(
+                f"Collection '{self.collection_name}' uses one partition per file; "
+                "run milvus_migration to move it to the partition_key layout"
+            )
+
+    @property
+    def uses_partition_key(self) -> bool:
+        """Whether files are selected by filter (partition_key layout)"""
+        return self.layout == "partition_key"
+
+    @staticmethod
+    def file_filter(file_ids: List[str]) -> str:
+        """Filter expression selecting the given files"""
+        if len(file_ids) == 1:
+            return f"file_id == {json.dumps(file_ids[0])}"
+        return f"file_id in {json.dumps(list(file_ids))}"
+
+    @staticmethod
+    def chunk_filter(chunks: Dict[str, List[int]]) -> str:
+        """Filter expression selecting individual chunks of the given files"""
+        return " or ".join(
+            f"(file_id == {json.dumps(file_id)} and chunk_index in {json.dumps(sorted(set(indexes)))})"
+            for file_id, indexes in chunks.items()
+        )
+
+    @property
+    def _output_fields(self) -> List[str]:
+        """Scalar fields returned with search and query results"""
+        fields = ["file_id", "chunk_index", "content", "timestamp"]
+        if self._has_metadata_field:
+            fields.append("metadata")
+        return fields
+
+    # =========================================================================
+    # Partitions and Vectors
+    # =========================================================================
+
+    @staticmethod
+    def partition_name(file_id: str) -> str:
+        """Partition holding a file's vectors"""
+        return f"file_{file_id}"
 
     def create_partition(self, file_id: str) -> str:
         """
@@ -224,20 +422,18 @@ class MilvusClient:
             >>> partition_name = client.create_partition("abc123")
             >>> # partition_name = "file_abc123"
         """
-        if not self._connected:
-            self.connect()
+        partition_name = self.partition_name(file_id)
 
-        partition_name = f"file_{file_id}"
+        with self._acquire() as collection:
+            # Check if partition already exists
+            if collection.has_partition(partition_name):
+                logger.debug(f"Partition '{partition_name}' already exists")
+                return partition_name
 
-        # Check if partition already exists
-        if self._collection.has_partition(partition_name):
-            logger.debug(f"Partition '{partition_name}' already exists")
-            return partition_name
+            # Create new partition
+            collection.create_partition(partition_name)
 
-        # Create new partition
-        self._collection.create_partition(partition_name)
         logger.info(f"Created partition '{partition_name}' for file '{file_id}'")
-
         return partition_name
 
     def insert_vectors(
@@ -246,70 +442,326 @@ class MilvusClient:
         texts: List[str],
         embeddings: List[List[float]],
         chunk_indices: Optional[List[int]] = None,
-        timestamp: Optional[int] = None
-    ) -> List[int]:
+        timestamp: Optional[int] = None,
+        metadatas: Optional[List[dict]] = None
+    ) -> int:
         """
-        Insert vectors into file's partition
+        Buffer vectors for insertion
+
+        Rows are sent in MILVUS_INSERT_BATCH_SIZE batches once enough are
+        buffered, and sealed by the periodic flush (MILVUS_FLUSH_INTERVAL)
+        or an explicit commit(). Nothing is flushed per call.
 
         Args:
             file_id: File identifier
             texts: List of text chunks
-            embeddings: List of embedding vectors
+            embeddings: List of embedding vectors (or an (n, d) matrix)
             chunk_indices: Optional chunk indices (default: 0, 1, 2, ...)
             timestamp: Unix timestamp (default: current time)
+            metadatas: Optional chunk metadata (stored when the schema has it;
+                its "user_id" selects the partition key bucket)
 
         Returns:
-            List of inserted entity IDs
+            Number of rows buffered
 
         Example:
-            >>> ids = client.insert_vectors(
+            >>> client.insert_vectors(
             ...     file_id="abc123",
             ...     texts=["chunk1", "chunk2"],
             ...     embeddings=[[0.1, 0.2, ...], [0.3, 0.4, ...]]
             ... )
+            >>> client.commit()  # searchable and sealed
         """
-        if not self._connected:
-            self.connect()
-
-        # Create partition if not exists
-        partition_name = self.create_partition(file_id)
-
         # Prepare data
-        import time
         timestamp = timestamp or int(time.time())
         chunk_indices = chunk_indices or list(range(len(texts)))
+        metadatas = metadatas or [{} for _ in texts]
+        vectors = np.asarray(embeddings, dtype=np.float32)
 
         # Validate input lengths
-        if not (len(texts) == len(embeddings) == len(chunk_indices)):
+        if not (len(texts) == len(vectors) == len(chunk_indices) == len(metadatas)):
             raise ValueError(
                 f"Length mismatch: texts({len(texts)}), "
-                f"embeddings({len(embeddings)}), chunk_indices({len(chunk_indices)})"
+                f"embeddings({len(vectors)}), chunk_indices({len(chunk_indices)})"
             )
 
-        # Prepare entities
+        rows = self._make_rows(file_id, texts, vectors, chunk_indices, metadatas, timestamp)
+
+        with self._buffer_lock:
+            self._buffer.setdefault(file_id, []).extend(rows)
+            self._buffered_rows += len(rows)
+            send_now = self._buffered_rows >= self.insert_batch_size
+
+        if send_now:
+            self._send_buffer()
+
+        logger.debug(f"Buffered {len(texts)} vectors for file '{file_id}'")
+        return len(rows)
+
+    @staticmethod
+    def _make_rows(
+        file_id: str,
+        texts: List[str],
+        vectors: np.ndarray,
+        chunk_indices: List[int],
+        metadatas: List[dict],
+        timestamp: int
+    ) -> List[Dict[str, Any]]:
+        """Field values per row (every layout's fields; unused ones are ignored)"""
+        return [
+            {
+                "user_id": str(metadata.get("user_id") or ""),
+                "file_id": file_id,
+                "chunk_index": int(chunk_index),
+                "content": text,
+                "embedding": vector,
+                "timestamp": timestamp,
+                "metadata": metadata
+            }
+            for chunk_index, text, vector, metadata in zip(chunk_indices, texts, vectors, metadatas)
+        ]
+
+    def _send_buffer(self):
+        """Insert every buffered row, in size-capped batches per file"""
+        with self._send_lock:
+            with self._buffer_lock:
+                buffer, self._buffer = self._buffer, {}
+                self._buffered_rows = 0
+
+            pending = list(buffer.items())
+            for position, (file_id, rows) in enumerate(pending):
+                for start in range(0, len(rows), self.insert_batch_size):
+                    batch = rows[start:start + self.insert_batch_size]
+                    try:
+                        self._insert_rows(file_id, batch)
+                    except Exception:
+                        # Keep every unsent row (this file's rest and all
+                        # later files) for the next attempt
+                        self._restore_buffer([(file_id, rows[start:])] + pending[position + 1:])
+                        raise
+
+    def _restore_buffer(self, unsent: List[Tuple[str, List[Dict[str, Any]]]]):
+        """Put unsent rows back in front of rows buffered since the swap"""
+        with self._buffer_lock:
+            restored = {file_id: list(rows) for file_id, rows in unsent}
+            for file_id, rows in self._buffer.items():
+                restored.setdefault(file_id, []).extend(rows)
+            self._buffer = restored
+            self._buffered_rows += sum(len(rows) for _, rows in unsent)
+
+    def _insert_rows(self, file_id: str, rows: List[Dict[str, Any]]):
+        """One insert call for a batch of buffered rows"""
+        if not self._connected:
+            self.connect()
+
+        # Column-based insert in schema field order
         entities = [
-            [file_id] * len(texts),  # file_id
-            chunk_indices,            # chunk_index
-            texts,                    # content
-            embeddings,               # embedding
-            [timestamp] * len(texts)  # timestamp
+            np.stack([row[name] for row in rows]) if name == "embedding"
+            else [row[name] for row in rows]
+            for name in self._insert_fields
         ]
 
-        # Insert into partition
-        insert_result = self._collection.insert(
-            data=entities,
-            partition_name=partition_name
+        partition_name = None
+        if not self.uses_partition_key:
+            partition_name = self.partition_name(file_id)
+            if partition_name not in self._known_partitions:
+                self.create_partition(file_id)
+                self._known_partitions.add(partition_name)
+
+        started = time.perf_counter()
+        with self._acquire() as collection:
+            collection.insert(data=entities, partition_name=partition_name)
+        elapsed = time.perf_counter() - started
+
+        with self._buffer_lock:
+            self._ingest_stats["vectors_inserted"] += len(rows)
+            self._ingest_stats["insert_batches"] += 1
+            self._ingest_stats["insert_seconds"] += elapsed
+            self._unflushed_rows += len(rows)
+
+        logger.debug(
+            f"Inserted {len(rows)} vectors for file '{file_id}' "
+            f"({len(rows) / elapsed if elapsed else 0:.0f} vectors/s)"
+        )
+
+    def commit(self):
+        """
+        Send buffered rows and flush (seal) segments that received inserts
+
+        Called by the periodic flush thread, after a file finishes ingesting
+        (VectorStoreProvider.persist_store) and on disconnect.
+        """
+        self._send_buffer()
+
+        with self._buffer_lock:
+            unflushed, self._unflushed_rows = self._unflushed_rows, 0
+        if not unflushed:
+            return
+
+        started = time.perf_counter()
+        try:
+            with self._acquire() as collection:
+                collection.flush()
+        except Exception:
+            with self._buffer_lock:
+                self._unflushed_rows += unflushed
+            raise
+
+        self._ingest_stats["flushes"] += 1
+        logger.info(
+            f"Flushed {unflushed} vectors to collection '{self.collection_name}' "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+    def _flush_loop(self):
+        """
+        Background thread: commit every MILVUS_FLUSH_INTERVAL seconds and
+        let the index manager adapt the index to the new row count
+        """
+        while not self._stop_flushing.wait(self.flush_interval):
+            try:
+                self.commit()
+            except Exception as e:
+                logger.error(f"Periodic Milvus flush failed: {str(e)}")
+                continue
+
+            try:
+                self.index_manager.maybe_adapt()
+            except Exception as e:
+                logger.error(f"Milvus index adaptation failed: {str(e)}")
+
+    def bulk_import(
+        self,
+        file_id: str,
+        batches: Iterable[Tuple[List[str], Any, List[dict]]]
+    ) -> Dict[str, Any]:
+        """
+        Backfill a file's vectors without the insert buffer
+
+        Each (texts, embeddings, metadatas) batch is sent straight to Milvus
+        in MILVUS_BULK_INSERT_BATCH_SIZE chunks, with a single flush at the end.
+
+        Args:
+            file_id: File identifier
+            batches: Iterable of (texts, embeddings, metadatas) tuples
+
+        Returns:
+            Dict with vectors, seconds and vectors_per_second
+
+        Example:
+            >>> client.bulk_import("abc123", [(texts, matrix, metadatas)])
+        """
+        timestamp = int(time.time())
+
+        started = time.perf_counter()
+        total = 0
+        for texts, embeddings, metadatas in batches:
+            metadatas = metadatas or [{} for _ in texts]
+            chunk_indices = [int(meta.get("chunk_index", total + i)) for i, meta in enumerate(metadatas)]
+            rows = self._make_rows(
+                file_id, texts, np.asarray(embeddings, dtype=np.float32),
+                chunk_indices, metadatas, timestamp
+            )
+            for start in range(0, len(rows), self.bulk_insert_batch_size):
+                self._insert_rows(file_id, rows[start:start + self.bulk_insert_batch_size])
+            total += len(rows)
+
+        self.commit()
+        elapsed = time.perf_counter() - started
+
+        result = {
+            "vectors": total,
+            "seconds": round(elapsed, 3),
+            "vectors_per_second": round(total / elapsed, 1) if elapsed else 0.0
+        }
+        logger.info(
+            f"Bulk imported {total} vectors for file '{file_id}' "
+            f"({result['vectors_per_second']} vectors/s)"
         )
+        return result
 
-        # Flush to ensure data persistence
-        self._collection.flush()
+    def bulk_import_files(
+        self,
+        file_id: str,
+        files: List[str],
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Server-side bulk import of prepared row files for large backfills
+
+        Uses Milvus bulk insert: the files (row-based JSON or column-based
+        numpy, already uploaded to the Milvus object storage) are imported
+        by the server without passing through this process.
+
+        Args:
+            file_id: File identifier (target partition in the partition_per_file
+                layout; with partition_key the files carry file_id and user_id)
+            files: Object storage paths of the prepared files
+            timeout: Seconds to wait for completion (None = wait indefinitely)
 
+        Returns:
+            Dict with task_id, state, vectors, seconds and vectors_per_second
+
+        Raises:
+            RuntimeError: If the import task fails
+            TimeoutError: If it does not finish in time
+        """
+        partition_name = ""
+        if not self.uses_partition_key:
+            partition_name = self.create_partition(file_id)
+            self._known_partitions.add(partition_name)
+
+        started = time.perf_counter()
+        with self._acquire_alias() as alias:
+            task_id = utility.do_bulk_insert(
+                collection_name=self.collection_name,
+                partition_name=partition_name,
+                files=files,
+                using=alias
+            )
+
+        while True:
+            with self._acquire_alias() as alias:
+                state = utility.get_bulk_insert_state(task_id=task_id, using=alias)
+            if state.state == BulkInsertState.ImportFailed:
+                raise RuntimeError(f"Bulk import task {task_id} failed: {state.failed_reason}")
+            if state.state == BulkInsertState.ImportCompleted:
+                break
+            if timeout is not None and time.perf_counter() - started > timeout:
+                raise TimeoutError(f"Bulk import task {task_id} did not finish within {timeout}s")
+            time.sleep(1.0)
+
+        elapsed = time.perf_counter() - started
+        result = {
+            "task_id": task_id,
+            "state": state.state_name,
+            "vectors": state.row_count,
+            "seconds": round(elapsed, 3),
+            "vectors_per_second": round(state.row_count / elapsed, 1) if elapsed else 0.0
+        }
         logger.info(
-            f"Inserted {len(texts)} vectors into partition '{partition_name}' "
-            f"(file_id='{file_id}')"
+            f"Bulk import task {task_id} loaded {state.row_count} vectors for "
+            f"'{file_id}' ({result['vectors_per_second']} vectors/s)"
         )
+        return result
 
-        return insert_result.primary_keys
+    def get_ingest_stats(self) -> Dict[str, Any]:
+        """
+        Insert throughput statistics
+
+        Returns:
+            Dict with vectors_inserted, insert_batches, flushes,
+            buffered_rows and vectors_per_second (time spent in insert calls)
+        """
+        with self._buffer_lock:
+            stats = dict(self._ingest_stats)
+            stats["buffered_rows"] = self._buffered_rows
+
+        seconds = stats.pop("insert_seconds")
+        stats["vectors_per_second"] = (
+            round(stats["vectors_inserted"] / seconds, 1) if seconds else 0.0
+        )
+        return stats
 
     def search(
         self,
@@ -338,57 +790,90 @@ class MilvusClient:
             ... )
             >>> print(results[0]['content'], results[0]['score'])
         """
-        if not self._connected:
-            self.connect()
+        return self._search_partitions([query_embedding], file_ids, top_k, filters)[0]
 
-        # Determine partition names
-        if file_ids:
-            partition_names = [f"file_{fid}" for fid in file_ids]
-        else:
-            # Search all partitions
-            partition_names = [p.name for p in self._collection.partitions if p.name != "_default"]
-
-        if not partition_names:
-            logger.warning("No partitions to search")
-            return []
-
-        # Search parameters
-        search_params = {
-            "metric_type": self.metric_type,
-            "params": {"nprobe": min(16, self.nlist)}  # nprobe <= nlist
-        }
-
-        # Perform search
-        try:
-            search_results = self._collection.search(
-                data=[query_embedding],
-                anns_field="embedding",
-                param=search_params,
-                limit=top_k,
-                expr=filters,
-                partition_names=partition_names,
-                output_fields=["file_id", "chunk_index", "content", "timestamp"]
-            )
+    def _search_partitions(
+        self,
+        query_vectors: Any,
+        file_ids: Optional[List[str]],
+        top_k: int,
+        filters: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        One Milvus search for several query vectors; raw hit dicts per query
 
-            # Format results
-            results = []
-            for hits in search_results:
-                for hit in hits:
-                    results.append({
-                        "id": hit.id,
-                        "file_id": hit.entity.get("file_id"),
-                        "chunk_index": hit.entity.get("chunk_index"),
-                        "content": hit.entity.get("content"),
-                        "timestamp": hit.entity.get("timestamp"),
-                        "score": float(hit.distance)
-                    })
-
-            logger.info(f"Search returned {len(results)} results from {len(partition_names)} partitions")
-            return results
+        partition_key layout: files are selected with an indexed file_id
+        filter, and a user_id (when given) prunes the search to that user's
+        partition bucket. partition_per_file layout: files are partitions.
+        """
+        with self._acquire() as collection:
+            partition_names = None
+            expressions = [filters] if filters else []
+
+            if self.uses_partition_key:
+                if file_ids:
+                    expressions.append(self.file_filter(file_ids))
+                if user_id is not None:
+                    expressions.append(f"user_id == {json.dumps(user_id)}")
+                scope = f"{len(file_ids)} files" if file_ids else "all files"
+            else:
+                existing = {p.name for p in collection.partitions if p.name != "_default"}
+
+                # Determine partition names
+                if file_ids:
+                    partition_names = [
+                        self.partition_name(fid) for fid in file_ids
+                        if self.partition_name(fid) in existing
+                    ]
+                else:
+                    # Search all partitions
+                    partition_names = list(existing)
+
+                if not partition_names:
+                    logger.warning("No partitions to search")
+                    return [[] for _ in range(len(query_vectors))]
+                scope = f"{len(partition_names)} partitions"
+
+            # Search parameters (nprobe / ef tuned to the target recall)
+            search_params = self.index_manager.search_params(top_k)
+
+            # Perform search
+            try:
+                search_results = collection.search(
+                    data=np.asarray(query_vectors, dtype=np.float32).tolist(),
+                    anns_field="embedding",
+                    param=search_params,
+                    limit=top_k,
+                    expr=" and ".join(f"({e})" for e in expressions) or None,
+                    partition_names=partition_names,
+                    output_fields=self._output_fields
+                )
+            except Exception as e:
+                logger.error(f"Search failed: {str(e)}")
+                raise
+
+        # Format results
+        results = []
+        for hits in search_results:
+            results.append([
+                {
+                    "id": hit.id,
+                    "file_id": hit.entity.get("file_id"),
+                    "chunk_index": hit.entity.get("chunk_index"),
+                    "content": hit.entity.get("content"),
+                    "timestamp": hit.entity.get("timestamp"),
+                    "metadata": hit.entity.get("metadata") if self._has_metadata_field else None,
+                    "score": float(hit.distance)
+                }
+                for hit in hits
+            ])
 
-        except Exception as e:
-            logger.error(f"Search failed: {str(e)}")
-            raise
+        logger.info(
+            f"Search of {len(results)} queries returned "
+            f"{sum(len(hits) for hits in results)} results from {scope}"
+        )
+        return results
 
     def delete_partition(self, file_id: str):
         """
@@ -401,19 +886,44 @@ class MilvusClient:
             >>> client.delete_partition("abc123")
             >>> # Deletes partition "file_abc123"
         """
-        if not self._connected:
-            self.connect()
+        partition_name = self.partition_name(file_id)
 
-        partition_name = f"file_{file_id}"
+        # Unsent rows would recreate the partition
+        self._discard_buffered(file_id)
 
-        if not self._collection.has_partition(partition_name):
-            logger.warning(f"Partition '{partition_name}' does not exist")
-            return
+        with self._acquire() as collection:
+            if not collection.has_partition(partition_name):
+                logger.warning(f"Partition '{partition_name}' does not exist")
+                return
+
+            # A loaded partition must be released before it can be dropped
+            collection.partition(partition_name).release()
+            collection.drop_partition(partition_name)
 
-        # Drop partition
-        self._collection.drop_partition(partition_name)
         logger.info(f"Deleted partition '{partition_name}' for file '{file_id}'")
 
+    def delete_file_vectors(self, file_id: str):
+        """
+        Delete a file's vectors (partition_key layout: filtered delete)
+
+        Args:
+            file_id: File identifier
+        """
+        self._discard_buffered(file_id)
+
+        with self._acquire() as collection:
+            collection.delete(expr=self.file_filter([file_id]))
+
+        logger.info(f"Deleted vectors of file '{file_id}'")
+
+    def _discard_buffered(self, file_id: str) -> int:
+        """Drop a file's unsent rows; returns how many were dropped"""
+        with self._buffer_lock:
+            dropped = len(self._buffer.pop(file_id, []))
+            self._buffered_rows -= dropped
+        self._known_partitions.discard(self.partition_name(file_id))
+        return dropped
+
     def get_collection_stats(self) -> Dict[str, Any]:
         """
         Get collection statistics
@@ -425,29 +935,363 @@ class MilvusClient:
             >>> stats = client.get_collection_stats()
             >>> print(f"Total vectors: {stats['row_count']}")
         """
-        if not self._connected:
-            self.connect()
+        with self._acquire() as collection:
+            stats = {
+                "collection_name": self.collection_name,
+                "row_count": collection.num_entities,
+                "layout": self.layout,
+                "partitions": [p.name for p in collection.partitions],
+                "index_type": self.index_manager.index_type,
+                "metric_type": self.metric_type,
+                "dimension": self.dimension,
+                "index": self.index_manager.get_stats(),
+                "pool_size": self.pool_size,
+                "pool_available": self._pool.qsize(),
+                "ingest": self.get_ingest_stats()
+            }
+
+        return stats
+
+    # =========================================================================
+    # Shared Index Interface (used by VectorStoreProvider)
+    # =========================================================================
+
+    def has_file(self, file_id: str) -> bool:
+        """Whether file_id has vectors (stored or still buffered)"""
+        if file_id in self._buffer:
+            return True
+
+        with self._acquire() as collection:
+            if not self.uses_partition_key:
+                return collection.has_partition(self.partition_name(file_id))
+
+            rows = collection.query(
+                expr=self.file_filter([file_id]),
+                output_fields=["file_id"],
+                limit=1
+            )
+            return bool(rows)
 
-        stats = {
-            "collection_name": self.collection_name,
-            "row_count": self._collection.num_entities,
-            "partitions": [p.name for p in self._collection.partitions],
-            "index_type": self.index_type,
-            "metric_type": self.metric_type,
+    def list_files(self) -> List[str]:
+        """
+        File ids with stored vectors
+
+        partition_key layout: scans the file_id column, so this is meant for
+        maintenance tools rather than request paths.
+        """
+        if not self.uses_partition_key:
+            prefix = self.partition_name("")
+            with self._acquire() as collection:
+                return [
+                    p.name[len(prefix):] for p in collection.partitions
+                    if p.name.startswith(prefix)
+                ]
+
+        file_ids = set()
+        with self._acquire() as collection:
+            iterator = collection.query_iterator(
+                batch_size=10_000,
+                expr='file_id != ""',
+                output_fields=["file_id"]
+            )
+            while True:
+                rows = iterator.next()
+                if not rows:
+                    break
+                file_ids.update(row["file_id"] for row in rows)
+            iterator.close()
+
+        return sorted(file_ids)
+
+    def add(
+        self,
+        file_id: str,
+        texts: List[str],
+        embeddings: Any,
+        metadatas: Optional[List[dict]] = None
+    ) -> int:
+        """
+        Append vectors for a file
+
+        Args:
+            file_id: Owning file identifier
+            texts: Chunk texts
+            embeddings: Vectors aligned with texts ((n, d) matrix or lists)
+            metadatas: Chunk metadata aligned with texts
+
+        Returns:
+            Number of vectors added
+        """
+        metadatas = metadatas or [{} for _ in texts]
+        chunk_indices = [int(meta.get("chunk_index", i)) for i, meta in enumerate(metadatas)]
+
+        self.insert_vectors(
+            file_id=file_id,
+            texts=texts,
+            embeddings=embeddings,
+            chunk_indices=chunk_indices,
+            metadatas=metadatas
+        )
+        return len(texts)
+
+    def iter_file_rows(
+        self,
+        file_id: str,
+        batch_size: int = 1000,
+        output_fields: Optional[List[str]] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stored rows of a file (with embeddings), in batches
+
+        Holds a pooled connection while iterating.
+
+        Args:
+            file_id: File identifier
+            batch_size: Rows per batch
+            output_fields: Fields to return (default: every stored field)
+
+        Yields:
+            Lists of row dicts (file_id, chunk_index, content, timestamp,
+            metadata when present, embedding)
+        """
+        with self._acquire() as collection:
+            iterator = collection.query_iterator(
+                batch_size=batch_size,
+                expr=self.file_filter([file_id]),
+                output_fields=output_fields or self._output_fields + ["embedding"],
+                partition_names=(
+                    None if self.uses_partition_key
+                    else [self.partition_name(file_id)]
+                )
+            )
+            try:
+                while True:
+                    rows = iterator.next()
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                iterator.close()
+
+    def count_file_vectors(self, file_id: str) -> int:
+        """Number of stored vectors for a file"""
+        with self._acquire() as collection:
+            rows = collection.query(
+                expr=self.file_filter([file_id]),
+                output_fields=["count(*)"],
+                partition_names=(
+                    None if self.uses_partition_key
+                    else [self.partition_name(file_id)]
+                )
+            )
+        return int(rows[0]["count(*)"]) if rows else 0
+
+    def share(self, source_file_id: str, file_id: str, user_id: Optional[str] = None):
+        """
+        Copy source_file_id's vectors to file_id
+
+        Milvus partitions cannot be aliased, so identical uploads get a copy
+        (no re-embedding).
+
+        Args:
+            source_file_id: File whose vectors are copied
+            file_id: File receiving the copy
+            user_id: Owner of file_id (the copy's partition key)
+
+        Raises:
+            ValueError: If source_file_id has no vectors
+        """
+        if not self.has_file(source_file_id):
+            raise ValueError(f"Vector store '{source_file_id}' not found")
+
+        self.remove(file_id)
+        self._copy_file_rows(source_file_id, file_id, user_id)
+        self.commit()
+
+    def replace(self, source_file_id: str, file_id: str, user_id: Optional[str] = None):
+        """
+        Make source_file_id's vectors the vectors of file_id, then drop the source
+
+        Rows cannot be renamed, so the new rows are copied in and committed
+        before the old ones are deleted by primary key: searches see the old
+        or the new version (briefly both), never neither.
+
+        Args:
+            source_file_id: Staging file holding the new vectors
+            file_id: File whose vectors are replaced
+            user_id: Owner of file_id (the copy's partition key)
+
+        Raises:
+            ValueError: If source_file_id has no vectors
+        """
+        # Staged rows may still be buffered
+        self.commit()
+        if not self.has_file(source_file_id):
+            raise ValueError(f"Vector store '{source_file_id}' not found")
+
+        old_ids = [
+            row["id"]
+            for rows in list(self.iter_file_rows(file_id, output_fields=["id"]))
+            for row in rows
+        ]
+
+        self._copy_file_rows(source_file_id, file_id, user_id)
+        self.commit()
+
+        with self._acquire() as collection:
+            for start in range(0, len(old_ids), self.insert_batch_size):
+                collection.delete(expr=f"id in {old_ids[start:start + self.insert_batch_size]}")
+
+        self.remove(source_file_id)
+        logger.info(
+            f"Replaced vectors of file '{file_id}' with '{source_file_id}' "
+            f"({len(old_ids)} old vectors deleted)"
+        )
+
+    def _copy_file_rows(self, source_file_id: str, file_id: str, user_id: Optional[str]):
+        """Insert a copy of source_file_id's stored rows under file_id, owned by user_id"""
+        # Read everything first: inserting needs pooled connections too
+        for rows in list(self.iter_file_rows(source_file_id)):
+            self.insert_vectors(
+                file_id=file_id,
+                texts=[row["content"] for row in rows],
+                embeddings=[row["embedding"] for row in rows],
+                chunk_indices=[row["chunk_index"] for row in rows],
+                metadatas=[
+                    self._owned_metadata(row.get("metadata"), file_id, user_id)
+                    for row in rows
+                ]
+            )
+
+    @staticmethod
+    def _owned_metadata(metadata: Optional[dict], file_id: str, user_id: Optional[str]) -> dict:
+        """Copied row metadata relabelled with the target file and its owner"""
+        metadata = {**(metadata or {}), "file_id": file_id}
+        if user_id:
+            metadata["user_id"] = user_id
+        else:
+            metadata.pop("user_id", None)
+        return metadata
+
+    def remove(self, file_id: str) -> bool:
+        """
+        Delete a file's vectors (drop its partition, or a filtered delete)
+
+        Returns:
+            True if the file had vectors
+        """
+        if not self.has_file(file_id):
+            return False
+
+        if self.uses_partition_key:
+            self.delete_file_vectors(file_id)
+        else:
+            self.delete_partition(file_id)
+        return True
+
+    def search_batch(
+        self,
+        query_vectors: np.ndarray,
+        file_ids: List[str],
+        k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search many query vectors at once, restricted to the given files
+
+        Args:
+            query_vectors: (m, d) float32 query matrix
+            file_ids: Files to search (files without a partition are ignored)
+            k: Number of results per query
+
+        Returns:
+            One hit list per query row (dicts with 'content', 'metadata' and
+            'score' as a lower-is-better distance)
+        """
+        if not file_ids:
+            return [[] for _ in range(len(query_vectors))]
+
+        return self._format_hits(self._search_partitions(query_vectors, file_ids, k))
+
+    def search_chunks(
+        self,
+        query_vectors: np.ndarray,
+        chunks: Dict[str, List[int]],
+        k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search many query vectors, restricted to individual chunks of files
+
+        Args:
+            query_vectors: (m, d) float32 query matrix
+            chunks: file_id → chunk_index values to search
+            k: Number of results per query
+
+        Returns:
+            One hit list per query row, as search_batch
+        """
+        if not chunks:
+            return [[] for _ in range(len(query_vectors))]
+
+        return self._format_hits(
+            self._search_partitions(query_vectors, list(chunks), k, filters=self.chunk_filter(chunks))
+        )
+
+    def _format_hits(self, raw_results: List[List[Dict[str, Any]]]) -> List[List[Dict[str, Any]]]:
+        """Raw hit dicts → search_batch hits (metadata filled in, lower-is-better score)"""
+        similarity_metric = self.metric_type.upper() in ("IP", "COSINE")
+
+        results = []
+        for raw_hits in raw_results:
+            hits = []
+            for hit in raw_hits:
+                metadata = dict(hit["metadata"] or {})
+                metadata.setdefault("file_id", hit["file_id"])
+                metadata.setdefault("chunk_index", hit["chunk_index"])
+                hits.append({
+                    "content": hit["content"],
+                    "metadata": metadata,
+                    "score": 1.0 - hit["score"] if similarity_metric else hit["score"]
+                })
+            results.append(hits)
+
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Index statistics
+
+        Returns:
+            Dict with files, vectors and dimension
+        """
+        stats = self.get_collection_stats()
+        return {
+            "files": len(self.list_files()),
+            "vectors": stats["row_count"],
             "dimension": self.dimension
         }
 
-        return stats
-
     def disconnect(self):
         """
-        Release collection and disconnect
-        """
-        if self._collection:
-            self._collection.release()
+        Close pooled connections
 
+        The collection stays loaded on the server: other workers share it.
+        """
         if self._connected:
-            connections.disconnect(alias="default")
+            self._stop_flushing.set()
+            try:
+                self.commit()
+            except Exception as e:
+                logger.error(f"Final Milvus flush failed: {str(e)}")
+
+        with self._connect_lock:
+            if not self._connected:
+                return
+
+            for alias in self._collections:
+                connections.disconnect(alias=alias)
+
+            self._collections.clear()
+            self._pool = queue.Queue()
             self._connected = False
             logger.info("Disconnected from Milvus")
 
@@ -0,0 +1,515 @@
+"""
+Adaptive Milvus Index Management
+
+Picks the collection's index type from its row count and tunes the search
+parameter (nprobe for IVF indexes, ef for HNSW) to a target recall.
+
+Index tiers (MILVUS_INDEX_AUTO=True):
+- FLAT below MILVUS_FLAT_MAX_ROWS: exact search, no build cost
+- HNSW below MILVUS_HNSW_MAX_ROWS: high recall at low latency
+- IVF_FLAT below MILVUS_IVF_PQ_MIN_ROWS: nlist ≈ 4·√rows
+- IVF_PQ beyond: compressed codes for very large collections
+
+Tiers only move down once the row count falls below half of a threshold,
+so deletions around a boundary do not cause rebuild loops.
+
+A new tier's index is built under a new name while the collection stays
+loaded; the collection is only released to drop the old index and load the
+new one. Adaptation runs in one process at a time (MILVUS_INDEX_LOCK_FILE),
+however many uvicorn workers share the collection.
+
+Recall tuning samples stored vectors as a probe set and picks the smallest
+search parameter reaching MILVUS_TARGET_RECALL@k. Ground truth uses exact
+distances: a wide candidate pool from an exhaustive search (nprobe = nlist,
+or a large ef) is re-ranked in NumPy on the raw stored vectors, so quantized
+indexes (IVF_PQ) are not measured against themselves. Each probe's own
+vector is excluded from both the ground truth and the measured results.
+"""
+
+import logging
+import math
+import random
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking (single worker only)
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Tier order: a collection only moves to a later tier as it grows
+_TIERS = ("FLAT", "HNSW", "IVF_FLAT", "IVF_PQ")
+
+# ef sweep for HNSW (upper end doubles as the ground-truth setting)
+_HNSW_EF_CANDIDATES = (16, 32, 64, 128, 256, 512)
+_HNSW_EF_EXHAUSTIVE = 2048
+
+# Ground-truth candidates per probe (× k), re-ranked with exact distances
+_TRUTH_POOL_FACTOR = 10
+# Milvus search limit (topk) and ids per vector fetch
+_MAX_SEARCH_LIMIT = 16384
+_FETCH_BATCH = 1000
+
+
+class MilvusIndexManager:
+    """
+    Chooses, rebuilds and tunes the index of a MilvusClient's collection
+
+    Usage:
+        >>> manager = MilvusIndexManager(client)
+        >>> manager.maybe_adapt()              # rebuild + retune if the tier changed
+        >>> params = manager.search_params()   # used by every search
+    """
+
+    def __init__(self, client: Any):
+        """
+        Initialize Index Manager
+
+        Args:
+            client: MilvusClient owning the collection
+        """
+        from app.core.config import settings
+
+        self.client = client
+        self.auto = settings.MILVUS_INDEX_AUTO
+        self.flat_max_rows = settings.MILVUS_FLAT_MAX_ROWS
+        self.hnsw_max_rows = settings.MILVUS_HNSW_MAX_ROWS
+        self.ivf_pq_min_rows = settings.MILVUS_IVF_PQ_MIN_ROWS
+        self.target_recall = settings.MILVUS_TARGET_RECALL
+        self.probe_size = settings.MILVUS_RECALL_PROBE_SIZE
+        self.probe_k = settings.TOP_K_RESULTS
+        self.check_interval = settings.MILVUS_INDEX_CHECK_INTERVAL
+        self.lock_file = Path(settings.MILVUS_INDEX_LOCK_FILE)
+        self.offline_rebuild = settings.MILVUS_INDEX_OFFLINE_REBUILD
+
+        # Current index as built on the server, and the tuned search parameter
+        self.index_type: Optional[str] = None
+        self.index_name = "embedding_idx"
+        self.build_params: Dict[str, Any] = {}
+        self.search_param: Dict[str, Any] = {}
+        self.measured_recall: Optional[float] = None
+        self._last_check = 0.0
+        # Tier the server refused to build online (not retried)
+        self._refused_tier: Optional[str] = None
+
+    # =========================================================================
+    # Index Selection
+    # =========================================================================
+
+    def choose_index(self, row_count: int) -> Tuple[str, Dict[str, Any]]:
+        """
+        Index type and build parameters for a collection size
+
+        Args:
+            row_count: Number of vectors in the collection
+
+        Returns:
+            (index_type, build params)
+        """
+        if not self.auto:
+            index_type = self.client.index_type
+            build_params = self._build_params(index_type, row_count)
+            if "nlist" in build_params:
+                build_params["nlist"] = self.client.nlist
+            return index_type, build_params
+
+        tier = self._tier_for(row_count)
+
+        # Hysteresis: stay on a larger tier until well below its threshold
+        if self.index_type in _TIERS and _TIERS.index(self.index_type) > _TIERS.index(tier):
+            shrunk_tier = self._tier_for(row_count * 2)
+            if _TIERS.index(shrunk_tier) >= _TIERS.index(self.index_type):
+                tier = self.index_type
+
+        return tier, self._build_params(tier, row_count)
+
+    def _tier_for(self, row_count: int) -> str:
+        """Index tier for a row count, without hysteresis"""
+        if row_count < self.flat_max_rows:
+            return "FLAT"
+        if row_count < self.hnsw_max_rows:
+            return "HNSW"
+        if row_count < self.ivf_pq_min_rows:
+            return "IVF_FLAT"
+        return "IVF_PQ"
+
+    def _build_params(self, index_type: str, row_count: int) -> Dict[str, Any]:
+        """Build parameters scaled to the collection size"""
+        if index_type == "FLAT":
+            return {}
+        if index_type == "HNSW":
+            return {"M": 16, "efConstruction": 200}
+
+        # IVF: ~4·√n lists, at least 39 vectors per list for k-means training
+        nlist = int(4 * math.sqrt(max(row_count, 1)))
+        nlist = max(16, min(65536, nlist, max(row_count // 39, 16)))
+        if index_type == "IVF_PQ":
+            return {"nlist": nlist, "m": self._pq_subquantizers(), "nbits": 8}
+        return {"nlist": nlist}
+
+    def _pq_subquantizers(self) -> int:
+        """Largest divisor of the dimension giving sub-vectors of ≥ 4 dims"""
+        dimension = self.client.dimension
+        for m in range(max(dimension // 4, 1), 0, -1):
+            if dimension % m == 0:
+                return m
+        return 1
+
+    def index_params(self, index_type: str, build_params: Dict[str, Any]) -> Dict[str, Any]:
+        """create_index parameters"""
+        return {
+            "index_type": index_type,
+            "metric_type": self.client.metric_type,
+            "params": build_params
+        }
+
+    # =========================================================================
+    # Rebuild
+    # =========================================================================
+
+    def load_current(self, collection: Any):
+        """
+        Read the index the server currently has on the embedding field
+
+        When it differs from the cached one (another process rebuilt it),
+        search parameters are reset to the new type's defaults and recall
+        is re-measured.
+        """
+        previous = (self.index_name, self.index_type)
+
+        for index in collection.indexes:
+            if index.field_name == "embedding":
+                self.index_name = index.index_name
+                self.index_type = index.params.get("index_type")
+                params = index.params.get("params", {})
+                self.build_params = params if isinstance(params, dict) else {}
+                break
+
+        if (self.index_name, self.index_type) != previous:
+            self.search_param = self._default_search_param()
+            self.measured_recall = None
+        elif not self.search_param:
+            self.search_param = self._default_search_param()
+
+    @contextmanager
+    def _adaptation_lock(self) -> Iterator[bool]:
+        """Non-blocking cross-process lock; yields whether it was acquired"""
+        if fcntl is None:
+            yield True
+            return
+
+        self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+        with self.lock_file.open("a+b") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def maybe_adapt(self, force: bool = False) -> bool:
+        """
+        Rebuild the index if the row count moved it to another tier
+
+        Checked at most every MILVUS_INDEX_CHECK_INTERVAL seconds (unless
+        forced); the search parameter is re-tuned after a rebuild or when it
+        has not been measured yet. Only the process holding the adaptation
+        lock rebuilds; every process tunes its own search parameter,
+        including after a rebuild picked up from another process.
+
+        Args:
+            force: Check regardless of the interval
+
+        Returns:
+            True if the index was rebuilt
+        """
+        if not force and time.monotonic() - self._last_check < self.check_interval:
+            return False
+        self._last_check = time.monotonic()
+
+        with self._adaptation_lock() as acquired:
+            # Reading the current index also picks up other processes' rebuilds
+            with self.client._acquire() as collection:
+                row_count = collection.num_entities
+                self.load_current(collection)
+
+            rebuilt = False
+            if acquired:
+                index_type, build_params = self.choose_index(row_count)
+                if index_type != self.index_type and index_type != self._refused_tier:
+                    rebuilt = self._rebuild(index_type, build_params, row_count)
+
+            if rebuilt or self.measured_recall is None:
+                self.tune(row_count)
+
+        return rebuilt
+
+    def _rebuild(self, index_type: str, build_params: Dict[str, Any], row_count: int) -> bool:
+        """
+        Build the new embedding index next to the current one, then switch
+
+        The collection stays loaded (searchable) during the build; it is
+        released only to drop the old index and load the new one.
+
+        Returns:
+            True if the index was rebuilt
+        """
+        from pymilvus import MilvusException, utility
+
+        logger.info(
+            f"Rebuilding Milvus index on '{self.client.collection_name}': "
+            f"{self.index_type} → {index_type} {build_params} ({row_count} rows)"
+        )
+        started = time.perf_counter()
+        new_name = f"embedding_idx_{int(time.time())}"
+        index_params = self.index_params(index_type, build_params)
+
+        with self.client._acquire_alias() as alias:
+            collection = self.client._collections[alias]
+            try:
+                collection.create_index(
+                    field_name="embedding", index_params=index_params, index_name=new_name
+                )
+            except MilvusException as e:
+                if not self.offline_rebuild:
+                    # One index per field: an online build is impossible here
+                    self._refused_tier = index_type
+                    logger.warning(
+                        f"Milvus refused to build {index_type} next to the current index "
+                        f"({str(e)}); keeping {self.index_type}. Set "
+                        f"MILVUS_INDEX_OFFLINE_REBUILD to rebuild with search downtime"
+                    )
+                    return False
+
+                logger.warning(f"Online index build refused ({str(e)}); rebuilding offline")
+                collection.release()
+                try:
+                    # Named: partition_key collections also index scalar fields
+                    collection.drop_index(index_name=self.index_name)
+                    collection.create_index(
+                        field_name="embedding", index_params=index_params, index_name=new_name
+                    )
+                finally:
+                    collection.load()
+            else:
+                utility.wait_for_index_building_complete(
+                    self.client.collection_name, index_name=new_name, using=alias
+                )
+                logger.info(
+                    f"Built {index_type} index in {time.perf_counter() - started:.1f}s, switching"
+                )
+
+                collection.release()
+                try:
+                    collection.drop_index(index_name=self.index_name)
+                finally:
+                    collection.load()
+
+        self.index_name = new_name
+        self.index_type = index_type
+        self.build_params = build_params
+        self.search_param = self._default_search_param()
+        self.measured_recall = None
+        self._refused_tier = None
+
+        logger.info(f"Milvus index rebuilt as {index_type} in {time.perf_counter() - started:.1f}s")
+        return True
+
+    # =========================================================================
+    # Search Parameters
+    # =========================================================================
+
+    def _default_search_param(self) -> Dict[str, Any]:
+        """Untuned search parameter for the current index"""
+        if self.index_type in ("IVF_FLAT", "IVF_PQ", "IVF_SQ8"):
+            return {"nprobe": min(16, self.build_params.get("nlist", 16))}
+        if self.index_type == "HNSW":
+            return {"ef": 64}
+        return {}
+
+    def search_params(self, k: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Search parameters for collection.search
+
+        Args:
+            k: Result count (HNSW requires ef ≥ k)
+
+        Returns:
+            Dict with metric_type and params
+        """
+        params = dict(self.search_param)
+        if "ef" in params and k:
+            params["ef"] = max(params["ef"], k)
+        return {"metric_type": self.client.metric_type, "params": params}
+
+    def _candidates(self) -> Tuple[str, List[int], int]:
+        """(parameter name, ascending sweep values, exhaustive value)"""
+        if self.index_type == "HNSW":
+            return "ef", list(_HNSW_EF_CANDIDATES), _HNSW_EF_EXHAUSTIVE
+
+        nlist = int(self.build_params.get("nlist", 16))
+        sweep = []
+        nprobe = 1
+        while nprobe < nlist:
+            sweep.append(nprobe)
+            nprobe *= 2
+        sweep.append(nlist)
+        return "nprobe", sweep, nlist
+
+    def tune(self, row_count: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Pick the cheapest search parameter reaching MILVUS_TARGET_RECALL
+
+        Args:
+            row_count: Collection size (fetched when omitted)
+
+        Returns:
+            Dict with index_type, search_param and recall
+        """
+        if self.index_type not in ("HNSW", "IVF_FLAT", "IVF_PQ", "IVF_SQ8"):
+            # FLAT is exact
+            self.search_param = {}
+            self.measured_recall = 1.0
+            return self.get_stats()
+
+        probes = self._sample_probes(row_count)
+        if len(probes) == 0:
+            return self.get_stats()
+
+        name, sweep, exhaustive = self._candidates()
+        k = self.probe_k
+
+        truth = self._exact_truth(probes, name, exhaustive, k)
+
+        chosen, recall = sweep[-1], None
+        for value in sweep:
+            recall = self._recall(truth, self._probe_search(probes, {name: value}, k))
+            if recall >= self.target_recall:
+                chosen = value
+                break
+
+        self.search_param = {name: chosen}
+        self.measured_recall = recall
+
+        logger.info(
+            f"Tuned Milvus {self.index_type} search: {name}={chosen} "
+            f"(recall@{k}={recall:.3f}, target {self.target_recall}, {len(probes)} probes)"
+        )
+        return self.get_stats()
+
+    def _sample_probes(self, row_count: Optional[int]) -> List[Tuple[int, np.ndarray]]:
+        """Random stored vectors (id, vector) used as probe queries"""
+        with self.client._acquire() as collection:
+            if row_count is None:
+                row_count = collection.num_entities
+
+            # Sample from a bounded window of rows to keep the query cheap
+            rows = collection.query(
+                expr="id >= 0",
+                output_fields=["id", "embedding"],
+                limit=min(max(self.probe_size * 20, 1000), 16384)
+            )
+
+        sample = random.sample(rows, min(self.probe_size, len(rows)))
+        return [(row["id"], np.asarray(row["embedding"], dtype=np.float32)) for row in sample]
+
+    def _probe_search(
+        self,
+        probes: List[Tuple[int, np.ndarray]],
+        param: Dict[str, int],
+        k: int
+    ) -> List[List[int]]:
+        """Result ids per probe (own id removed) for one parameter setting"""
+        with self.client._acquire() as collection:
+            results = collection.search(
+                data=[vector.tolist() for _, vector in probes],
+                anns_field="embedding",
+                param={"metric_type": self.client.metric_type, "params": param},
+                limit=k + 1
+            )
+
+        return [
+            [hit.id for hit in hits if hit.id != probe_id][:k]
+            for (probe_id, _), hits in zip(probes, results)
+        ]
+
+    def _exact_truth(
+        self,
+        probes: List[Tuple[int, np.ndarray]],
+        name: str,
+        exhaustive: int,
+        k: int
+    ) -> List[List[int]]:
+        """Exact top-k ids per probe (own id removed) from a re-ranked candidate pool"""
+        pool = min(k * _TRUTH_POOL_FACTOR, _MAX_SEARCH_LIMIT - 1)
+        param = {name: max(exhaustive, pool + 1) if name == "ef" else exhaustive}
+        candidates = self._probe_search(probes, param, pool)
+
+        vectors = self._fetch_vectors(sorted({i for ids in candidates for i in ids}))
+
+        truth = []
+        for (_, probe), ids in zip(probes, candidates):
+            ids = [i for i in ids if i in vectors]
+            if not ids:
+                truth.append([])
+                continue
+
+            distances = self._exact_distances(probe, np.stack([vectors[i] for i in ids]))
+            truth.append([ids[i] for i in np.argsort(distances, kind="stable")[:k]])
+        return truth
+
+    def _fetch_vectors(self, ids: List[int]) -> Dict[int, np.ndarray]:
+        """Raw stored vectors by primary key"""
+        vectors: Dict[int, np.ndarray] = {}
+        with self.client._acquire() as collection:
+            for start in range(0, len(ids), _FETCH_BATCH):
+                rows = collection.query(
+                    expr=f"id in {ids[start:start + _FETCH_BATCH]}",
+                    output_fields=["id", "embedding"]
+                )
+                vectors.update(
+                    (row["id"], np.asarray(row["embedding"], dtype=np.float32)) for row in rows
+                )
+        return vectors
+
+    def _exact_distances(self, query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+        """Exact distances under the collection metric (smaller = closer)"""
+        if self.client.metric_type == "IP":
+            return -(matrix @ query)
+        if self.client.metric_type == "COSINE":
+            norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+            return -(matrix @ query) / np.maximum(norms, 1e-12)
+        return ((matrix - query) ** 2).sum(axis=1)
+
+    @staticmethod
+    def _recall(truth: List[List[int]], found: List[List[int]]) -> float:
+        """Mean recall of found against truth"""
+        recalls = [
+            len(set(expected) & set(actual)) / len(expected)
+            for expected, actual in zip(truth, found) if expected
+        ]
+        return sum(recalls) / len(recalls) if recalls else 1.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Index management statistics
+
+        Returns:
+            Dict with index_type, build_params, search_param, recall and target_recall
+        """
+        return {
+            "index_type": self.index_type,
+            "build_params": self.build_params,
+            "search_param": self.search_param,
+            "recall": round(self.measured_recall, 4) if self.measured_recall is not None else None,
+            "target_recall": self.target_recall
+        }
@@ -0,0 +1,174 @@
+"""
+Milvus Layout Migration
+
+Copies a collection using the legacy partition_per_file layout (one
+"file_{file_id}" partition per document) into a new collection using the
+partition_key layout (user_id partition key, indexed file_id filter).
+Embeddings are copied as stored; nothing is re-embedded.
+
+The migration is resumable: files whose vectors are already complete in
+the target are skipped, partially copied files are copied again.
+
+Usage:
+    python -m app.Providers.vector_store_provider.milvus_migration \\
+        --source document_embeddings --target document_embeddings_v2
+
+Then point MILVUS_COLLECTION_NAME at the target collection (and optionally
+rerun with --drop-source once it is verified).
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+from pymilvus import utility
+
+from app.Providers.vector_store_provider.milvus_client import MilvusClient
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_to_partition_key(
+    source_collection: str,
+    target_collection: str,
+    user_lookup: Optional[Callable[[str], Optional[str]]] = None,
+    batch_size: int = 1000,
+    drop_source: bool = False
+) -> Dict[str, Any]:
+    """
+    Copy every file of a partition_per_file collection into a partition_key one
+
+    Args:
+        source_collection: Existing partition_per_file collection
+        target_collection: partition_key collection (created if missing)
+        user_lookup: Maps file_id to its owner's user_id (None = unowned)
+        batch_size: Rows read and written per batch
+        drop_source: Drop the source collection after a complete migration
+
+    Returns:
+        Dict with files, migrated, skipped, vectors, seconds and vectors_per_second
+
+    Raises:
+        ValueError: If the source or target collection has the wrong layout
+    """
+    source = MilvusClient(collection_name=source_collection, pool_size=1)
+    target = MilvusClient(collection_name=target_collection, layout="partition_key")
+    source.connect()
+    target.connect()
+
+    if source.uses_partition_key:
+        raise ValueError(f"Collection '{source_collection}' already uses the partition_key layout")
+    if not target.uses_partition_key:
+        raise ValueError(f"Target collection '{target_collection}' uses the {target.layout} layout")
+
+    started = time.perf_counter()
+    file_ids = source.list_files()
+    result = {"files": len(file_ids), "migrated": 0, "skipped": 0, "vectors": 0}
+
+    try:
+        for file_id in file_ids:
+            expected = source.count_file_vectors(file_id)
+            existing = target.count_file_vectors(file_id)
+
+            if existing == expected:
+                result["skipped"] += 1
+                continue
+            if existing:
+                # Interrupted earlier: copy the file again from scratch
+                target.delete_file_vectors(file_id)
+
+            user_id = user_lookup(file_id) if user_lookup else None
+
+            batches = (
+                (
+                    [row["content"] for row in rows],
+                    [row["embedding"] for row in rows],
+                    [
+                        {
+                            **(row.get("metadata") or {}),
+                            "file_id": file_id,
+                            "chunk_index": row["chunk_index"],
+                            **({"user_id": user_id} if user_id else {})
+                        }
+                        for row in rows
+                    ]
+                )
+                for rows in source.iter_file_rows(file_id, batch_size)
+            )
+
+            copied = target.bulk_import(file_id, batches)
+            result["migrated"] += 1
+            result["vectors"] += copied["vectors"]
+            logger.info(
+                f"Migrated file '{file_id}' ({copied['vectors']} vectors, user_id={user_id}) "
+                f"[{result['migrated'] + result['skipped']}/{len(file_ids)}]"
+            )
+
+        if drop_source:
+            with source._acquire_alias() as alias:
+                utility.drop_collection(source_collection, using=alias)
+            logger.info(f"Dropped source collection '{source_collection}'")
+
+    finally:
+        source.disconnect()
+        target.disconnect()
+
+    elapsed = time.perf_counter() - started
+    result["seconds"] = round(elapsed, 1)
+    result["vectors_per_second"] = round(result["vectors"] / elapsed, 1) if elapsed else 0.0
+
+    logger.info(
+        f"Migration {source_collection} → {target_collection} finished: "
+        f"{result['migrated']} migrated, {result['skipped']} already complete, "
+        f"{result['vectors']} vectors ({result['vectors_per_second']} vectors/s)"
+    )
+    return result
+
+
+async def _load_file_owners() -> Dict[str, Optional[str]]:
+    """file_id → user_id from the file metadata database"""
+    from app.Providers.file_metadata_provider.client import get_file_metadata_provider
+
+    provider = await get_file_metadata_provider()
+    owners: Dict[str, Optional[str]] = {}
+    offset, page = 0, 500
+
+    while True:
+        files = await provider.list_files(limit=page, offset=offset)
+        owners.update((f["file_id"], f.get("user_id")) for f in files)
+        if len(files) < page:
+            return owners
+        offset += page
+
+
+def main():
+    """Command line entry point"""
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(
+        description="Migrate a partition-per-file Milvus collection to the partition_key layout"
+    )
+    parser.add_argument("--source", default=settings.MILVUS_COLLECTION_NAME,
+                        help="Existing collection (default: MILVUS_COLLECTION_NAME)")
+    parser.add_argument("--target", required=True, help="New partition_key collection")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--drop-source", action="store_true",
+                        help="Drop the source collection after a complete migration")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    owners = asyncio.run(_load_file_owners())
+    migrate_to_partition_key(
+        source_collection=args.source,
+        target_collection=args.target,
+        user_lookup=owners.get,
+        batch_size=args.batch_size,
+        drop_source=args.drop_source
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Cross-Store Result Ranking
+
+Hits from different stores are only comparable when they share a scale.
+Every search path reports a normalized distance in 'score' (lower is
+better, 0 = identical), whatever metric the underlying index uses:
+
+- L2 indexes: squared L2 distance, as returned by FAISS
+- Inner-product indexes: 1 - similarity
+
+Per-store hit lists arrive sorted by that score, so the global top-k is a
+k-way heap merge: O(N + k log N) for N stores instead of sorting all N*k
+hits.
+"""
+
+import heapq
+from itertools import islice
+from typing import Any, Dict, Iterable, List
+
+import faiss
+
+
+def normalize_distances(distances: List[float], metric_type: int) -> List[float]:
+    """
+    Map raw index scores to a lower-is-better distance
+
+    Args:
+        distances: Raw scores from index.search for one query
+        metric_type: faiss metric of the index (faiss.METRIC_L2, METRIC_INNER_PRODUCT)
+
+    Returns:
+        Normalized distances, same order (ascending for a sorted result row)
+    """
+    if metric_type == faiss.METRIC_INNER_PRODUCT:
+        return [1.0 - float(similarity) for similarity in distances]
+    return [float(distance) for distance in distances]
+
+
+def merge_top_k(
+    hit_lists: Iterable[List[Dict[str, Any]]],
+    k: int
+) -> List[Dict[str, Any]]:
+    """
+    Merge per-store hit lists (each sorted by score) into the global top-k
+
+    Args:
+        hit_lists: One ascending-by-score hit list per store
+        k: Number of hits to keep
+
+    Returns:
+        Up to k hits, best (lowest score) first
+    """
+    return list(islice(heapq.merge(*hit_lists, key=lambda hit: hit["score"]), k))
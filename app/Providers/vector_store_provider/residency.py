@@ -0,0 +1,149 @@
+"""
+Vector Store Residency Manager
+
+Keeps the set of in-memory per-file FAISS stores within a memory budget.
+Stores are tracked in least-recently-used order with an estimated size;
+when the budget is exceeded the coldest persisted stores are evicted from
+memory and reloaded from disk on their next access.
+
+Stores that are not yet persisted (still being ingested) are pinned: they
+are never evicted, since evicting them would lose data.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_store_bytes(vector_store: Any) -> int:
+    """
+    Approximate resident size of a LangChain FAISS store
+
+    Counts the raw vectors (ntotal × d × 4 bytes for float32 flat codes,
+    or the index's own code size when it exposes one) plus docstore text.
+    """
+    index = vector_store.index
+    code_size = getattr(index, "code_size", None) or index.d * 4
+    size = index.ntotal * code_size
+
+    documents = getattr(vector_store.docstore, "_dict", {})
+    size += sum(len(doc.page_content) for doc in documents.values())
+
+    return size
+
+
+class StoreResidencyManager:
+    """
+    LRU accounting for resident vector stores under a byte budget
+
+    Usage:
+        >>> residency = StoreResidencyManager(budget_bytes=1 << 30)
+        >>> evict = residency.admit("file_123", store_bytes, can_evict=is_persisted)
+        >>> residency.record_hit("file_123")
+    """
+
+    def __init__(self, budget_bytes: int):
+        """
+        Initialize Residency Manager
+
+        Args:
+            budget_bytes: Memory budget for resident stores (0 = unlimited)
+        """
+        self.budget_bytes = budget_bytes
+
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def bytes_in_use(self) -> int:
+        """Estimated bytes held by resident stores"""
+        return sum(self._sizes.values())
+
+    def record_hit(self, store_id: str):
+        """A resident store was accessed: mark it most recently used"""
+        with self._lock:
+            self.hits += 1
+            if store_id in self._sizes:
+                self._sizes.move_to_end(store_id)
+
+    def record_miss(self):
+        """A store had to be loaded from disk"""
+        with self._lock:
+            self.misses += 1
+
+    def admit(
+        self,
+        store_id: str,
+        size_bytes: int,
+        can_evict: Callable[[str], bool]
+    ) -> List[str]:
+        """
+        Track a resident store (new, loaded or resized) and pick evictions
+
+        Args:
+            store_id: Store identifier
+            size_bytes: Estimated store size
+            can_evict: Whether a store may leave memory (persisted on disk)
+
+        Returns:
+            Store ids to drop from memory, least recently used first
+        """
+        with self._lock:
+            self._sizes[store_id] = size_bytes
+            self._sizes.move_to_end(store_id)
+
+            if not self.budget_bytes:
+                return []
+
+            evict: List[str] = []
+            in_use = self.bytes_in_use
+
+            for candidate in list(self._sizes):
+                if in_use <= self.budget_bytes:
+                    break
+                if candidate == store_id or not can_evict(candidate):
+                    continue
+
+                in_use -= self._sizes.pop(candidate)
+                evict.append(candidate)
+
+            self.evictions += len(evict)
+
+        if evict:
+            logger.info(
+                f"Evicting {len(evict)} cold vector stores to stay within "
+                f"{self.budget_bytes / (1024 * 1024):.0f}MB budget: {evict}"
+            )
+        return evict
+
+    def forget(self, store_id: str):
+        """Stop tracking a store (deleted)"""
+        with self._lock:
+            self._sizes.pop(store_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Residency statistics
+
+        Returns:
+            Dict with resident_stores, bytes_in_use, budget_bytes, hits,
+            misses, evictions and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "resident_stores": len(self._sizes),
+                "bytes_in_use": self.bytes_in_use,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,251 @@
+"""
+Chunk Deduplication Service
+
+Suppresses exact and near-duplicate chunks (repeated headers, footers,
+boilerplate pages) before they are embedded, within a file and against the
+owner's other files.
+
+Each chunk gets two signatures:
+- exact_hash: SHA1 of the case- and whitespace-normalized text
+- simhash: 64-bit SimHash over word 3-gram shingles (CJK characters count
+  as words), near-duplicates differ in at most CHUNK_DEDUP_MAX_DISTANCE bits
+  (0, the default, disables near-duplicate matching: chunks differing only
+  in numbers can be a few bits apart)
+
+SimHashes are split into four 16-bit bands stored in SQLite. Two hashes
+within 3 bits share at least one band exactly (pigeonhole), so candidates
+are found with indexed band lookups and confirmed by Hamming distance
+(which is why CHUNK_DEDUP_MAX_DISTANCE is capped at 3).
+
+A duplicate is not embedded; a chunk_references row points it at its
+canonical (file_id, chunk_index) instead. Retrieval resolves references
+to other files, and deleting a canonical file re-embeds the chunks that
+reference it into their own files.
+"""
+
+import hashlib
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.Providers.file_metadata_provider.client import FileMetadataProvider
+
+logger = logging.getLogger(__name__)
+
+# Words, or single CJK/Hangul characters (scripts written without spaces)
+_TOKEN = re.compile(r"[\u2E80-\u9FFF\uAC00-\uD7AF\uF900-\uFAFF]|[^\W_]+")
+
+# Near-duplicate detection needs enough shingles for a stable SimHash
+_MIN_SHINGLES = 8
+
+_SIMHASH_BANDS = 4
+_BAND_BITS = 16
+_UINT64 = (1 << 64) - 1
+
+
+def _to_signed(value: int) -> int:
+    """Unsigned 64-bit value as SQLite's signed INTEGER"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def chunk_signature(text: str) -> Tuple[str, Optional[int]]:
+    """
+    Exact and SimHash signatures of a chunk
+
+    Args:
+        text: Chunk text
+
+    Returns:
+        (exact_hash, simhash); simhash is None for chunks too short for
+        reliable near-duplicate detection
+
+    Example:
+        >>> exact_hash, simhash = chunk_signature("Page 3 of 120 - Confidential")
+    """
+    normalized = " ".join(text.lower().split())
+    exact_hash = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+    tokens = _TOKEN.findall(normalized)
+    shingles = [" ".join(tokens[i:i + 3]) for i in range(max(len(tokens) - 2, 0))]
+    if len(shingles) < _MIN_SHINGLES:
+        return exact_hash, None
+
+    hashes = np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+            for shingle in shingles
+        ),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+
+    # Per-bit majority vote over all shingle hashes, in one vectorized pass
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    votes = (bits.sum(axis=0) * 2 > len(shingles)).astype(np.uint8)
+    simhash = int(np.packbits(votes, bitorder="little").view("<u8")[0])
+
+    return exact_hash, simhash
+
+
+def simhash_bands(simhash: int) -> List[int]:
+    """The four 16-bit bands of a SimHash"""
+    mask = (1 << _BAND_BITS) - 1
+    return [(simhash >> (_BAND_BITS * band)) & mask for band in range(_SIMHASH_BANDS)]
+
+
+def signature_row(
+    file_id: str,
+    chunk_index: int,
+    user_id: Optional[str],
+    exact_hash: str,
+    simhash: Optional[int]
+) -> Dict[str, Any]:
+    """chunk_signatures row for a canonical chunk"""
+    bands = simhash_bands(simhash) if simhash is not None else [None] * _SIMHASH_BANDS
+    return {
+        "file_id": file_id,
+        "chunk_index": chunk_index,
+        "user_id": user_id,
+        "exact_hash": exact_hash,
+        "simhash": _to_signed(simhash) if simhash is not None else None,
+        **{f"band{band}": value for band, value in enumerate(bands)}
+    }
+
+
+class ChunkDeduplicator:
+    """
+    Per-file duplicate filter applied to chunk batches during ingestion
+
+    Usage:
+        >>> deduplicator = ChunkDeduplicator(file_id, user_id, file_metadata_provider)
+        >>> unique_chunks = await deduplicator.filter(chunks)
+        >>> deduplicator.duplicate_count
+    """
+
+    def __init__(
+        self,
+        file_id: str,
+        user_id: Optional[str],
+        file_metadata_provider: FileMetadataProvider,
+        scope: Optional[str] = None,
+        max_distance: Optional[int] = None,
+        exclude_file_id: Optional[str] = None
+    ):
+        """
+        Initialize Chunk Deduplicator
+
+        Args:
+            file_id: File being ingested
+            user_id: Owner; other files are only compared within the same owner
+            file_metadata_provider: Signature and reference storage
+            scope: "user" (file and owner's corpus) or "file" (default from settings)
+            max_distance: Max SimHash Hamming distance of a near duplicate
+                (default from settings)
+            exclude_file_id: File whose signatures are ignored (the index a
+                re-index is replacing)
+        """
+        self.file_id = file_id
+        self.user_id = user_id
+        self.file_metadata_provider = file_metadata_provider
+        self.exclude_file_id = exclude_file_id
+        self.scope = scope or settings.CHUNK_DEDUP_SCOPE
+        max_distance = settings.CHUNK_DEDUP_MAX_DISTANCE if max_distance is None else max_distance
+        self.max_distance = max(0, min(max_distance, _SIMHASH_BANDS - 1))
+
+        # Anonymous uploads are never compared with other files
+        self.corpus_user_id = user_id if self.scope == "user" and user_id else None
+
+        self.duplicate_count = 0
+        self.near_duplicate_count = 0
+
+    async def filter(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Drop duplicate chunks, recording a reference for each
+
+        Canonical chunks are registered so later batches and files are
+        compared against them.
+
+        Args:
+            chunks: Chunk dicts (content, chunk_index, metadata) in order
+
+        Returns:
+            Chunks that still need embedding, in order
+        """
+        if not chunks:
+            return chunks
+
+        signatures = [chunk_signature(chunk["content"]) for chunk in chunks]
+
+        stored = await self.file_metadata_provider.find_chunk_signatures(
+            exact_hashes=[exact_hash for exact_hash, _ in signatures],
+            bands=[
+                simhash_bands(simhash) for _, simhash in signatures
+                if simhash is not None and self.max_distance > 0
+            ],
+            user_id=self.corpus_user_id,
+            file_id=None if self.corpus_user_id else self.file_id,
+            exclude_file_id=self.exclude_file_id
+        )
+        candidates = [
+            (row["file_id"], row["chunk_index"], row["exact_hash"],
+             row["simhash"] & _UINT64 if row["simhash"] is not None else None)
+            for row in stored
+        ]
+
+        unique, new_signatures, references = [], [], []
+
+        for chunk, (exact_hash, simhash) in zip(chunks, signatures):
+            canonical = self._find_canonical(exact_hash, simhash, candidates)
+
+            if canonical is None:
+                unique.append(chunk)
+                new_signatures.append(
+                    signature_row(self.file_id, chunk["chunk_index"], self.user_id, exact_hash, simhash)
+                )
+                # Later chunks of this batch are compared against it too
+                candidates.append((self.file_id, chunk["chunk_index"], exact_hash, simhash))
+                continue
+
+            self.duplicate_count += 1
+            references.append({
+                "file_id": self.file_id,
+                "chunk_index": chunk["chunk_index"],
+                "user_id": self.user_id,
+                "canonical_file_id": canonical[0],
+                "canonical_chunk_index": canonical[1],
+                "chunk_text": chunk["content"],
+                "metadata_json": json.dumps({**chunk["metadata"], "chunk_index": chunk["chunk_index"]})
+            })
+
+        if new_signatures:
+            await self.file_metadata_provider.add_chunk_signatures(new_signatures)
+        if references:
+            await self.file_metadata_provider.add_chunk_references(references)
+
+        return unique
+
+    def _find_canonical(
+        self,
+        exact_hash: str,
+        simhash: Optional[int],
+        candidates: List[Tuple[str, int, str, Optional[int]]]
+    ) -> Optional[Tuple[str, int]]:
+        """(file_id, chunk_index) of the chunk this one duplicates, if any"""
+        best, best_distance = None, self.max_distance + 1
+
+        for file_id, chunk_index, candidate_hash, candidate_simhash in candidates:
+            if candidate_hash == exact_hash:
+                return file_id, chunk_index
+
+            if self.max_distance > 0 and simhash is not None and candidate_simhash is not None:
+                distance = bin(simhash ^ candidate_simhash).count("1")
+                if distance < best_distance:
+                    best, best_distance = (file_id, chunk_index), distance
+
+        if best is not None:
+            self.near_duplicate_count += 1
+        return best
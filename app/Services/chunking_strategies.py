@@ -4,13 +4,19 @@ Chunking Strategies using Strategy and Factory Design Patterns
 Implements multiple text chunking strategies for RAG applications:
 - Recursive Character Splitting (baseline)
 - Hierarchical Indexing (multi-level with parent-child relationships)
+- Token-Budgeted Splitting (sized to the embedding model's window)
+- Semantic Splitting (boundaries at embedding similarity drops)
 
 Future strategies can be added by extending ChunkingStrategy base class.
 """
 
+import json
 import logging
+import re
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.retrievers.multi_vector import MultiVectorRetriever
 from langchain.storage import InMemoryStore
@@ -158,6 +164,9 @@ class HierarchicalChunkingStrategy(ChunkingStrategy):
     - Level 1 (Child): Medium chunks for retrieval (e.g., 1000 chars)
     - Level 2 (Grandchild): Small chunks for precise matching (e.g., 500 chars)
 
+    Each level is split from the chunks of the level above, so every child
+    lies inside its parent and records its character span in the text.
+
     Benefits:
     - Retrieve small chunks for precision
     - Access parent chunks for broader context
@@ -202,63 +211,69 @@ class HierarchicalChunkingStrategy(ChunkingStrategy):
         """
         Chunk text hierarchically with parent-child relationships
 
+        Only level 0 is split from the full text; every deeper level is
+        split from its parent chunk's text, so each child's parent_id is
+        exact and no level re-scans the whole document. Each chunk records
+        its character span in text (start_index inclusive, end_index
+        exclusive).
+
         Args:
             text: Input text
             metadata: Optional base metadata
 
         Returns:
-            List of chunk dicts with hierarchical metadata
+            List of chunk dicts with hierarchical metadata, level by level
+            (all parents, then all children, ...), document order within
+            each level
 
         Example:
             >>> strategy = HierarchicalChunkingStrategy(chunk_sizes=[2000, 1000, 500])
             >>> chunks = strategy.chunk(text)
-            >>> # Chunks have parent_id, level, and children relationships
+            >>> # Chunks have parent_id, level, start_index and end_index
         """
         try:
             all_chunks = []
-            chunk_id_map = {}  # Map level -> chunk_index -> chunk_id
 
-            # Process each hierarchical level
+            # (chunk_id, start_index, text) of the previous level; level 0
+            # has the whole text as its single, id-less parent
+            parents = [(None, 0, text)]
+
             for level, splitter in enumerate(self.splitters):
-                level_chunks = splitter.split_text(text)
-                chunk_id_map[level] = {}
-
-                for local_idx, chunk_text in enumerate(level_chunks):
-                    # Generate unique chunk ID
-                    chunk_id = str(uuid.uuid4())
-                    chunk_id_map[level][local_idx] = chunk_id
-
-                    # Determine parent chunk ID (from previous level)
-                    parent_id = None
-                    if level > 0:
-                        # Find parent by position overlap
-                        parent_level = level - 1
-                        parent_idx = self._find_parent_index(
-                            local_idx,
-                            len(level_chunks),
-                            len(chunk_id_map[parent_level])
-                        )
-                        parent_id = chunk_id_map[parent_level].get(parent_idx)
-
-                    # Build chunk dict
-                    chunk = {
-                        "content": chunk_text.strip(),
-                        "chunk_id": chunk_id,
-                        "chunk_index": len(all_chunks),  # Global index
-                        "level": level,
-                        "level_index": local_idx,  # Index within level
-                        "parent_id": parent_id,
-                        "metadata": {
-                            **(metadata or {}),
-                            "chunking_strategy": "hierarchical",
+                level_chunks = []
+
+                for parent_id, parent_start, parent_text in parents:
+                    for start, chunk_text in self._split_with_offsets(splitter, parent_text):
+                        chunk_id = str(uuid.uuid4())
+                        start_index = parent_start + start
+                        end_index = start_index + len(chunk_text)
+
+                        chunk = {
+                            "content": chunk_text,
+                            "chunk_id": chunk_id,
+                            "chunk_index": len(all_chunks),  # Global index
                             "level": level,
-                            "level_name": self._get_level_name(level),
-                            "chunk_size": self.chunk_sizes[level],
-                            "parent_id": parent_id
+                            "level_index": len(level_chunks),  # Index within level
+                            "parent_id": parent_id,
+                            "is_leaf": level == len(self.chunk_sizes) - 1,
+                            "start_index": start_index,
+                            "end_index": end_index,
+                            "metadata": {
+                                **(metadata or {}),
+                                "chunking_strategy": "hierarchical",
+                                "chunk_id": chunk_id,
+                                "level": level,
+                                "level_name": self._get_level_name(level),
+                                "chunk_size": self.chunk_sizes[level],
+                                "parent_id": parent_id,
+                                "start_index": start_index,
+                                "end_index": end_index
+                            }
                         }
-                    }
 
-                    all_chunks.append(chunk)
+                        all_chunks.append(chunk)
+                        level_chunks.append((chunk_id, start_index, chunk_text))
+
+                parents = level_chunks
 
             logger.info(
                 f"Hierarchical chunking: {len(all_chunks)} chunks across "
@@ -271,35 +286,40 @@ class HierarchicalChunkingStrategy(ChunkingStrategy):
             logger.error(f"Hierarchical chunking failed: {str(e)}")
             raise
 
-    def _find_parent_index(
-        self,
-        child_idx: int,
-        child_count: int,
-        parent_count: int
-    ) -> int:
+    @staticmethod
+    def _split_with_offsets(
+        splitter: RecursiveCharacterTextSplitter,
+        text: str
+    ) -> List[Tuple[int, str]]:
         """
-        Determine which parent chunk this child belongs to
+        Split text and locate each piece in it
+
+        Pieces come back in order and may overlap, so each one is searched
+        from just after the previous piece's start.
 
         Args:
-            child_idx: Child chunk index
-            child_count: Total number of child chunks
-            parent_count: Total number of parent chunks
+            splitter: Splitter for the level
+            text: Text to split
 
         Returns:
-            Parent chunk index
-
-        Logic:
-        - Distribute children evenly among parents
-        - Example: 10 children, 5 parents → 2 children per parent
+            List of (start offset in text, stripped piece)
         """
-        if parent_count == 0:
-            return 0
+        pieces = []
+        search_from = 0
+
+        for piece in splitter.split_text(text):
+            piece = piece.strip()
+            if not piece:
+                continue
 
-        children_per_parent = max(1, child_count / parent_count)
-        parent_idx = int(child_idx / children_per_parent)
+            start = text.find(piece, search_from)
+            if start < 0:
+                start = text.find(piece)
 
-        # Ensure within bounds
-        return min(parent_idx, parent_count - 1)
+            pieces.append((max(start, 0), piece))
+            search_from = max(start, 0) + 1
+
+        return pieces
 
     def _get_level_name(self, level: int) -> str:
         """
@@ -335,6 +355,434 @@ class HierarchicalChunkingStrategy(ChunkingStrategy):
         }
 
 
+# =============================================================================
+# Strategy 3: Token-Budgeted Splitting (Encoder Window)
+# =============================================================================
+
+# Characters after which a chunk boundary reads naturally (Latin and CJK)
+_SENTENCE_ENDINGS = ".!?;:。！？；："
+
+
+@lru_cache(maxsize=4)
+def _load_tokenizer(model_name: str) -> Tuple[Any, int]:
+    """
+    Fast tokenizer of an embedding model and its encoder window
+
+    Bare sentence-transformers names (e.g. 'all-MiniLM-L6-v2') are resolved
+    under the sentence-transformers organization on the Hugging Face Hub.
+
+    Args:
+        model_name: Model name or local path (as in EMBEDDING_MODEL)
+
+    Returns:
+        (tokenizer, max_seq_length in tokens, special tokens included)
+    """
+    from transformers import AutoTokenizer
+    from transformers.utils import cached_file
+
+    candidates = [model_name]
+    if "/" not in model_name:
+        candidates.append(f"sentence-transformers/{model_name}")
+
+    last_error: Optional[Exception] = None
+    for name in candidates:
+        try:
+            tokenizer = AutoTokenizer.from_pretrained(name, use_fast=True)
+        except Exception as e:
+            last_error = e
+            continue
+
+        if not tokenizer.is_fast:
+            raise ValueError(f"Token chunking needs a fast tokenizer (offset mapping): {name}")
+
+        # sentence-transformers truncates below the tokenizer's own limit
+        max_seq_length = min(tokenizer.model_max_length, 512)
+        try:
+            config_path = cached_file(name, "sentence_bert_config.json")
+            with open(config_path, encoding="utf-8") as f:
+                max_seq_length = json.load(f).get("max_seq_length", max_seq_length)
+        except Exception:
+            pass
+
+        return tokenizer, max_seq_length
+
+    raise ValueError(f"Could not load tokenizer for '{model_name}': {last_error}")
+
+
+class TokenChunkingStrategy(ChunkingStrategy):
+    """
+    Token-budgeted chunking with the embedding model's own tokenizer
+
+    Character-sized chunks overflow the encoder on dense scripts (2000 CJK
+    characters are ~2000 tokens against a 256-token window) and the
+    overflow is silently truncated. This strategy tokenizes the text once
+    with a fast tokenizer, keeps the token offset mapping, and cuts chunks
+    of at most chunk_tokens tokens directly from it, preferring paragraph,
+    line, sentence and word boundaries in the back half of each chunk.
+
+    Every chunk fits the encoder window, so nothing is embedded twice or
+    truncated away.
+
+    Best for: Multilingual and CJK documents, small-window encoders
+    """
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        chunk_tokens: Optional[int] = None,
+        chunk_overlap: int = 32,
+        **kwargs
+    ):
+        """
+        Initialize Token Chunking Strategy
+
+        Args:
+            model_name: Embedding model whose tokenizer measures chunks
+                (default: EMBEDDING_MODEL)
+            chunk_tokens: Max tokens per chunk (default and upper bound: the
+                encoder window minus special tokens)
+            chunk_overlap: Tokens shared by consecutive chunks
+        """
+        super().__init__(**kwargs)
+
+        if model_name is None:
+            from app.core.config import settings
+            model_name = settings.EMBEDDING_MODEL
+
+        self.model_name = model_name
+        self.tokenizer, max_seq_length = _load_tokenizer(model_name)
+
+        window = max_seq_length - self.tokenizer.num_special_tokens_to_add()
+        if chunk_tokens and chunk_tokens > window:
+            logger.warning(
+                f"chunk_tokens={chunk_tokens} exceeds the encoder window of '{model_name}' "
+                f"({window} tokens); using {window}"
+            )
+        self.chunk_tokens = min(chunk_tokens or window, window)
+        self.chunk_overlap = max(0, min(chunk_overlap, self.chunk_tokens // 2))
+
+        logger.info(
+            f"Token Chunking Strategy initialized: model={model_name}, "
+            f"tokens={self.chunk_tokens}, overlap={self.chunk_overlap}"
+        )
+
+    def chunk(self, text: str, metadata: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Chunk text into spans of at most chunk_tokens tokens
+
+        Args:
+            text: Input text
+            metadata: Optional base metadata
+
+        Returns:
+            List of chunk dicts (content is the exact text span between
+            start_index and end_index)
+
+        Example:
+            >>> strategy = TokenChunkingStrategy(model_name="all-MiniLM-L6-v2")
+            >>> chunks = strategy.chunk(text)
+            >>> print(chunks[0]["metadata"]["token_count"])
+        """
+        try:
+            offsets = self.tokenizer(
+                text,
+                add_special_tokens=False,
+                return_offsets_mapping=True,
+                verbose=False
+            )["offset_mapping"]
+
+            chunks = []
+            for start, end in self._token_spans(text, offsets):
+                start_index, end_index = offsets[start][0], offsets[end - 1][1]
+                chunks.append({
+                    "content": text[start_index:end_index],
+                    "chunk_index": len(chunks),
+                    "start_index": start_index,
+                    "end_index": end_index,
+                    "metadata": {
+                        **(metadata or {}),
+                        "chunking_strategy": "token",
+                        "chunk_tokens": self.chunk_tokens,
+                        "chunk_overlap": self.chunk_overlap,
+                        "token_count": end - start,
+                        "start_index": start_index,
+                        "end_index": end_index
+                    }
+                })
+
+            logger.info(f"Token chunking: {len(chunks)} chunks from {len(offsets)} tokens")
+            return chunks
+
+        except Exception as e:
+            logger.error(f"Token chunking failed: {str(e)}")
+            raise
+
+    def _token_spans(self, text: str, offsets: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+        Token ranges [start, end) of each chunk
+
+        Args:
+            text: Tokenized text
+            offsets: Character span of each token
+
+        Returns:
+            List of (start token, end token) pairs
+        """
+        spans = []
+        token_count = len(offsets)
+        start = 0
+
+        while start < token_count:
+            end = self._best_cut(text, offsets, start)
+
+            # A cut inside a word can re-tokenize into more subword pieces
+            while end - start > 1 and self._splits_word(text, offsets, start, end) and (
+                len(self.tokenizer(
+                    text[offsets[start][0]:offsets[end - 1][1]],
+                    add_special_tokens=False
+                )["input_ids"]) > self.chunk_tokens
+            ):
+                end -= 1
+
+            spans.append((start, end))
+            if end >= token_count:
+                break
+
+            # Overlap, moved forward to the next word start
+            next_start = max(end - self.chunk_overlap, start + 1)
+            while next_start < end and self._inside_word(text, offsets, next_start):
+                next_start += 1
+            start = next_start
+
+        return spans
+
+    def _best_cut(self, text: str, offsets: List[Tuple[int, int]], start: int) -> int:
+        """End token of the chunk starting at start, at the best nearby boundary"""
+        limit = min(start + self.chunk_tokens, len(offsets))
+        if limit == len(offsets):
+            return limit
+
+        best_end, best_rank = limit, -1
+        for end in range(limit, start + max(self.chunk_tokens // 2, 1) - 1, -1):
+            gap = text[offsets[end - 1][1]:offsets[end][0]]
+            if "\n\n" in gap:
+                rank = 4
+            elif "\n" in gap:
+                rank = 3
+            elif offsets[end - 1][1] > 0 and text[offsets[end - 1][1] - 1] in _SENTENCE_ENDINGS:
+                rank = 2
+            elif gap:
+                rank = 1
+            else:
+                rank = 0
+
+            if rank > best_rank:
+                best_end, best_rank = end, rank
+                if rank == 4:
+                    break
+
+        return best_end
+
+    @staticmethod
+    def _inside_word(text: str, offsets: List[Tuple[int, int]], token: int) -> bool:
+        """Whether a token continues the previous token's word"""
+        position = offsets[token][0]
+        if token == 0 or position == 0 or position >= len(text) or offsets[token - 1][1] != position:
+            return False
+
+        # CJK characters (U+2E80 onwards) are tokens and words of their own
+        previous, current = text[position - 1], text[position]
+        return all(char.isalnum() and ord(char) < 0x2E80 for char in (previous, current))
+
+    def _splits_word(self, text: str, offsets: List[Tuple[int, int]], start: int, end: int) -> bool:
+        """Whether a token range starts or ends inside a word"""
+        return self._inside_word(text, offsets, start) or (
+            end < len(offsets) and self._inside_word(text, offsets, end)
+        )
+
+
+# =============================================================================
+# Strategy 4: Semantic Splitting (Embedding Similarity)
+# =============================================================================
+
+# Sentence ends (Latin punctuation + whitespace, CJK punctuation) and blank lines
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|(?<=[。！？；])|\n\s*\n")
+
+
+class SemanticChunkingStrategy(ChunkingStrategy):
+    """
+    Semantic chunking at drops in adjacent-sentence similarity
+
+    Sentences are embedded in one batched call through the shared
+    EmbeddingProvider (so its on-disk cache serves repeated sentences and
+    the chunk re-embedding afterwards), normalized, and compared with their
+    neighbour in a single vectorized NumPy pass. Boundaries go where the
+    cosine distance to the next sentence is above the configured percentile
+    of the document's distances, subject to min/max chunk sizes.
+
+    Best for: Documents whose topics shift without structural markers;
+    yields fewer, more coherent chunks than fixed-size splitting
+    """
+
+    def __init__(
+        self,
+        breakpoint_percentile: float = 90.0,
+        min_chunk_size: int = 200,
+        max_chunk_size: int = 1000,
+        embedding_provider: Optional[Any] = None,
+        **kwargs
+    ):
+        """
+        Initialize Semantic Chunking Strategy
+
+        Args:
+            breakpoint_percentile: Distance percentile above which a sentence
+                gap becomes a boundary
+            min_chunk_size: Characters a chunk must reach before a semantic cut
+            max_chunk_size: Characters after which a chunk is cut regardless
+            embedding_provider: Sentence encoder (default: shared EmbeddingProvider)
+        """
+        super().__init__(**kwargs)
+
+        self.breakpoint_percentile = breakpoint_percentile
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self._embedding_provider = embedding_provider
+
+        # Oversized sentences are split like recursive chunks
+        self.splitter = RecursiveCharacterTextSplitter(
+            chunk_size=max_chunk_size,
+            chunk_overlap=0,
+            length_function=len
+        )
+
+        logger.info(
+            f"Semantic Chunking Strategy initialized: percentile={breakpoint_percentile}, "
+            f"min={min_chunk_size}, max={max_chunk_size}"
+        )
+
+    @property
+    def embedding_provider(self):
+        """Shared embedding provider, resolved on first use"""
+        if self._embedding_provider is None:
+            from app.Providers.embedding_provider.client import get_embedding_provider
+            self._embedding_provider = get_embedding_provider()
+        return self._embedding_provider
+
+    def chunk(self, text: str, metadata: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Chunk text at semantic boundaries
+
+        Args:
+            text: Input text
+            metadata: Optional base metadata
+
+        Returns:
+            List of chunk dicts with start_index and end_index
+
+        Example:
+            >>> strategy = SemanticChunkingStrategy(min_chunk_size=200, max_chunk_size=1000)
+            >>> chunks = strategy.chunk(text)
+        """
+        try:
+            sentences = self._split_sentences(text)
+            boundaries = self._find_boundaries([sentence for _, sentence in sentences])
+
+            chunks = []
+
+            def emit(start_index: int, end_index: int):
+                chunks.append({
+                    "content": text[start_index:end_index],
+                    "chunk_index": len(chunks),
+                    "start_index": start_index,
+                    "end_index": end_index,
+                    "metadata": {
+                        **(metadata or {}),
+                        "chunking_strategy": "semantic",
+                        "breakpoint_percentile": self.breakpoint_percentile,
+                        "start_index": start_index,
+                        "end_index": end_index
+                    }
+                })
+
+            chunk_start = None
+            chunk_end = None
+            for i, (start, sentence) in enumerate(sentences):
+                end = start + len(sentence)
+
+                if chunk_start is not None and end - chunk_start > self.max_chunk_size:
+                    emit(chunk_start, chunk_end)
+                    chunk_start = None
+
+                if len(sentence) > self.max_chunk_size:
+                    for piece_start, piece in HierarchicalChunkingStrategy._split_with_offsets(
+                        self.splitter, sentence
+                    ):
+                        emit(start + piece_start, start + piece_start + len(piece))
+                    continue
+
+                if chunk_start is None:
+                    chunk_start = start
+                chunk_end = end
+
+                if i in boundaries and chunk_end - chunk_start >= self.min_chunk_size:
+                    emit(chunk_start, chunk_end)
+                    chunk_start = None
+
+            if chunk_start is not None:
+                emit(chunk_start, chunk_end)
+
+            logger.info(
+                f"Semantic chunking: {len(chunks)} chunks from {len(sentences)} sentences "
+                f"({len(boundaries)} semantic boundaries)"
+            )
+            return chunks
+
+        except Exception as e:
+            logger.error(f"Semantic chunking failed: {str(e)}")
+            raise
+
+    @staticmethod
+    def _split_sentences(text: str) -> List[Tuple[int, str]]:
+        """Sentences of text as (start offset, stripped sentence)"""
+        sentences = []
+        position = 0
+
+        for match in [*_SENTENCE_BOUNDARY.finditer(text), None]:
+            end = match.start() if match else len(text)
+            piece = text[position:end]
+            stripped = piece.strip()
+            if stripped:
+                sentences.append((position + piece.index(stripped), stripped))
+            if match:
+                position = match.end()
+
+        return sentences
+
+    def _find_boundaries(self, sentences: List[str]) -> set:
+        """
+        Indices of sentences followed by a semantic boundary
+
+        Args:
+            sentences: Sentence texts in order
+
+        Returns:
+            Set of sentence indices i where a cut between i and i+1 is preferred
+        """
+        if len(sentences) < 2:
+            return set()
+
+        vectors = np.asarray(self.embedding_provider.embed_documents(sentences), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.maximum(norms, 1e-12)
+
+        # Cosine distance of each sentence to the next, in one pass
+        distances = 1.0 - np.einsum("ij,ij->i", vectors[:-1], vectors[1:])
+        threshold = np.percentile(distances, self.breakpoint_percentile)
+
+        return set(np.flatnonzero(distances > threshold).tolist())
+
+
 # =============================================================================
 # Factory Pattern: Strategy Selection
 # =============================================================================
@@ -353,7 +801,8 @@ class ChunkingStrategyFactory:
 
     _strategies = {
         "recursive": RecursiveChunkingStrategy,
-        "hierarchical": HierarchicalChunkingStrategy
+        "hierarchical": HierarchicalChunkingStrategy,
+        "token": TokenChunkingStrategy
     }
 
     @classmethod
@@ -366,7 +815,8 @@ class ChunkingStrategyFactory:
         Create chunking strategy by name
 
         Args:
-            strategy_name: Strategy name ("recursive" or "hierarchical")
+            strategy_name: Strategy name ("recursive", "hierarchical", "token",
+                or a registered one such as "semantic")
             **kwargs: Strategy-specific configuration
 
         Returns:
@@ -426,11 +876,14 @@ class ChunkingStrategyFactory:
 
         Example:
             >>> ChunkingStrategyFactory.list_strategies()
-            >>> ['recursive', 'hierarchical']
+            >>> ['recursive', 'hierarchical', 'token', 'semantic']
         """
         return list(cls._strategies.keys())
 
 
+ChunkingStrategyFactory.register_strategy("semantic", SemanticChunkingStrategy)
+
+
 # =============================================================================
 # Convenience Functions
 # =============================================================================
@@ -454,6 +907,20 @@ def get_default_strategy() -> ChunkingStrategy:
             chunk_sizes=settings.HIERARCHICAL_CHUNK_SIZES,
             overlap=settings.HIERARCHICAL_OVERLAP
         )
+    elif settings.CHUNKING_STRATEGY == "semantic":
+        return ChunkingStrategyFactory.create(
+            "semantic",
+            breakpoint_percentile=settings.SEMANTIC_BREAKPOINT_PERCENTILE,
+            min_chunk_size=settings.SEMANTIC_MIN_CHUNK_SIZE,
+            max_chunk_size=settings.SEMANTIC_MAX_CHUNK_SIZE
+        )
+    elif settings.CHUNKING_STRATEGY == "token":
+        return ChunkingStrategyFactory.create(
+            "token",
+            model_name=settings.EMBEDDING_MODEL,
+            chunk_tokens=settings.TOKEN_CHUNK_SIZE,
+            chunk_overlap=settings.TOKEN_CHUNK_OVERLAP
+        )
     else:
         return ChunkingStrategyFactory.create(
             "recursive",
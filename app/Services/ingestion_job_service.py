@@ -0,0 +1,724 @@
+"""
+Ingestion Job Service
+
+Background ingestion queue for uploaded files. The upload endpoint only stores
+the file and enqueues a job; a fixed pool of worker tasks drains the persistent
+queue (SQLite `ingestion_jobs` table) and runs the IngestionPipeline for each
+job, recording per-stage progress that clients poll through the status endpoint.
+
+The worker count (INGEST_JOB_WORKERS) caps how many files are extracted,
+chunked and embedded concurrently. A claimed job carries a lease
+(INGEST_JOB_LEASE_SECONDS) that its worker renews while it runs; jobs left
+'running' by a crashed or restarted process are requeued once their lease
+expires, never while a sibling uvicorn worker is still running them.
+
+Completed ingestions are recorded in a content-addressed cache keyed on the
+full SHA256 of the file and a fingerprint of the chunking and embedding
+config, so identical uploads reuse the existing vector store instead of
+being queued again.
+
+Each indexed file also gets a versioned index manifest recording that config
+(strategy, chunk sizes, embedding model). When the config changes, a
+background task re-indexes stale files one at a time from their saved
+uploads in PDF_UPLOAD_DIR, only while no ingestion job is running and
+REINDEX_INTERVAL apart. The new index is built under a staging id next to
+the live one and swapped in when complete, so the file stays searchable
+throughout. Only the process holding REINDEX_LOCK_FILE re-indexes, so
+sibling uvicorn workers never build the same staging id at once.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import socket
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Iterator, Optional, Any, Set, Tuple
+
+from app.core.config import settings
+from app.Providers.embedding_provider.client import get_embedding_provider
+from app.Providers.vector_store_provider.client import get_vector_store_provider
+from app.Providers.file_metadata_provider.client import (
+    FileMetadataProvider,
+    get_file_metadata_provider
+)
+from app.Services.input_data_handle_service import get_input_data_service
+from app.Services.retrieval_service import RetrievalService
+from app.Services.ingestion_pipeline import IngestionPipeline
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking (single worker only)
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionJobService:
+    """
+    Worker pool draining the persistent ingestion job queue
+
+    Job lifecycle:
+        queued → running (extracting → chunking → embedding → storing) → completed | failed
+
+    file_metadata.embedding_status mirrors the job: 'pending' while queued,
+    'processing' while running, then 'completed' or 'failed'.
+
+    Usage:
+        >>> service = get_ingestion_job_service()
+        >>> await service.start()
+        >>> job_id = await service.submit(file_id, "doc.pdf", path, 1024, user_id)
+    """
+
+    def __init__(self, worker_count: Optional[int] = None):
+        """
+        Initialize Ingestion Job Service
+
+        Args:
+            worker_count: Number of concurrent workers (default from settings)
+        """
+        self.worker_count = worker_count or settings.INGEST_JOB_WORKERS
+        # Lease owner recorded on claimed jobs (unique per process)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._workers: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+        # Jobs currently running; re-indexing waits until there are none
+        self._active_jobs = 0
+        self._reindex_task: Optional[asyncio.Task] = None
+        # Stale files that cannot be re-indexed (no saved upload) or failed
+        self._reindex_skipped: Set[str] = set()
+
+        logger.info(f"Ingestion Job Service configured: workers={self.worker_count}")
+
+    async def start(self):
+        """
+        Requeue jobs with expired leases and start the worker tasks
+
+        Call once during application startup.
+        """
+        if self._workers:
+            return
+
+        file_metadata_provider = await get_file_metadata_provider()
+        await file_metadata_provider.requeue_interrupted_jobs()
+
+        self._stopping = False
+        self._workers = [
+            asyncio.create_task(self._worker_loop(i), name=f"ingestion-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+        self._wakeup.set()
+
+        if settings.REINDEX_ENABLED:
+            self._reindex_task = asyncio.create_task(self._reindex_loop(), name="reindex")
+
+        logger.info(f"Started {self.worker_count} ingestion workers")
+
+    async def stop(self):
+        """Stop the worker tasks; running jobs are requeued once their lease expires"""
+        self._stopping = True
+        tasks = self._workers + ([self._reindex_task] if self._reindex_task else [])
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._reindex_task = None
+
+        logger.info("Ingestion workers stopped")
+
+    async def submit(
+        self,
+        file_id: str,
+        filename: str,
+        file_path: Path,
+        file_size: int,
+        user_id: Optional[str] = None
+    ) -> str:
+        """
+        Enqueue an ingestion job for a stored file
+
+        The file must already be registered in file_metadata.
+
+        Args:
+            file_id: File identifier
+            filename: Original filename
+            file_path: Path to the stored upload
+            file_size: File size in bytes
+            user_id: Optional user identifier
+
+        Returns:
+            job_id of the enqueued job
+        """
+        file_metadata_provider = await get_file_metadata_provider()
+        job_id = f"job_{uuid.uuid4().hex}"
+
+        await file_metadata_provider.enqueue_job(
+            job_id=job_id,
+            file_id=file_id,
+            filename=filename,
+            file_path=str(file_path),
+            file_size=file_size,
+            user_id=user_id
+        )
+
+        self._wakeup.set()
+        return job_id
+
+    # =========================================================================
+    # Ingestion Cache (Content-Hash Deduplication)
+    # =========================================================================
+
+    @staticmethod
+    def index_config() -> Dict[str, Any]:
+        """
+        Every setting that changes the stored chunks or vectors
+
+        Returns:
+            Dict with chunking_strategy, chunking_params (sizes, overlap),
+            multivector, embedding_model and encode_kwargs
+        """
+        input_service = get_input_data_service()
+        embedding_provider = get_embedding_provider()
+
+        return {
+            "chunking_strategy": input_service.strategy_name,
+            "chunking_params": input_service.strategy_kwargs,
+            "multivector": settings.ENABLE_MULTIVECTOR_RETRIEVAL,
+            "embedding_model": embedding_provider.model_name,
+            "encode_kwargs": embedding_provider.encode_kwargs
+        }
+
+    @classmethod
+    def config_fingerprint(cls) -> str:
+        """
+        Fingerprint of the current index config
+
+        Returns:
+            SHA256 hex digest of index_config()
+        """
+        return hashlib.sha256(json.dumps(cls.index_config(), sort_keys=True).encode()).hexdigest()
+
+    def ingestion_cache_key(self, content_hash: str) -> Tuple[str, str]:
+        """
+        Build the ingestion cache key for a file
+
+        Args:
+            content_hash: Full SHA256 hex digest of the file content
+
+        Returns:
+            Tuple of (cache_key, config_fingerprint)
+        """
+        fingerprint = self.config_fingerprint()
+        return f"{content_hash}:{fingerprint}", fingerprint
+
+    async def find_cached_ingestion(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a completed ingestion of identical content under the current config
+
+        Entries whose source vector store is no longer loaded are dropped.
+
+        Args:
+            content_hash: Full SHA256 hex digest of the file content
+
+        Returns:
+            Cache entry dict (source_file_id, chunk_count, ...) or None
+        """
+        loop = asyncio.get_running_loop()
+        # The first call connects the Milvus client; has_store queries it
+        vector_store_provider = await loop.run_in_executor(None, get_vector_store_provider)
+
+        if vector_store_provider.backend == "chroma":
+            # Chroma stores cannot be cloned for another file
+            return None
+
+        file_metadata_provider = await get_file_metadata_provider()
+        cache_key, _ = self.ingestion_cache_key(content_hash)
+
+        entry = await file_metadata_provider.get_ingestion_cache(cache_key)
+        if entry is None:
+            return None
+
+        has_store = await loop.run_in_executor(
+            None, vector_store_provider.has_store, entry["source_file_id"]
+        )
+        if not has_store:
+            logger.info(
+                f"Ingestion cache entry for '{entry['source_file_id']}' is stale "
+                f"(vector store not loaded), re-ingesting"
+            )
+            await file_metadata_provider.delete_ingestion_cache(cache_key)
+            return None
+
+        return entry
+
+    async def reuse_cached_ingestion(
+        self,
+        entry: Dict[str, Any],
+        file_id: str,
+        user_id: Optional[str] = None
+    ):
+        """
+        Serve a new file from a cached ingestion's vector store
+
+        The source's duplicate references are copied too, so chunks it
+        skipped at ingest stay retrievable for the new file. Call before
+        registering the file as completed: on failure nothing is left behind.
+
+        Args:
+            entry: Entry returned by find_cached_ingestion
+            file_id: New file identifier
+            user_id: Owner of the new file
+
+        Raises:
+            ValueError: If the source store no longer exists
+        """
+        file_metadata_provider = await get_file_metadata_provider()
+
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, get_vector_store_provider().share_store,
+                entry["source_file_id"], file_id, user_id
+            )
+            await file_metadata_provider.copy_chunk_references(
+                entry["source_file_id"], file_id, user_id=user_id
+            )
+        except Exception:
+            await self.discard_reused_ingestion(file_id)
+            raise
+
+        await self._record_index_manifest(file_id, entry["chunk_count"], file_metadata_provider)
+        logger.info(
+            f"Reused ingestion of '{entry['source_file_id']}' for '{file_id}' "
+            f"({entry['chunk_count']} chunks, no re-embedding)"
+        )
+
+    async def discard_reused_ingestion(self, file_id: str):
+        """
+        Undo reuse_cached_ingestion for a file that could not be registered
+
+        Args:
+            file_id: File identifier passed to reuse_cached_ingestion
+        """
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, get_vector_store_provider().delete_store, file_id
+            )
+            file_metadata_provider = await get_file_metadata_provider()
+            await file_metadata_provider.delete_file(file_id)
+        except Exception as e:
+            logger.error(f"Failed to discard reused ingestion for '{file_id}': {str(e)}")
+
+    async def _record_ingestion_cache(
+        self,
+        file_id: str,
+        chunk_count: int,
+        file_metadata_provider: FileMetadataProvider
+    ):
+        """Record a completed ingestion so identical uploads can reuse it"""
+        file_data = await file_metadata_provider.get_file(file_id)
+        content_hash = file_data.get("content_hash") if file_data else None
+        if not content_hash:
+            return
+
+        cache_key, fingerprint = self.ingestion_cache_key(content_hash)
+        try:
+            await file_metadata_provider.put_ingestion_cache(
+                cache_key=cache_key,
+                content_hash=content_hash,
+                config_fingerprint=fingerprint,
+                source_file_id=file_id,
+                chunk_count=chunk_count
+            )
+        except Exception as e:
+            # The file itself is indexed; only future deduplication is lost
+            logger.warning(f"Failed to record ingestion cache for '{file_id}': {str(e)}")
+
+    async def _record_index_manifest(
+        self,
+        file_id: str,
+        chunk_count: int,
+        file_metadata_provider: FileMetadataProvider
+    ) -> Optional[int]:
+        """Record the config a file was just indexed with; returns the manifest version"""
+        try:
+            return await file_metadata_provider.put_index_manifest(
+                file_id=file_id,
+                config_fingerprint=self.config_fingerprint(),
+                config=self.index_config(),
+                chunk_count=chunk_count
+            )
+        except Exception as e:
+            # The file is indexed; it will only be re-indexed once more than needed
+            logger.warning(f"Failed to record index manifest for '{file_id}': {str(e)}")
+            return None
+
+    # =========================================================================
+    # Background Re-index
+    # =========================================================================
+
+    async def _reindex_loop(self):
+        """Re-index stale files one at a time, yielding to ingestion jobs"""
+        file_metadata_provider = await get_file_metadata_provider()
+
+        while not self._stopping:
+            if self._active_jobs:
+                # Uploads first: re-indexing only uses otherwise idle capacity
+                await asyncio.sleep(settings.REINDEX_INTERVAL)
+                continue
+
+            with self._reindex_lock() as acquired:
+                # Only one process re-indexes (all would pick the same stale file)
+                found = acquired and await self._reindex_next(file_metadata_provider)
+
+            if not found:
+                await asyncio.sleep(settings.REINDEX_POLL_INTERVAL)
+                continue
+            await asyncio.sleep(settings.REINDEX_INTERVAL)
+
+    async def _reindex_next(self, file_metadata_provider: FileMetadataProvider) -> bool:
+        """Re-index the oldest stale file; returns False if none was found"""
+        try:
+            stale = await file_metadata_provider.list_stale_files(
+                self.config_fingerprint(),
+                limit=1,
+                exclude_file_ids=sorted(self._reindex_skipped)
+            )
+        except Exception as e:
+            logger.error(f"Failed to list stale files: {str(e)}")
+            stale = []
+
+        if not stale:
+            return False
+
+        try:
+            reindexed = await self.reindex_file(stale[0], file_metadata_provider)
+        except Exception as e:
+            logger.error(f"Re-index of '{stale[0]['file_id']}' failed: {str(e)}")
+            reindexed = False
+
+        if not reindexed:
+            self._reindex_skipped.add(stale[0]["file_id"])
+        return True
+
+    @contextmanager
+    def _reindex_lock(self) -> Iterator[bool]:
+        """Non-blocking cross-process lock; yields whether it was acquired"""
+        if fcntl is None:
+            yield True
+            return
+
+        lock_file = Path(settings.REINDEX_LOCK_FILE)
+        lock_file.parent.mkdir(parents=True, exist_ok=True)
+        with lock_file.open("a+b") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    async def reindex_file(
+        self,
+        file_data: Dict[str, Any],
+        file_metadata_provider: FileMetadataProvider
+    ) -> bool:
+        """
+        Rebuild a file's index under the current config and swap it in
+
+        The new index is built under a staging id from the saved upload (or
+        shared from an identical upload already re-indexed), while the
+        current index keeps serving searches. Files without either are left
+        as they are.
+
+        Args:
+            file_data: file_metadata row of a stale file
+            file_metadata_provider: Metadata storage
+
+        Returns:
+            True if the file was re-indexed
+        """
+        file_id = file_data["file_id"]
+        staging_id = f"{file_id}__reindex"
+        upload_path = Path(settings.PDF_UPLOAD_DIR) / f"{file_id}{Path(file_data['filename']).suffix}"
+        vector_store_provider = get_vector_store_provider()
+        loop = asyncio.get_running_loop()
+
+        retrieval_service = RetrievalService(
+            embedding_provider=get_embedding_provider(),
+            vector_store_provider=vector_store_provider
+        )
+
+        cached = None
+        if not upload_path.exists():
+            if file_data.get("content_hash"):
+                cached = await self.find_cached_ingestion(file_data["content_hash"])
+            if cached is None:
+                logger.warning(f"Cannot re-index '{file_id}': upload {upload_path} not found")
+                return False
+
+        previous = await file_metadata_provider.get_index_manifest(file_id)
+        logger.info(
+            f"Re-indexing '{file_id}' (manifest v{previous['version'] if previous else 0}"
+            f"{', shared from ' + cached['source_file_id'] if cached else ''})"
+        )
+
+        try:
+            # Leftovers of an interrupted re-index
+            await retrieval_service.delete_document(staging_id)
+
+            if cached is not None:
+                await loop.run_in_executor(
+                    None, vector_store_provider.share_store,
+                    cached["source_file_id"], staging_id, file_data.get("user_id")
+                )
+                await file_metadata_provider.copy_chunk_references(
+                    cached["source_file_id"], staging_id, user_id=file_data.get("user_id")
+                )
+                chunk_count = cached["chunk_count"]
+            else:
+                pipeline = IngestionPipeline(get_input_data_service(), retrieval_service)
+                stats = await pipeline.run(
+                    upload_path,
+                    file_id,
+                    file_data["filename"],
+                    file_data["file_size"],
+                    user_id=file_data.get("user_id"),
+                    store_id=staging_id
+                )
+                chunk_count = stats["chunk_count"]
+
+            if await file_metadata_provider.get_file(file_id) is None:
+                # Deleted while it was being re-indexed
+                await retrieval_service.delete_document(staging_id)
+                return False
+
+            # Other files' references to the old chunk indexes get their own copies
+            await retrieval_service.promote_chunk_references(file_id)
+
+            if chunk_count:
+                await loop.run_in_executor(
+                    None, vector_store_provider.replace_store,
+                    staging_id, file_id, file_data.get("user_id")
+                )
+            else:
+                # Only duplicates: the file is served from its references
+                await loop.run_in_executor(None, vector_store_provider.delete_store, file_id)
+
+            await file_metadata_provider.replace_file_records(staging_id, file_id)
+            await file_metadata_provider.update_chunk_count(file_id, chunk_count)
+            version = await self._record_index_manifest(file_id, chunk_count, file_metadata_provider)
+            if cached is None:
+                await self._record_ingestion_cache(file_id, chunk_count, file_metadata_provider)
+
+            logger.info(f"Re-indexed '{file_id}': {chunk_count} chunks (manifest v{version})")
+            return True
+
+        except asyncio.CancelledError:
+            # Shutdown: the staging index is dropped on the next attempt
+            raise
+
+        except Exception as e:
+            logger.error(f"Re-index of '{file_id}' failed, keeping current index: {str(e)}")
+            try:
+                await retrieval_service.delete_document(staging_id)
+            except Exception:
+                pass
+            return False
+
+    # =========================================================================
+    # Worker Loop
+    # =========================================================================
+
+    async def _worker_loop(self, worker_index: int):
+        """Claim and run jobs until stopped; idle workers wait for a wakeup or poll"""
+        file_metadata_provider = await get_file_metadata_provider()
+
+        while not self._stopping:
+            try:
+                job = await file_metadata_provider.claim_next_job(
+                    self.worker_id, settings.INGEST_JOB_LEASE_SECONDS
+                )
+            except Exception as e:
+                logger.error(f"Ingestion worker {worker_index} failed to claim job: {str(e)}")
+                job = None
+
+            if job is None:
+                # Idle: pick up jobs orphaned by a crashed process
+                try:
+                    if await file_metadata_provider.requeue_interrupted_jobs():
+                        continue
+                except Exception as e:
+                    logger.error(f"Ingestion worker {worker_index} failed to requeue jobs: {str(e)}")
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(),
+                        timeout=settings.INGEST_JOB_POLL_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Another job may be waiting; let an idle worker pick it up
+            self._wakeup.set()
+            self._active_jobs += 1
+            try:
+                await self._run_job(job, file_metadata_provider)
+            except Exception as e:
+                # One bad job must never end a worker
+                logger.error(f"Ingestion worker {worker_index} failed on job {job['job_id']}: {str(e)}")
+            finally:
+                self._active_jobs -= 1
+
+    async def _run_job(
+        self,
+        job: Dict[str, Any],
+        file_metadata_provider: FileMetadataProvider
+    ):
+        """Run the ingestion pipeline for one claimed job"""
+        job_id = job["job_id"]
+        file_id = job["file_id"]
+        file_path = Path(job["file_path"])
+
+        retrieval_service = RetrievalService(
+            embedding_provider=get_embedding_provider(),
+            vector_store_provider=get_vector_store_provider()
+        )
+
+        async def on_progress(stats: Dict[str, Any]):
+            await file_metadata_provider.update_job(
+                job_id,
+                stage=stats["stage"],
+                progress=self._progress_snapshot(stats)
+            )
+
+        logger.info(f"Running ingestion job {job_id} for file {file_id}")
+        heartbeat = asyncio.create_task(self._renew_lease(job_id, file_metadata_provider))
+
+        try:
+            await file_metadata_provider.update_embedding_status(file_id, "processing")
+            await file_metadata_provider.update_job(job_id, stage="extracting")
+
+            # A requeued job may have stored batches before the restart
+            await retrieval_service.delete_document(file_id)
+
+            pipeline = IngestionPipeline(get_input_data_service(), retrieval_service)
+            stats = await pipeline.run(
+                file_path,
+                file_id,
+                job["filename"],
+                job["file_size"],
+                progress_callback=on_progress,
+                user_id=job.get("user_id")
+            )
+
+            # A file made only of duplicates has no vectors of its own
+            if stats["chunk_count"]:
+                await retrieval_service.persist_document(file_id)
+
+            await file_metadata_provider.update_chunk_count(file_id, stats["chunk_count"])
+            await file_metadata_provider.update_embedding_status(file_id, "completed")
+            await self._record_ingestion_cache(
+                file_id, stats["chunk_count"], file_metadata_provider
+            )
+            await self._record_index_manifest(
+                file_id, stats["chunk_count"], file_metadata_provider
+            )
+            await file_metadata_provider.update_job(
+                job_id,
+                status="completed",
+                stage="completed",
+                progress=self._progress_snapshot(stats)
+            )
+
+            logger.info(
+                f"Ingestion job {job_id} completed: {stats['chunk_count']} chunks "
+                f"in {stats['elapsed_seconds']}s"
+            )
+
+        except asyncio.CancelledError:
+            # Shutdown: leave the job 'running' so it is requeued on next start
+            raise
+
+        except Exception as e:
+            logger.error(f"Ingestion job {job_id} failed: {str(e)}")
+
+            try:
+                await file_metadata_provider.update_embedding_status(file_id, "failed")
+                await file_metadata_provider.update_job(
+                    job_id, status="failed", stage="failed", error=str(e)
+                )
+            except Exception:
+                pass
+
+            try:
+                await retrieval_service.delete_document(file_id)
+            except Exception as cleanup_error:
+                logger.error(f"Failed to clean up vectors of '{file_id}': {str(cleanup_error)}")
+
+            try:
+                # Failed uploads are not kept on disk
+                file_path.unlink(missing_ok=True)
+            except Exception as cleanup_error:
+                logger.error(f"Failed to delete upload {file_path}: {str(cleanup_error)}")
+
+        finally:
+            heartbeat.cancel()
+
+    async def _renew_lease(self, job_id: str, file_metadata_provider: FileMetadataProvider):
+        """Keep a running job's lease current until cancelled"""
+        interval = settings.INGEST_JOB_LEASE_SECONDS / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await file_metadata_provider.renew_job_lease(
+                    job_id, self.worker_id, settings.INGEST_JOB_LEASE_SECONDS
+                )
+            except Exception as e:
+                logger.warning(f"Failed to renew lease of ingestion job {job_id}: {str(e)}")
+
+    @staticmethod
+    def _progress_snapshot(stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Per-stage progress counters persisted with the job"""
+        return {
+            "pages_total": stats["pages_total"],
+            "pages_extracted": stats["page_count"],
+            "chunks_created": stats["chunks_created"],
+            "chunks_embedded": stats["chunks_embedded"],
+            "chunks_stored": stats["chunk_count"],
+            "chunks_deduplicated": stats["chunks_deduplicated"],
+            "batches_stored": stats["batch_count"]
+        }
+
+
+# Singleton instance for dependency injection
+_ingestion_job_service_instance: Optional[IngestionJobService] = None
+
+
+def get_ingestion_job_service() -> IngestionJobService:
+    """
+    FastAPI dependency for Ingestion Job Service (Singleton)
+
+    Usage in endpoints:
+        @router.post("/upload")
+        async def upload(
+            job_service: IngestionJobService = Depends(get_ingestion_job_service)
+        ):
+            ...
+    """
+    global _ingestion_job_service_instance
+
+    if _ingestion_job_service_instance is None:
+        _ingestion_job_service_instance = IngestionJobService()
+
+    return _ingestion_job_service_instance
@@ -0,0 +1,343 @@
+"""
+Ingestion Pipeline Service
+
+Streaming document ingestion from an uploaded file to the vector store:
+
+    pages ──▶ chunking ──▶ embedding batches ──▶ vector store
+
+Each stage runs as its own task and hands work to the next through a bounded
+asyncio.Queue, so a slow stage (usually embedding) applies backpressure to the
+stages before it. Peak memory is bounded by queue sizes and the chunking window
+instead of the document size, and the first batches are searchable before the
+last page has been parsed.
+
+With hierarchical chunking and ENABLE_MULTIVECTOR_RETRIEVAL, only leaf chunks
+flow on to embedding; parent chunks are written to the doc store as each
+window is chunked.
+
+With CHUNK_DEDUP_ENABLED, each window's chunks then pass a duplicate filter
+(chunk_dedup_service): exact and near duplicates, within the file or of the
+owner's other files, are recorded as references instead of being embedded.
+"""
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import List, Dict, Optional, Any, Union, Callable, Awaitable
+
+from app.core.config import settings
+from app.core.executors import get_ingestion_executors
+from app.Providers.file_metadata_provider.client import get_file_metadata_provider
+from app.Services.chunk_dedup_service import ChunkDeduplicator
+from app.Services.input_data_handle_service import InputDataHandleService
+from app.Services.retrieval_service import RetrievalService
+
+logger = logging.getLogger(__name__)
+
+# Queue sentinel marking the end of a stage's output
+_END = object()
+
+# Async callback receiving a snapshot of pipeline progress counters
+ProgressCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class IngestionPipeline:
+    """
+    Bounded, backpressured ingestion pipeline for a single file
+
+    Stages:
+    1. Extract: stream page text from the PDF (page-parallel)
+    2. Chunk: window the page stream and chunk with the configured strategy
+    3. Embed: group chunks into batches and embed each batch
+    4. Store: append each embedded batch to the file's vector store
+
+    Usage:
+        >>> pipeline = IngestionPipeline(input_service, retrieval_service)
+        >>> stats = await pipeline.run(file_path, file_id, filename, file_size)
+        >>> print(stats["chunk_count"])
+    """
+
+    def __init__(
+        self,
+        input_service: InputDataHandleService,
+        retrieval_service: RetrievalService,
+        batch_size: Optional[int] = None,
+        queue_maxsize: Optional[int] = None
+    ):
+        """
+        Initialize Ingestion Pipeline
+
+        Args:
+            input_service: Service used for extraction and chunking
+            retrieval_service: Service used for embedding and vector storage
+            batch_size: Chunks per embedding batch (default from settings)
+            queue_maxsize: Max items buffered between stages (default from settings)
+        """
+        self.input_service = input_service
+        self.retrieval_service = retrieval_service
+        self.batch_size = batch_size or settings.INGEST_EMBED_BATCH_SIZE
+        self.queue_maxsize = queue_maxsize or settings.INGEST_QUEUE_MAXSIZE
+        self._progress_callback: Optional[ProgressCallback] = None
+
+    async def run(
+        self,
+        source: Union[bytes, str, Path],
+        file_id: str,
+        filename: str,
+        file_size: int,
+        progress_callback: Optional[ProgressCallback] = None,
+        user_id: Optional[str] = None,
+        store_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the pipeline to completion for one file
+
+        Args:
+            source: PDF content or path to the PDF on disk
+            file_id: Unique file identifier (also the vector store id)
+            filename: Original filename
+            file_size: File size in bytes
+            progress_callback: Awaited with a progress snapshot after extraction
+                finishes and after every stored batch
+            user_id: Owner, recorded in chunk metadata (Milvus tenant key)
+            store_id: Build the index under this id instead of file_id (vectors,
+                doc store and duplicate signatures; chunk metadata keeps file_id).
+                Used to re-index a file next to its live index.
+
+        Returns:
+            Dict with page_count, chunk_count (indexed), parent_count (doc
+            store only), chunks_deduplicated (stored as references),
+            batch_count, elapsed_seconds
+
+        Progress snapshot keys:
+            stage: Earliest unfinished stage ('extracting', 'chunking',
+                'embedding', 'storing')
+            pages_total, page_count, chunks_created, chunks_embedded,
+            chunk_count (stored), batch_count
+
+        Raises:
+            ValueError: If the document yields no extractable text
+        """
+        page_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_maxsize)
+        chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_maxsize)
+        store_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_maxsize)
+
+        stats = {
+            "stage": "extracting",
+            "pages_total": await self.input_service.count_pdf_pages(source),
+            "page_count": 0,
+            "chunks_created": 0,
+            "chunks_embedded": 0,
+            "chunk_count": 0,
+            "parent_count": 0,
+            "chunks_deduplicated": 0,
+            "batch_count": 0,
+            "extraction_done": False,
+            "chunking_done": False
+        }
+        self._progress_callback = progress_callback
+        started = time.perf_counter()
+        base_metadata = {
+            "file_id": file_id,
+            "filename": filename,
+            "file_size": file_size,
+            "timestamp": int(time.time())
+        }
+        if user_id:
+            base_metadata["user_id"] = user_id
+
+        store_id = store_id or file_id
+
+        deduplicator = None
+        if settings.CHUNK_DEDUP_ENABLED:
+            deduplicator = ChunkDeduplicator(
+                store_id,
+                user_id,
+                await get_file_metadata_provider(),
+                # The index being replaced must not count as a copy of itself
+                exclude_file_id=file_id if store_id != file_id else None
+            )
+
+        tasks = [
+            asyncio.create_task(self._extract_stage(source, page_queue, stats)),
+            asyncio.create_task(
+                self._chunk_stage(page_queue, chunk_queue, base_metadata, store_id, stats, deduplicator)
+            ),
+            asyncio.create_task(self._embed_stage(chunk_queue, store_queue, stats)),
+            asyncio.create_task(self._store_stage(store_queue, file_id, store_id, stats)),
+        ]
+
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if stats["chunk_count"] == 0 and stats["chunks_deduplicated"] == 0:
+            raise ValueError("Document contains no extractable text")
+
+        stats["stage"] = "completed"
+        stats["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+
+        logger.info(
+            f"Ingestion pipeline finished for '{file_id}': {stats['page_count']} pages, "
+            f"{stats['chunk_count']} chunks in {stats['batch_count']} batches, "
+            f"{stats['parent_count']} parent chunks, "
+            f"{stats['chunks_deduplicated']} duplicates skipped "
+            f"({stats['elapsed_seconds']}s)"
+        )
+        return stats
+
+    # =========================================================================
+    # Progress Reporting
+    # =========================================================================
+
+    @staticmethod
+    def _current_stage(stats: Dict[str, Any]) -> str:
+        """Earliest stage that still has work (stages overlap while streaming)"""
+        if not stats["extraction_done"]:
+            return "extracting"
+        if not stats["chunking_done"]:
+            return "chunking"
+        if stats["chunks_embedded"] < stats["chunks_created"]:
+            return "embedding"
+        return "storing"
+
+    async def _report_progress(self, stats: Dict[str, Any]):
+        """Refresh the current stage and notify the progress callback"""
+        stats["stage"] = self._current_stage(stats)
+
+        if self._progress_callback is not None:
+            try:
+                await self._progress_callback(dict(stats))
+            except Exception as e:
+                # Progress reporting must never fail the ingestion itself
+                logger.warning(f"Ingestion progress callback failed: {str(e)}")
+
+    # =========================================================================
+    # Pipeline Stages
+    # =========================================================================
+
+    async def _extract_stage(
+        self,
+        source: Union[bytes, str, Path],
+        page_queue: asyncio.Queue,
+        stats: Dict[str, Any]
+    ):
+        """Stage 1: stream page text into the page queue"""
+        async for _, page_text in self.input_service.iter_pdf_pages(source):
+            stats["page_count"] += 1
+            await page_queue.put(page_text)
+
+        stats["extraction_done"] = True
+        await self._report_progress(stats)
+        await page_queue.put(_END)
+
+    async def _chunk_stage(
+        self,
+        page_queue: asyncio.Queue,
+        chunk_queue: asyncio.Queue,
+        base_metadata: Dict[str, Any],
+        store_id: str,
+        stats: Dict[str, Any],
+        deduplicator: Optional[ChunkDeduplicator] = None
+    ):
+        """Stage 2: window the page stream, chunk each window and drop duplicates"""
+
+        async def pages():
+            while True:
+                page_text = await page_queue.get()
+                if page_text is _END:
+                    return
+                yield page_text
+
+        async for chunks in self.input_service.chunk_text_stream(pages(), metadata=base_metadata):
+            if settings.ENABLE_MULTIVECTOR_RETRIEVAL:
+                # Hierarchical parents are served from the doc store, not indexed
+                parents = [chunk for chunk in chunks if chunk.get("is_leaf") is False]
+                if parents:
+                    await self.retrieval_service.add_parent_chunks(store_id, parents)
+                    stats["parent_count"] += len(parents)
+                    chunks = [chunk for chunk in chunks if chunk.get("is_leaf") is not False]
+
+            if deduplicator is not None:
+                unique = await deduplicator.filter(chunks)
+                stats["chunks_deduplicated"] += len(chunks) - len(unique)
+                chunks = unique
+
+            stats["chunks_created"] += len(chunks)
+            for chunk in chunks:
+                await chunk_queue.put(chunk)
+
+        stats["chunking_done"] = True
+        await chunk_queue.put(_END)
+
+    async def _embed_stage(
+        self,
+        chunk_queue: asyncio.Queue,
+        store_queue: asyncio.Queue,
+        stats: Dict[str, Any]
+    ):
+        """Stage 3: group chunks into batches and embed each batch off the loop"""
+        executors = get_ingestion_executors()
+        embedding_provider = self.retrieval_service.embedding_provider
+        batch: List[Dict[str, Any]] = []
+
+        async def flush():
+            texts = [chunk["content"] for chunk in batch]
+            metadatas = [
+                {**chunk["metadata"], "chunk_index": chunk["chunk_index"]}
+                for chunk in batch
+            ]
+            embeddings = await executors.run_embedding(
+                embedding_provider.embed_documents, texts
+            )
+            stats["chunks_embedded"] += len(texts)
+            await store_queue.put((texts, embeddings, metadatas))
+
+        while True:
+            chunk = await chunk_queue.get()
+            if chunk is _END:
+                break
+
+            batch.append(chunk)
+            if len(batch) >= self.batch_size:
+                await flush()
+                batch = []
+
+        if batch:
+            await flush()
+
+        await store_queue.put(_END)
+
+    async def _store_stage(
+        self,
+        store_queue: asyncio.Queue,
+        file_id: str,
+        store_id: str,
+        stats: Dict[str, Any]
+    ):
+        """Stage 4: append embedded batches to the file's vector store"""
+        while True:
+            item = await store_queue.get()
+            if item is _END:
+                return
+
+            texts, embeddings, metadatas = item
+            await self.retrieval_service.add_embedded_chunks(
+                file_id=file_id,
+                chunks=texts,
+                embeddings=embeddings,
+                metadata=metadatas,
+                store_id=store_id
+            )
+
+            stats["chunk_count"] += len(texts)
+            stats["batch_count"] += 1
+            await self._report_progress(stats)
@@ -8,7 +8,9 @@ Supports PDF, DOCX, TXT, and Markdown files.
 import logging
 import hashlib
 import io
-from typing import List, Dict, Optional, Tuple, BinaryIO, Any
+import asyncio
+from collections import deque
+from typing import List, Dict, Optional, Tuple, BinaryIO, Any, AsyncIterator, Iterator, Union
 from pathlib import Path
 from datetime import datetime, timezone
 
@@ -24,7 +26,9 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 # Application imports
 from app.core.config import settings
+from app.core.executors import get_ingestion_executors
 from app.Services.chunking_strategies import (
+    ChunkingStrategy,
     ChunkingStrategyFactory,
     get_default_strategy
 )
@@ -32,6 +36,73 @@ from app.Services.chunking_strategies import (
 logger = logging.getLogger(__name__)
 
 
+# =============================================================================
+# Page-Parallel PDF Extraction (process pool workers)
+# =============================================================================
+
+# PDF source accepted by the extraction workers: raw bytes or a path on disk.
+# Paths are preferred for large files since only the path is pickled per task.
+PdfSource = Union[bytes, str]
+
+
+def _open_pdf(source: PdfSource) -> PdfReader:
+    """Open a PdfReader from bytes or a filesystem path"""
+    if isinstance(source, (bytes, bytearray)):
+        return PdfReader(io.BytesIO(source))
+    return PdfReader(source)
+
+
+def _count_pdf_pages(source: PdfSource) -> int:
+    """Return the number of pages in a PDF (runs off the event loop)"""
+    return len(_open_pdf(source).pages)
+
+
+def _extract_pdf_page_range(
+    source: PdfSource,
+    start: int,
+    end: int
+) -> List[Tuple[int, str]]:
+    """
+    Extract text for pages [start, end) of a PDF
+
+    Module-level so it can be pickled and executed in a worker process.
+    Each worker opens its own PdfReader; readers are not shareable across processes.
+
+    Returns:
+        List of (page_number, page_text) tuples in page order
+    """
+    reader = _open_pdf(source)
+    return [
+        (page_number, reader.pages[page_number].extract_text() or '')
+        for page_number in range(start, end)
+    ]
+
+
+# Per-process strategy cache for chunking in a process pool
+_worker_strategies: Dict[Tuple[str, str], ChunkingStrategy] = {}
+
+
+def _chunk_text_in_worker(
+    strategy_name: str,
+    strategy_kwargs: Dict[str, Any],
+    text: str,
+    metadata: Optional[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Chunk text in a worker process
+
+    Module-level so it can be pickled. The strategy is built once per worker
+    process and reused for every window it receives.
+    """
+    key = (strategy_name, repr(sorted(strategy_kwargs.items())))
+    strategy = _worker_strategies.get(key)
+    if strategy is None:
+        strategy = ChunkingStrategyFactory.create(strategy_name, **strategy_kwargs)
+        _worker_strategies[key] = strategy
+
+    return strategy.chunk(text, metadata=metadata)
+
+
 class InputDataHandleService:
     """
     Service for handling document ingestion workflow
@@ -57,7 +128,7 @@ class InputDataHandleService:
         Initialize Input Data Handle Service
 
         Args:
-            chunking_strategy: Strategy name ("recursive" or "hierarchical")
+            chunking_strategy: Strategy name ("recursive", "hierarchical", "token" or "semantic")
             chunk_size: Text chunk size (default from settings)
             chunk_overlap: Chunk overlap size (default from settings)
             allowed_extensions: Allowed file extensions (default from settings)
@@ -79,19 +150,39 @@ class InputDataHandleService:
         # Strategy Pattern: Initialize chunking strategy
         strategy_name = chunking_strategy or settings.CHUNKING_STRATEGY
         if strategy_name == "hierarchical":
-            self.chunking_strategy = ChunkingStrategyFactory.create(
-                "hierarchical",
-                chunk_sizes=settings.HIERARCHICAL_CHUNK_SIZES,
-                overlap=settings.HIERARCHICAL_OVERLAP,
-                separators=settings.CHUNK_SEPARATORS
-            )
+            self.strategy_name = "hierarchical"
+            self.strategy_kwargs = {
+                "chunk_sizes": settings.HIERARCHICAL_CHUNK_SIZES,
+                "overlap": settings.HIERARCHICAL_OVERLAP,
+                "separators": settings.CHUNK_SEPARATORS
+            }
+        elif strategy_name == "semantic":
+            self.strategy_name = "semantic"
+            self.strategy_kwargs = {
+                "breakpoint_percentile": settings.SEMANTIC_BREAKPOINT_PERCENTILE,
+                "min_chunk_size": settings.SEMANTIC_MIN_CHUNK_SIZE,
+                "max_chunk_size": settings.SEMANTIC_MAX_CHUNK_SIZE
+            }
+        elif strategy_name == "token":
+            self.strategy_name = "token"
+            self.strategy_kwargs = {
+                "model_name": settings.EMBEDDING_MODEL,
+                "chunk_tokens": settings.TOKEN_CHUNK_SIZE,
+                "chunk_overlap": settings.TOKEN_CHUNK_OVERLAP
+            }
         else:
-            self.chunking_strategy = ChunkingStrategyFactory.create(
-                "recursive",
-                chunk_size=self.chunk_size,
-                chunk_overlap=self.chunk_overlap,
-                separators=settings.CHUNK_SEPARATORS
-            )
+            self.strategy_name = "recursive"
+            self.strategy_kwargs = {
+                "chunk_size": self.chunk_size,
+                "chunk_overlap": self.chunk_overlap,
+                "separators": settings.CHUNK_SEPARATORS
+            }
+
+        # Kept alongside the instance so process-pool workers can rebuild it
+        self.chunking_strategy = ChunkingStrategyFactory.create(
+            self.strategy_name, **self.strategy_kwargs
+        )
+        self.executors = get_ingestion_executors()
 
         logger.info(
             f"Input Data Handle Service initialized: "
@@ -118,6 +209,26 @@ class InputDataHandleService:
             >>> if not is_valid:
             ...     raise ValueError(error)
         """
+        return self.validate_upload(filename, len(file_content))
+
+    def validate_upload(
+        self,
+        filename: str,
+        file_size: int
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Validate file by name and size, without needing its content in memory
+
+        Used by the streaming upload path, where the file is spooled to disk
+        and only its size is known.
+
+        Args:
+            filename: Original filename
+            file_size: File size in bytes
+
+        Returns:
+            Tuple of (is_valid, error_message)
+        """
         # Check file extension
         file_ext = Path(filename).suffix.lower().lstrip('.')
         if file_ext not in self.allowed_extensions:
@@ -127,7 +238,6 @@ class InputDataHandleService:
             )
 
         # Check file size
-        file_size = len(file_content)
         if file_size > self.max_file_size:
             max_mb = self.max_file_size / (1024 * 1024)
             current_mb = file_size / (1024 * 1024)
@@ -174,6 +284,133 @@ class InputDataHandleService:
             logger.error(f"PDF extraction failed: {str(e)}")
             raise ValueError(f"Failed to extract PDF: {str(e)}")
 
+    async def count_pdf_pages(self, source: Union[bytes, str, Path]) -> int:
+        """
+        Count PDF pages off the event loop
+
+        Args:
+            source: PDF binary content or path to a PDF on disk
+
+        Returns:
+            Number of pages
+        """
+        if isinstance(source, Path):
+            source = str(source)
+
+        return await self.executors.run_extraction(_count_pdf_pages, source)
+
+    async def iter_pdf_pages(
+        self,
+        source: Union[bytes, str, Path]
+    ) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Stream PDF page text in page order as extraction completes
+
+        Page ranges of PDF_PAGES_PER_TASK pages are fanned out to the shared
+        process pool. Results are yielded in page order: a range is yielded as
+        soon as it and every range before it have finished, so callers can start
+        consuming the first pages while later ranges are still being parsed.
+
+        At most two tasks per worker are in flight at once, so a slow consumer
+        applies backpressure instead of letting extracted pages pile up.
+
+        Documents shorter than PDF_PARALLEL_MIN_PAGES (or with parallel
+        extraction disabled) are extracted in a single task on the extraction
+        thread pool, which still keeps parsing off the event loop.
+
+        Args:
+            source: PDF binary content or path to a PDF on disk
+
+        Yields:
+            (page_number, page_text) tuples, page_number starting at 0
+
+        Raises:
+            ValueError: If PDF parsing fails
+
+        Example:
+            >>> async for page_number, page_text in service.iter_pdf_pages(content):
+            ...     print(page_number, len(page_text))
+        """
+        loop = asyncio.get_running_loop()
+        if isinstance(source, Path):
+            source = str(source)
+
+        try:
+            page_count = await self.executors.run_extraction(_count_pdf_pages, source)
+
+            if not settings.PDF_PARALLEL_EXTRACTION or page_count < settings.PDF_PARALLEL_MIN_PAGES:
+                pages = await self.executors.run_extraction(
+                    _extract_pdf_page_range, source, 0, page_count
+                )
+                for page in pages:
+                    yield page
+                return
+
+            pool = self.executors.extraction_processes
+            step = max(1, settings.PDF_PAGES_PER_TASK)
+            max_in_flight = 2 * self.executors.extraction_process_count
+            ranges = deque(
+                (start, min(start + step, page_count))
+                for start in range(0, page_count, step)
+            )
+            task_count = len(ranges)
+            in_flight = deque()
+
+            def submit_next():
+                start, end = ranges.popleft()
+                in_flight.append(
+                    loop.run_in_executor(pool, _extract_pdf_page_range, source, start, end)
+                )
+
+            try:
+                while ranges and len(in_flight) < max_in_flight:
+                    submit_next()
+
+                # Await in submission order: preserves page order while later
+                # ranges keep running in the pool
+                while in_flight:
+                    pages = await in_flight.popleft()
+                    if ranges:
+                        submit_next()
+                    for page in pages:
+                        yield page
+            finally:
+                for future in in_flight:
+                    future.cancel()
+
+            logger.info(
+                f"Parallel PDF extraction finished: {page_count} pages in {task_count} tasks"
+            )
+
+        except Exception as e:
+            logger.error(f"PDF page extraction failed: {str(e)}")
+            raise ValueError(f"Failed to extract PDF: {str(e)}")
+
+    async def extract_text_from_pdf_async(self, file_content: bytes) -> str:
+        """
+        Extract text from PDF file without blocking the event loop
+
+        Same output as extract_text_from_pdf(), but pages are extracted in
+        parallel through iter_pdf_pages().
+
+        Args:
+            file_content: PDF binary content
+
+        Returns:
+            Extracted text
+
+        Raises:
+            ValueError: If PDF extraction fails
+        """
+        page_texts = [page_text async for _, page_text in self.iter_pdf_pages(file_content)]
+        corpus = ''.join(page_texts)
+
+        if not corpus.strip():
+            raise ValueError("Failed to extract PDF: PDF contains no extractable text")
+
+        logger.info(f"Extracted {len(corpus)} characters from PDF ({len(page_texts)} pages)")
+        return corpus
+
     def extract_text_from_docx(self, file_content: bytes) -> str:
         """
         Extract text from DOCX file
@@ -273,6 +510,31 @@ class InputDataHandleService:
         else:
             raise ValueError(f"Unsupported file extension: {file_ext}")
 
+    async def extract_text_async(
+        self,
+        file_content: bytes,
+        filename: str
+    ) -> str:
+        """
+        Extract text from file based on extension (async variant)
+
+        PDFs go through page-parallel extraction; other formats are cheap
+        enough to extract inline.
+
+        Args:
+            file_content: Binary file content
+            filename: Original filename
+
+        Returns:
+            Extracted text
+        """
+        file_ext = Path(filename).suffix.lower().lstrip('.')
+
+        if file_ext == 'pdf':
+            return await self.extract_text_from_pdf_async(file_content)
+
+        return self.extract_text(file_content, filename)
+
     def chunk_text(
         self,
         text: str,
@@ -308,6 +570,138 @@ class InputDataHandleService:
             logger.error(f"Text chunking failed: {str(e)}")
             raise ValueError(f"Failed to chunk text: {str(e)}")
 
+    async def chunk_text_async(
+        self,
+        text: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Chunk text on the ingestion chunking pool
+
+        In process mode the strategy is rebuilt inside the worker from
+        strategy_name/strategy_kwargs; in thread mode chunk_text() is used.
+
+        Args:
+            text: Text to chunk
+            metadata: Optional metadata to attach to chunks
+
+        Returns:
+            List of chunk dicts
+        """
+        if not self.executors.chunking_uses_processes:
+            return await self.executors.run_chunking(self.chunk_text, text, metadata)
+
+        try:
+            return await self.executors.run_chunking(
+                _chunk_text_in_worker,
+                self.strategy_name,
+                self.strategy_kwargs,
+                text,
+                metadata
+            )
+        except Exception as e:
+            logger.error(f"Text chunking failed: {str(e)}")
+            raise ValueError(f"Failed to chunk text: {str(e)}")
+
+    def split_text_window(self, buffer: str, window_size: int) -> Tuple[str, str]:
+        """
+        Cut a text buffer into a head to chunk now and a tail to carry over
+
+        The cut is placed at the last paragraph, line or word boundary in the
+        second half of the window, so no chunk ever spans a window boundary
+        in the middle of a sentence. Falls back to a hard cut at window_size.
+
+        Args:
+            buffer: Accumulated text
+            window_size: Target head length in characters
+
+        Returns:
+            Tuple of (head, tail)
+        """
+        for separator in ("\n\n", "\n", " "):
+            cut = buffer.rfind(separator, window_size // 2, window_size)
+            if cut != -1:
+                cut += len(separator)
+                return buffer[:cut], buffer[cut:]
+
+        return buffer[:window_size], buffer[window_size:]
+
+    async def chunk_text_stream(
+        self,
+        texts: AsyncIterator[str],
+        metadata: Optional[Dict[str, Any]] = None,
+        window_size: Optional[int] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Chunk a stream of text (e.g. PDF pages) window by window
+
+        Text is buffered until it reaches window_size characters, then the
+        head of the buffer is chunked with the configured strategy while the
+        tail waits for more input. Memory is bounded by the window, not the
+        document. Chunking runs on the ingestion chunking pool.
+
+        chunk_index (and level_index for hierarchical chunks) are renumbered
+        so they stay unique across windows; character offsets (start_index,
+        end_index) are shifted to positions in the concatenated stream.
+
+        Args:
+            texts: Async iterator of text pieces in document order
+            metadata: Optional metadata to attach to chunks
+            window_size: Window size in characters (default from settings)
+
+        Yields:
+            List of chunk dicts for each window
+
+        Example:
+            >>> pages = (text async for _, text in service.iter_pdf_pages(path))
+            >>> async for chunks in service.chunk_text_stream(pages, {"file_id": "abc"}):
+            ...     print(len(chunks))
+        """
+        window_size = window_size or settings.INGEST_CHUNK_WINDOW_CHARS
+        chunk_count = 0
+        char_offset = 0
+        level_counts: Dict[int, int] = {}
+
+        async def chunk_window(window_text: str) -> List[Dict[str, Any]]:
+            nonlocal chunk_count, char_offset
+
+            window_offset = char_offset
+            char_offset += len(window_text)
+
+            if not window_text.strip():
+                return []
+
+            chunks = await self.chunk_text_async(window_text, metadata=dict(metadata or {}))
+
+            for chunk in chunks:
+                chunk["chunk_index"] += chunk_count
+                if "level" in chunk:
+                    chunk["level_index"] += level_counts.get(chunk["level"], 0)
+                if "start_index" in chunk and window_offset:
+                    for span in (chunk, chunk["metadata"]):
+                        span["start_index"] += window_offset
+                        span["end_index"] += window_offset
+
+            for chunk in chunks:
+                if "level" in chunk:
+                    level_counts[chunk["level"]] = level_counts.get(chunk["level"], 0) + 1
+            chunk_count += len(chunks)
+
+            return chunks
+
+        buffer = ""
+        async for text in texts:
+            buffer += text
+            while len(buffer) >= window_size:
+                head, buffer = self.split_text_window(buffer, window_size)
+                chunks = await chunk_window(head)
+                if chunks:
+                    yield chunks
+
+        chunks = await chunk_window(buffer)
+        if chunks:
+            yield chunks
+
     def chunk_text_legacy(self, text: str) -> List[str]:
         """
         Legacy method: Split text into simple string chunks
@@ -333,15 +727,17 @@ class InputDataHandleService:
 
     def generate_file_id(
         self,
-        file_content: bytes,
-        filename: str
+        file_content: Optional[bytes],
+        filename: str,
+        content_hash: Optional[str] = None
     ) -> str:
         """
         Generate unique file ID with timestamp + UUID + content hash
 
         Args:
-            file_content: Binary file content
+            file_content: Binary file content (may be None if content_hash given)
             filename: Original filename
+            content_hash: Precomputed SHA256 hex digest (streaming uploads)
 
         Returns:
             Unique file ID (format: "file_{timestamp}_{uuid8}_{hash8}")
@@ -365,18 +761,20 @@ class InputDataHandleService:
         uuid_part = str(uuid.uuid4()).replace('-', '')[:8]
 
         # Component 3: Content hash (duplicate detection)
-        content_hash = hashlib.sha256(file_content).hexdigest()[:8]
+        if content_hash is None:
+            content_hash = hashlib.sha256(file_content).hexdigest()
 
-        file_id = f"file_{timestamp}_{uuid_part}_{content_hash}"
+        file_id = f"file_{timestamp}_{uuid_part}_{content_hash[:8]}"
 
         return file_id
 
     async def generate_unique_file_id(
         self,
-        file_content: bytes,
+        file_content: Optional[bytes],
         filename: str,
         file_metadata_provider,
-        max_retries: int = 3
+        max_retries: int = 3,
+        content_hash: Optional[str] = None
     ) -> str:
         """
         Generate unique file ID with database collision detection
@@ -390,6 +788,7 @@ class InputDataHandleService:
             filename: Original filename
             file_metadata_provider: FileMetadataProvider instance for DB checks
             max_retries: Maximum number of generation attempts (default: 3)
+            content_hash: Precomputed SHA256 hex digest (streaming uploads)
 
         Returns:
             Unique file ID guaranteed not to exist in database
@@ -409,7 +808,7 @@ class InputDataHandleService:
         """
         for attempt in range(max_retries):
             # Generate candidate file_id
-            file_id = self.generate_file_id(file_content, filename)
+            file_id = self.generate_file_id(file_content, filename, content_hash=content_hash)
 
             # Check if file_id already exists in database
             try:
@@ -524,12 +923,12 @@ class InputDataHandleService:
             # Fallback to simple generation (for backward compatibility)
             file_id = self.generate_file_id(file_content, filename)
 
-        # Step 3: Extract text
-        text = self.extract_text(file_content, filename)
+        # Step 3: Extract text (page-parallel for PDFs)
+        text = await self.extract_text_async(file_content, filename)
 
         # Step 4: Chunk text using strategy
         base_metadata = {"file_id": file_id, "filename": filename}
-        chunks = self.chunk_text(text, metadata=base_metadata)
+        chunks = await self.chunk_text_async(text, metadata=base_metadata)
 
         # Step 5: Enrich chunk metadata
         chunks = self.enrich_chunk_metadata(
@@ -3,14 +3,35 @@ Retrieval Service
 
 Coordinates embedding and vector store providers for document retrieval.
 Handles query processing and context assembly for RAG pipeline.
+
+With hierarchical chunking and ENABLE_MULTIVECTOR_RETRIEVAL, only leaf
+chunks are embedded and indexed; their parents are kept in the chunks_metadata
+table (the doc store, keyed by chunk_id). Searches match leaves and return
+each hit's parent as context, fetched once per distinct parent.
+
+Chunks skipped at ingest as duplicates of another file's chunk (see
+chunk_dedup_service) are served from that file's store and reported under
+the referencing file.
 """
 
+import asyncio
+import json
 import logging
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
+
+import numpy as np
 from fastapi import Depends
 
+from app.core.config import settings
+from app.core.executors import get_ingestion_executors
 from app.Providers.embedding_provider.client import EmbeddingProvider, get_embedding_provider
+from app.Providers.file_metadata_provider.client import (
+    FileMetadataProvider,
+    get_file_metadata_provider
+)
 from app.Providers.vector_store_provider.client import VectorStoreProvider, get_vector_store_provider
+from app.Providers.vector_store_provider.ranking import merge_top_k
+from app.Services.chunk_dedup_service import chunk_signature, signature_row
 
 logger = logging.getLogger(__name__)
 
@@ -63,8 +84,11 @@ class RetrievalService:
             >>> store_id = await service.add_document_chunks("file_123", chunks, metadata)
         """
         try:
-            # Get the underlying embedding model for LangChain integration
-            embeddings = self.embedding_provider.get_underlying_model()
+            executors = get_ingestion_executors()
+
+            # The provider implements LangChain's Embeddings interface, so the
+            # store embeds through its size-aware batching
+            embeddings = self.embedding_provider
 
             # Enhance metadata with file_id
             if metadata is None:
@@ -75,14 +99,17 @@ class RetrievalService:
                     if "chunk_index" not in meta:
                         meta["chunk_index"] = i
 
-            # Create vector store from chunks
-            store_id = self.vector_store_provider.create_store_from_texts(
+            # Create vector store from chunks (embeds every chunk: CPU-bound)
+            store_id = await executors.run_embedding(
+                self.vector_store_provider.create_store_from_texts,
                 texts=chunks,
                 embeddings=embeddings,
                 metadatas=metadata,
                 file_id=file_id
             )
 
+            await executors.run_embedding(self.vector_store_provider.persist_store, store_id)
+
             logger.info(f"Added {len(chunks)} chunks for file '{file_id}' to store '{store_id}'")
             return store_id
 
@@ -90,6 +117,165 @@ class RetrievalService:
             logger.error(f"Error adding document chunks: {str(e)}")
             raise
 
+    async def add_embedded_chunks(
+        self,
+        file_id: str,
+        chunks: List[str],
+        embeddings: List[List[float]],
+        metadata: List[dict],
+        store_id: Optional[str] = None
+    ) -> str:
+        """
+        Append a batch of already-embedded chunks to a file's vector store
+
+        The store is created on the first batch; later batches are appended,
+        so chunks become searchable while the rest of the file is still
+        being processed.
+
+        Args:
+            file_id: Unique identifier for the document
+            chunks: Text chunks for this batch
+            embeddings: Embedding vectors aligned with chunks
+            metadata: Metadata for each chunk
+            store_id: Vector store to append to (default: file_id; a staging
+                store while the file is re-indexed)
+
+        Returns:
+            str: Vector store identifier
+        """
+        try:
+            for meta in metadata:
+                meta["file_id"] = file_id
+
+            executors = get_ingestion_executors()
+
+            return await executors.run_embedding(
+                self.vector_store_provider.add_embeddings,
+                store_id=store_id or file_id,
+                texts=chunks,
+                embeddings=embeddings,
+                embedding_model=self.embedding_provider,
+                metadatas=metadata
+            )
+
+        except Exception as e:
+            logger.error(f"Error adding embedded chunks: {str(e)}")
+            raise
+
+    async def add_parent_chunks(self, file_id: str, chunks: List[Dict[str, Any]]):
+        """
+        Store non-leaf hierarchical chunks in the doc store (not embedded)
+
+        Args:
+            file_id: Unique identifier for the document
+            chunks: Chunk dicts from HierarchicalChunkingStrategy
+        """
+        if not chunks:
+            return
+
+        file_metadata_provider = await get_file_metadata_provider()
+        await file_metadata_provider.add_chunks(
+            file_id,
+            [
+                {
+                    "chunk_id": chunk["chunk_id"],
+                    "chunk_index": chunk["chunk_index"],
+                    "chunk_text": chunk["content"],
+                    "start_index": chunk.get("start_index"),
+                    "end_index": chunk.get("end_index")
+                }
+                for chunk in chunks
+            ]
+        )
+
+    async def expand_to_parents(
+        self,
+        hit_lists: List[List[Dict[str, Any]]]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Replace leaf hits with their parent chunks from the doc store
+
+        Parents are fetched in one query across all lists. Within a list,
+        a parent is returned once, at the rank (and score) of its best
+        matching leaf. Hits without a stored parent (non-hierarchical
+        files) are returned unchanged.
+
+        Args:
+            hit_lists: Search results, each ordered best first
+
+        Returns:
+            Hit lists aligned with hit_lists; expanded hits carry the
+            parent's content, chunk_id and character span, plus
+            matched_chunk_id, matched_content and matched_span of the leaf
+
+        Example:
+            >>> [context] = await service.expand_to_parents([hits])
+        """
+        if not settings.ENABLE_MULTIVECTOR_RETRIEVAL:
+            return hit_lists
+
+        parent_ids = [
+            hit["metadata"]["parent_id"]
+            for hits in hit_lists for hit in hits
+            if hit.get("metadata", {}).get("parent_id")
+        ]
+        if not parent_ids:
+            return hit_lists
+
+        file_metadata_provider = await get_file_metadata_provider()
+        parents = await file_metadata_provider.get_chunks(parent_ids)
+
+        expanded_lists = []
+        for hits in hit_lists:
+            expanded: List[Dict[str, Any]] = []
+            seen = set()
+
+            for hit in hits:
+                metadata = hit.get("metadata", {})
+                parent = parents.get(metadata.get("parent_id"))
+                if parent is None:
+                    expanded.append(hit)
+                    continue
+
+                if parent["chunk_id"] in seen:
+                    continue
+                seen.add(parent["chunk_id"])
+
+                parent_metadata = {
+                    **metadata,
+                    "chunk_id": parent["chunk_id"],
+                    "chunk_index": parent["chunk_index"],
+                    "matched_chunk_id": metadata.get("chunk_id"),
+                    "matched_content": hit.get("content", "")
+                }
+                parent_metadata.pop("parent_id", None)
+                if "level" in metadata:
+                    parent_metadata["level"] = metadata["level"] - 1
+                if parent.get("start_index") is not None:
+                    parent_metadata["start_index"] = parent["start_index"]
+                    parent_metadata["end_index"] = parent["end_index"]
+                    parent_metadata["matched_span"] = [metadata.get("start_index"), metadata.get("end_index")]
+
+                expanded.append({**hit, "content": parent["chunk_text"], "metadata": parent_metadata})
+
+            expanded_lists.append(expanded)
+
+        return expanded_lists
+
+    async def persist_document(self, file_id: str):
+        """
+        Persist a document's completed vector store to disk
+
+        Called once ingestion has stored every batch, so the store survives
+        restarts and is loaded lazily on first use.
+
+        Args:
+            file_id: Document identifier
+        """
+        await get_ingestion_executors().run_embedding(
+            self.vector_store_provider.persist_store, file_id
+        )
+
     async def retrieve_context(
         self,
         query: str,
@@ -118,39 +304,26 @@ class RetrievalService:
             >>> print(context[0]['content'])
         """
         try:
-            all_results = []
-
-            # Search in each file's vector store
-            for file_id in file_ids:
-                try:
-                    if include_scores:
-                        results = self.vector_store_provider.similarity_search_with_score(
-                            store_id=file_id,
-                            query=query,
-                            k=top_k
-                        )
-                    else:
-                        results = self.vector_store_provider.similarity_search(
-                            store_id=file_id,
-                            query=query,
-                            k=top_k
-                        )
-
-                    all_results.extend(results)
-
-                except ValueError as e:
-                    logger.warning(f"Store not found for file_id '{file_id}': {str(e)}")
-                    continue
-                except Exception as e:
-                    logger.error(f"Error searching in store '{file_id}': {str(e)}")
-                    continue
-
-            # Sort by score if available (lower is better for FAISS)
-            if include_scores and all_results:
-                all_results.sort(key=lambda x: x.get('score', float('inf')))
+            # Embed the query once (coalesced with concurrent identical and
+            # nearby queries), then search every file's store with the vector
+            query_embedding = await self.embedding_provider.aembed_query(query)
+
+            references = await self._reference_scope(file_ids)
+
+            # Off the event loop: the search may be a remote (Milvus) call
+            [final_results] = await asyncio.get_running_loop().run_in_executor(
+                None,
+                self._search_with_references,
+                file_ids,
+                np.asarray([query_embedding], dtype=np.float32),
+                top_k,
+                references
+            )
+            [final_results] = await self.expand_to_parents([final_results])
 
-            # Limit to top_k overall results
-            final_results = all_results[:top_k]
+            if not include_scores:
+                for result in final_results:
+                    result.pop("score", None)
 
             logger.info(f"Retrieved {len(final_results)} context chunks for query from {len(file_ids)} files")
             return final_results
@@ -159,6 +332,227 @@ class RetrievalService:
             logger.error(f"Error retrieving context: {str(e)}")
             raise
 
+    async def retrieve_context_batch(
+        self,
+        query: str,
+        expanded_questions: List[str],
+        file_ids: List[str],
+        top_k: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Retrieve context for a query and its expanded sub-questions at once
+
+        All questions are embedded in one encoder call and each index is
+        searched once with the whole query matrix, so cost grows
+        sub-linearly with the number of expanded questions. Embedding and
+        search run off the event loop.
+
+        Args:
+            query: Original user query
+            expanded_questions: Sub-questions from query expansion
+            file_ids: List of file IDs to search within
+            top_k: Number of results per question
+
+        Returns:
+            Dict with:
+            - questions: Deduplicated questions searched (original query first)
+            - per_question: Top-k hits per question, aligned with questions
+            - merged: Unique hits across all questions, best score first
+
+        Example:
+            >>> batch = await service.retrieve_context_batch(
+            ...     query="What is RAG?",
+            ...     expanded_questions=["How does retrieval work?", "What is generation?"],
+            ...     file_ids=["file_123"],
+            ...     top_k=3
+            ... )
+            >>> context_chunks = batch["merged"]
+        """
+        try:
+            questions = list(dict.fromkeys([query, *expanded_questions]))
+            loop = asyncio.get_running_loop()
+
+            query_embeddings = await loop.run_in_executor(
+                None, self.embedding_provider.embed_queries, questions
+            )
+
+            references = await self._reference_scope(file_ids)
+
+            per_question = await loop.run_in_executor(
+                None,
+                self._search_with_references,
+                file_ids,
+                query_embeddings,
+                top_k,
+                references
+            )
+
+            # Keep each chunk once, at the best score any question gave it
+            best: Dict[str, Dict[str, Any]] = {}
+            for hits in per_question:
+                for hit in hits:
+                    content = hit.get("content", "")
+                    if content and (content not in best or hit["score"] < best[content]["score"]):
+                        best[content] = hit
+
+            merged = sorted(best.values(), key=lambda hit: hit["score"])
+            *per_question, merged = await self.expand_to_parents([*per_question, merged])
+
+            logger.info(
+                f"Retrieved {len(merged)} unique context chunks for {len(questions)} "
+                f"questions from {len(file_ids)} files"
+            )
+            return {
+                "questions": questions,
+                "per_question": per_question,
+                "merged": merged
+            }
+
+        except Exception as e:
+            logger.error(f"Error retrieving batched context: {str(e)}")
+            raise
+
+    async def _reference_scope(self, file_ids: List[str]) -> Dict[Tuple[str, int], str]:
+        """
+        Chunks of other files that the searched files reference as duplicates
+
+        Returns:
+            Dict mapping (canonical file_id, chunk_index) to the referencing file_id
+        """
+        file_metadata_provider = await get_file_metadata_provider()
+        scope: Dict[Tuple[str, int], str] = {}
+
+        for reference in await file_metadata_provider.get_chunk_references(file_ids):
+            if reference["canonical_file_id"] not in file_ids:
+                key = (reference["canonical_file_id"], reference["canonical_chunk_index"])
+                scope.setdefault(key, reference["file_id"])
+
+        return scope
+
+    def _search_with_references(
+        self,
+        file_ids: List[str],
+        query_vectors: Any,
+        k: int,
+        references: Dict[Tuple[str, int], str]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Batched search of file_ids plus the referenced chunks of other files
+
+        Only the referenced chunks of the canonical files are searched (an
+        ID-restricted search, so a chunk is found however low it ranks in its
+        file); hits are relabeled with the referencing file_id (and
+        duplicate_of set to the canonical file) before the top-k merge.
+        """
+        results = self.vector_store_provider.search_stores_by_vectors(file_ids, query_vectors, k)
+        if not references:
+            return results
+
+        chunks: Dict[str, List[int]] = {}
+        for canonical_file_id, chunk_index in references:
+            chunks.setdefault(canonical_file_id, []).append(chunk_index)
+        canonical_results = self.vector_store_provider.search_chunks_by_vectors(
+            chunks, query_vectors, k
+        )
+
+        merged = []
+        for hits, canonical_hits in zip(results, canonical_results):
+            referenced = []
+            for hit in canonical_hits:
+                metadata = hit.get("metadata", {})
+                key = (metadata.get("file_id"), metadata.get("chunk_index"))
+                if key in references:
+                    referenced.append({
+                        **hit,
+                        "metadata": {**metadata, "file_id": references[key], "duplicate_of": key[0]}
+                    })
+            merged.append(merge_top_k([hits, referenced], k))
+
+        return merged
+
+    async def promote_chunk_references(self, file_id: str) -> int:
+        """
+        Index the chunks other files skipped as duplicates of this file's
+
+        Called before a file's vectors are deleted: each referencing file
+        gets its own copy of the referenced chunks (re-embedded, usually
+        from the embedding cache), which become canonical for later
+        duplicate detection.
+
+        Chunks are embedded with the current model, so files whose index
+        was built under another config (stale manifest) are skipped: their
+        vectors would mix models, and the background re-index rebuilds them
+        in full, duplicates included.
+
+        Args:
+            file_id: File about to be deleted
+
+        Returns:
+            Number of chunks re-indexed
+        """
+        # Imported here: the ingestion job service imports this module
+        from app.Services.ingestion_job_service import IngestionJobService
+
+        file_metadata_provider = await get_file_metadata_provider()
+        references = await file_metadata_provider.get_references_to(file_id)
+
+        by_file: Dict[str, List[Dict[str, Any]]] = {}
+        for reference in references:
+            by_file.setdefault(reference["file_id"], []).append(reference)
+
+        fingerprint = IngestionJobService.config_fingerprint() if by_file else None
+        promoted = 0
+
+        executors = get_ingestion_executors()
+        for referencing_file_id, file_references in by_file.items():
+            if await self._has_stale_index(referencing_file_id, fingerprint, file_metadata_provider):
+                logger.info(
+                    f"Not promoting {len(file_references)} chunks into '{referencing_file_id}': "
+                    f"indexed under another config, left to the re-index"
+                )
+                continue
+
+            texts = [reference["chunk_text"] for reference in file_references]
+            metadata = [json.loads(reference["metadata_json"] or "{}") for reference in file_references]
+
+            embeddings = await executors.run_embedding(self.embedding_provider.embed_documents, texts)
+            await self.add_embedded_chunks(referencing_file_id, texts, embeddings, metadata)
+            await self.persist_document(referencing_file_id)
+
+            await file_metadata_provider.add_chunk_signatures([
+                signature_row(
+                    referencing_file_id,
+                    reference["chunk_index"],
+                    reference["user_id"],
+                    *chunk_signature(reference["chunk_text"])
+                )
+                for reference in file_references
+            ])
+            promoted += len(file_references)
+
+        if promoted:
+            logger.info(
+                f"Re-indexed {promoted} duplicate chunks in {len(by_file)} files "
+                f"before deleting '{file_id}'"
+            )
+        return promoted
+
+    @staticmethod
+    async def _has_stale_index(
+        file_id: str,
+        fingerprint: str,
+        file_metadata_provider: FileMetadataProvider
+    ) -> bool:
+        """Whether a file's index was built under another config than fingerprint"""
+        manifest = await file_metadata_provider.get_index_manifest(file_id)
+        if manifest is not None:
+            return manifest["config_fingerprint"] != fingerprint
+
+        # No manifest: a completed file predates manifests (stale); files
+        # still ingesting (or staging ids) are built with the current config
+        file_data = await file_metadata_provider.get_file(file_id)
+        return bool(file_data) and file_data.get("embedding_status") == "completed"
+
     async def retrieve_context_text(
         self,
         query: str,
@@ -208,13 +602,35 @@ class RetrievalService:
 
     async def delete_document(self, file_id: str):
         """
-        Delete a document's vector store
+        Delete a document's vector store, doc store chunks and duplicate
+        signatures
+
+        Chunks other files reference as duplicates are first re-indexed in
+        those files (see promote_chunk_references). If that fails, nothing is
+        deleted: the canonical vectors stay, so the other files keep their
+        chunks, and the delete can be retried.
 
         Args:
             file_id: Document identifier
+
+        Raises:
+            Exception: If promotion or deletion fails
         """
         try:
-            self.vector_store_provider.delete_store(file_id)
+            await self.promote_chunk_references(file_id)
+        except Exception as e:
+            logger.error(
+                f"Failed to promote chunks referencing '{file_id}', not deleting it: {str(e)}"
+            )
+            raise
+
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.vector_store_provider.delete_store, file_id
+            )
+            file_metadata_provider = await get_file_metadata_provider()
+            await file_metadata_provider.delete_file_chunks(file_id)
+            await file_metadata_provider.delete_chunk_dedup(file_id)
             logger.info(f"Deleted vector store for file '{file_id}'")
         except Exception as e:
             logger.error(f"Error deleting document '{file_id}': {str(e)}")
@@ -12,7 +12,6 @@ Implements five-phase RAG pipeline with SSE streaming:
 
 import json
 import logging
-import asyncio
 from typing import List, Optional
 from datetime import datetime, timezone
 
@@ -168,26 +167,15 @@ async def chat_stream(
                 "message": "Retrieving relevant context from documents..."
             })
 
-            # Retrieve context for each expanded question in parallel
-            retrieval_tasks = [
-                retrieval_service.retrieve_context(
-                    query=question,
-                    file_ids=request.file_ids,
-                    top_k=request.top_k
-                )
-                for question in expanded_questions
-            ]
-
-            retrieval_results = await asyncio.gather(*retrieval_tasks)
-
-            # Merge and deduplicate context chunks
-            seen_contents = set()
-            for results in retrieval_results:
-                for result in results:
-                    content = result.get("content", "")
-                    if content and content not in seen_contents:
-                        context_chunks.append(result)
-                        seen_contents.add(content)
+            # Embed the query and every expanded question together and search
+            # each index once; hits come back merged and deduplicated
+            retrieval = await retrieval_service.retrieve_context_batch(
+                query=request.query,
+                expanded_questions=expanded_questions,
+                file_ids=request.file_ids,
+                top_k=request.top_k
+            )
+            context_chunks = retrieval["merged"]
 
             logger.info(f"Retrieved {len(context_chunks)} unique context chunks")
 
@@ -389,25 +377,13 @@ async def chat_non_streaming(
             expanded_questions = expansion_result.get("expanded_questions", [request.query])
 
         # Phase 2: Parallel Retrieval
-        retrieval_tasks = [
-            retrieval_service.retrieve_context(
-                query=question,
-                file_ids=request.file_ids,
-                top_k=request.top_k
-            )
-            for question in expanded_questions
-        ]
-        retrieval_results = await asyncio.gather(*retrieval_tasks)
-
-        # Merge and deduplicate
-        context_chunks = []
-        seen_contents = set()
-        for results in retrieval_results:
-            for result in results:
-                content = result.get("content", "")
-                if content and content not in seen_contents:
-                    context_chunks.append(result)
-                    seen_contents.add(content)
+        retrieval = await retrieval_service.retrieve_context_batch(
+            query=request.query,
+            expanded_questions=expanded_questions,
+            file_ids=request.file_ids,
+            top_k=request.top_k
+        )
+        context_chunks = retrieval["merged"]
 
         # Phase 3: Context Assembly
         chat_history = await chat_history_provider.get_chat_history(
@@ -18,6 +18,12 @@ from app.Providers.file_metadata_provider.client import (
     FileMetadataProvider,
     get_file_metadata_provider
 )
+from app.Providers.vector_store_provider.client import (
+    VectorStoreProvider,
+    get_vector_store_provider
+)
+from app.Providers.embedding_provider.client import get_embedding_provider
+from app.Services.retrieval_service import RetrievalService
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -117,7 +123,8 @@ async def list_user_files(
 async def delete_file(
     file_id: str,
     user_id: str = Header(..., alias="X-User-ID", description="User UUID (required)"),
-    file_metadata_provider: FileMetadataProvider = Depends(get_file_metadata_provider)
+    file_metadata_provider: FileMetadataProvider = Depends(get_file_metadata_provider),
+    vector_store_provider: VectorStoreProvider = Depends(get_vector_store_provider)
 ):
     """
     Delete file (only owner can delete)
@@ -126,6 +133,7 @@ async def delete_file(
         file_id: File identifier to delete
         user_id: User identifier from X-User-ID header (UUID v4)
         file_metadata_provider: File metadata provider (dependency injection)
+        vector_store_provider: Vector store provider (dependency injection)
 
     Returns:
         Success message with deleted file_id
@@ -193,6 +201,14 @@ async def delete_file(
                 }
             )
 
+        # Vectors, chunks and dedup signatures; other files' duplicate
+        # references to this file's chunks get their own copies first
+        retrieval_service = RetrievalService(
+            embedding_provider=get_embedding_provider(),
+            vector_store_provider=vector_store_provider
+        )
+        await retrieval_service.delete_document(file_id)
+
         # Delete from database
         await file_metadata_provider.delete_file(file_id)
 
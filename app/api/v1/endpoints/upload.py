@@ -4,17 +4,19 @@ Upload API Endpoint
 
 Handles PDF file uploads with text extraction, hierarchical chunking, and vectorization.
 
-POST /api/v1/upload - Upload single PDF file for processing
+POST /api/v1/upload - Upload single PDF file and queue it for processing
+GET /api/v1/upload/{file_id}/status - Poll background ingestion progress
 """
 
 import logging
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, BackgroundTasks, Header
+import hashlib
+import uuid
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Header
 from pathlib import Path
-import shutil
-from typing import Optional
+from typing import Optional, Tuple
 
 # Application imports
-from app.models.schemas import UploadResponse, ErrorResponse
+from app.models.schemas import UploadResponse, UploadStatusResponse, ErrorResponse
 from app.Services.input_data_handle_service import (
     InputDataHandleService,
     get_input_data_service
@@ -23,12 +25,9 @@ from app.Providers.file_metadata_provider.client import (
     FileMetadataProvider,
     get_file_metadata_provider
 )
-from app.Providers.embedding_provider.client import (
-    get_embedding_provider
-)
-from app.Services.retrieval_service import (
-    RetrievalService,
-    get_retrieval_service
+from app.Services.ingestion_job_service import (
+    IngestionJobService,
+    get_ingestion_job_service
 )
 from app.core.config import settings
 
@@ -41,140 +40,197 @@ router = APIRouter(prefix="/upload", tags=["upload"])
 # Helper Functions
 # =============================================================================
 
-def save_uploaded_file(file_content: bytes, filename: str, file_id: str) -> Path:
+async def spool_upload_to_disk(
+    file: UploadFile,
+    max_file_size: int
+) -> Tuple[Path, int, str]:
     """
-    Save uploaded file content to disk
+    Stream an upload to a temporary file in chunks
+
+    The upload is never held in memory as a whole: it is read in
+    UPLOAD_READ_CHUNK_SIZE pieces, hashed incrementally and written to a
+    ".part" file in the upload directory. Reading stops as soon as the
+    size limit is exceeded.
 
     Args:
-        file_content: Binary file content
-        filename: Original filename (for extension extraction)
-        file_id: Generated file identifier
+        file: Uploaded file
+        max_file_size: Maximum allowed size in bytes
 
     Returns:
-        Path to saved file
+        Tuple of (temp_path, file_size, sha256_hexdigest)
 
-    Example:
-        >>> file_path = save_uploaded_file(content, "doc.pdf", "file_abc123")
+    Raises:
+        ValueError: If the upload exceeds max_file_size
     """
-    # Ensure upload directory exists
     upload_dir = Path(settings.PDF_UPLOAD_DIR)
     upload_dir.mkdir(parents=True, exist_ok=True)
+    temp_path = upload_dir / f".upload_{uuid.uuid4().hex}.part"
 
-    # Save with file_id as filename
-    file_extension = Path(filename).suffix
-    file_path = upload_dir / f"{file_id}{file_extension}"
+    hasher = hashlib.sha256()
+    file_size = 0
 
-    # Write binary content directly
-    with file_path.open("wb") as buffer:
-        buffer.write(file_content)
+    try:
+        with temp_path.open("wb") as buffer:
+            while True:
+                piece = await file.read(settings.UPLOAD_READ_CHUNK_SIZE)
+                if not piece:
+                    break
+
+                file_size += len(piece)
+                if file_size > max_file_size:
+                    max_mb = max_file_size / (1024 * 1024)
+                    raise ValueError(f"File too large: exceeds {max_mb:.2f}MB limit")
+
+                hasher.update(piece)
+                buffer.write(piece)
+    except Exception:
+        temp_path.unlink(missing_ok=True)
+        raise
 
-    logger.info(f"Saved uploaded file: {file_path} ({len(file_content)} bytes)")
-    return file_path
+    return temp_path, file_size, hasher.hexdigest()
 
 
-async def process_and_embed_file(
-    file_content: bytes,
+async def register_and_enqueue_file(
+    file_path: Path,
     filename: str,
+    file_size: int,
+    content_hash: str,
     user_id: str,
     input_service: InputDataHandleService,
-    retrieval_service: RetrievalService,
     file_metadata_provider: FileMetadataProvider,
-    embedding_provider
+    job_service: IngestionJobService
 ) -> dict:
     """
-    Process file and generate embeddings (Multi-User Support)
+    Store an upload and queue it for background ingestion (Multi-User Support)
 
     Workflow:
-    1. Extract text from PDF
-    2. Chunk text using hierarchical strategy
-    3. Generate embeddings for chunks
-    4. Store in vector database
-    5. Update file metadata with user ownership
+    1. Generate unique file_id
+    2. Move the spooled upload into place (kept for every file_id, so a
+       later re-index can rebuild it)
+    3. If identical content was already ingested with the current chunking
+       and embedding config, record the new ownership and reuse its vectors
+    4. Otherwise register file metadata with user ownership
+       (embedding_status 'pending') and enqueue an ingestion job; a worker
+       streams pages → chunks → embedding batches → vector store (see
+       IngestionJobService)
 
     Args:
-        file_content: Binary file content
+        file_path: Path to the spooled upload on disk
         filename: Original filename
+        file_size: File size in bytes
+        content_hash: SHA256 hex digest of the file content
         user_id: User identifier (UUID format)
         input_service: Input data handle service
-        retrieval_service: Retrieval service for embedding
         file_metadata_provider: File metadata provider
-        embedding_provider: Embedding provider
+        job_service: Ingestion job service
 
     Returns:
-        Processing result dict with user_id
+        Dict with file_id, job_id (None when deduplicated), chunk_count,
+        embedding_status and chunking_strategy
 
     Example:
-        >>> result = await process_and_embed_file(
-        ...     content, "doc.pdf", "550e8400-...", ...
+        >>> result = await register_and_enqueue_file(
+        ...     path, "doc.pdf", 1024, "e5f6...", "550e8400-...", ...
         ... )
     """
+    # Step 1: Generate unique file_id (with collision detection)
+    file_id = await input_service.generate_unique_file_id(
+        None,
+        filename,
+        file_metadata_provider,
+        content_hash=content_hash
+    )
+
+    chunking_strategy = input_service.chunking_strategy.get_strategy_name()
+    file_metadata = {
+        "chunking_strategy": chunking_strategy,
+        "chunk_sizes": settings.HIERARCHICAL_CHUNK_SIZES if settings.CHUNKING_STRATEGY == "hierarchical" else None
+    }
+
+    # Step 2: Keep the upload (re-indexing rebuilds files from it)
+    stored_path = Path(settings.PDF_UPLOAD_DIR) / f"{file_id}{Path(filename).suffix}"
+    file_path.replace(stored_path)
+    logger.info(f"Saved uploaded file: {stored_path} ({file_size} bytes)")
+
+    # Step 3: Reuse an identical, already-indexed upload
     try:
-        # Step 1: Process file (extract + chunk) with unique file_id generation
-        process_result = await input_service.process_file(
-            file_content,
-            filename,
-            file_metadata_provider  # Pass provider for collision detection
-        )
+        cached = await job_service.find_cached_ingestion(content_hash)
+    except Exception:
+        stored_path.unlink(missing_ok=True)
+        raise
 
-        file_id = process_result["file_id"]
-        chunks = process_result["chunks"]
-        chunk_count = process_result["chunk_count"]
+    if cached:
+        # Share the vectors first: the file is only registered once they exist
+        try:
+            await job_service.reuse_cached_ingestion(cached, file_id, user_id=user_id)
+        except Exception as e:
+            logger.warning(
+                f"Could not reuse ingestion of '{cached['source_file_id']}' for '{file_id}', "
+                f"ingesting it instead: {str(e)}"
+            )
+            cached = None
+
+    if cached:
+        try:
+            await file_metadata_provider.add_file(
+                file_id=file_id,
+                filename=filename,
+                file_type="pdf",
+                file_size=file_size,
+                user_id=user_id,
+                chunk_count=cached["chunk_count"],
+                milvus_partition=f"file_{file_id}",
+                metadata={**file_metadata, "deduplicated_from": cached["source_file_id"]},
+                content_hash=content_hash,
+                embedding_status="completed"
+            )
+        except Exception:
+            await job_service.discard_reused_ingestion(file_id)
+            stored_path.unlink(missing_ok=True)
+            raise
 
-        logger.info(
-            f"File processed: {file_id}, {chunk_count} chunks "
-            f"(strategy: {process_result['chunking_strategy']})"
-        )
+        return {
+            "file_id": file_id,
+            "job_id": None,
+            "chunk_count": cached["chunk_count"],
+            "embedding_status": "completed",
+            "chunking_strategy": chunking_strategy
+        }
 
-        # Step 2: Store file metadata in SQLite (with user ownership)
+    try:
+        # Step 4: Store file metadata in SQLite (with user ownership)
         await file_metadata_provider.add_file(
             file_id=file_id,
             filename=filename,
             file_type="pdf",
-            file_size=process_result["file_size"],
+            file_size=file_size,
             user_id=user_id,  # NEW: Associate file with user
-            chunk_count=chunk_count,
             milvus_partition=f"file_{file_id}",
-            metadata={
-                "chunking_strategy": process_result["chunking_strategy"],
-                "chunk_sizes": settings.HIERARCHICAL_CHUNK_SIZES if settings.CHUNKING_STRATEGY == "hierarchical" else None
-            }
+            metadata=file_metadata,
+            content_hash=content_hash
         )
 
-        # Step 3: Extract chunk texts and metadata for embedding
-        chunk_texts = [chunk["content"] for chunk in chunks]
-        chunk_metadata = [chunk["metadata"] for chunk in chunks]
-
-        # Step 4: Add chunks to vector store (with embeddings)
-        store_id = await retrieval_service.add_document_chunks(
+        # Step 5: Queue for background ingestion
+        job_id = await job_service.submit(
             file_id=file_id,
-            chunks=chunk_texts,
-            metadata=chunk_metadata
+            filename=filename,
+            file_path=stored_path,
+            file_size=file_size,
+            user_id=user_id
         )
 
-        logger.info(f"Embeddings generated and stored: {store_id}")
-
-        # Step 5: Update embedding status
-        await file_metadata_provider.update_embedding_status(file_id, "completed")
-
-        return {
-            "file_id": file_id,
-            "filename": filename,
-            "file_size": process_result["file_size"],
-            "chunk_count": chunk_count,
-            "embedding_status": "completed",
-            "chunking_strategy": process_result["chunking_strategy"]
-        }
-
-    except Exception as e:
-        logger.error(f"File processing failed: {str(e)}")
-        # Update status to failed if file_id exists
-        if "file_id" in locals():
-            try:
-                await file_metadata_provider.update_embedding_status(file_id, "failed")
-            except:
-                pass
+    except Exception:
+        stored_path.unlink(missing_ok=True)
         raise
 
+    return {
+        "file_id": file_id,
+        "job_id": job_id,
+        "chunk_count": 0,
+        "embedding_status": "pending",
+        "chunking_strategy": chunking_strategy
+    }
+
 
 # =============================================================================
 # API Endpoints
@@ -183,6 +239,7 @@ async def process_and_embed_file(
 @router.post(
     "",
     response_model=UploadResponse,
+    status_code=202,
     responses={
         400: {"model": ErrorResponse, "description": "Invalid file or validation error"},
         500: {"model": ErrorResponse, "description": "Server error during processing"}
@@ -191,13 +248,21 @@ async def process_and_embed_file(
     description="""
     Upload a single PDF file for processing with hierarchical chunking and embedding generation.
 
+    The request returns as soon as the file is stored and queued (202 Accepted);
+    poll `GET /api/v1/upload/{file_id}/status` until `embedding_status` is
+    `completed` or `failed`.
+
     **Workflow**:
-    1. Validate PDF file (type, size, content)
-    2. Extract text using PyPDF2
-    3. Chunk text using configured strategy (hierarchical or recursive)
-    4. Generate embeddings using HuggingFace model
-    5. Store embeddings in Milvus vector database
-    6. Save file metadata to SQLite
+    1. Stream upload to disk and validate PDF file (type, size, content)
+    2. Save file metadata to SQLite and enqueue an ingestion job
+    3. Background worker extracts text page-parallel using PyPDF2
+    4. Chunk text using configured strategy (hierarchical or recursive)
+    5. Generate embeddings in batches using HuggingFace model
+    6. Append each batch to the vector store as soon as it is embedded
+
+    Identical files (same SHA256 and chunking/embedding config) that were
+    already indexed are not re-embedded: the response is immediately
+    `completed` and the existing vectors are shared with the new file_id.
 
     **Chunking Strategy**:
     - **Hierarchical Indexing** (default): Multi-level chunks with parent-child relationships
@@ -209,32 +274,29 @@ async def process_and_embed_file(
     **Constraints**:
     - Max file size: 50MB
     - Supported format: PDF only
-    - Processing time: ~1-5 seconds per MB
+    - Processing time: ~1-5 seconds per MB (in the background)
+    - Concurrent ingestion capped by INGEST_JOB_WORKERS
     """
 )
 async def upload_pdf(
     file: UploadFile = File(..., description="PDF file to upload"),
     user_id: str = Header(..., alias="X-User-ID", description="User UUID (required)"),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
     input_service: InputDataHandleService = Depends(get_input_data_service),
     file_metadata_provider: FileMetadataProvider = Depends(get_file_metadata_provider),
-    retrieval_service: RetrievalService = Depends(get_retrieval_service),
-    embedding_provider = Depends(get_embedding_provider)
+    job_service: IngestionJobService = Depends(get_ingestion_job_service)
 ):
     """
-    Upload PDF file for processing and indexing (Multi-User Support)
+    Upload PDF file and queue it for indexing (Multi-User Support)
 
     Args:
         file: Uploaded PDF file
         user_id: User identifier (UUID v4 format, required via X-User-ID header)
-        background_tasks: FastAPI background tasks for async processing
         input_service: Input data handle service (dependency injection)
         file_metadata_provider: File metadata provider (dependency injection)
-        retrieval_service: Retrieval service (dependency injection)
-        embedding_provider: Embedding provider (dependency injection)
+        job_service: Ingestion job service (dependency injection)
 
     Returns:
-        UploadResponse with file_id, filename, chunk_count, status
+        UploadResponse with file_id, job_id and embedding_status 'pending'
 
     Raises:
         HTTPException: 400 for validation errors, 500 for processing errors
@@ -270,12 +332,25 @@ async def upload_pdf(
                 }
             )
 
-        # Read file content
-        file_content = await file.read()
+        # Stream file content to disk (never held in memory as a whole)
+        try:
+            temp_path, file_size, content_hash = await spool_upload_to_disk(
+                file, input_service.max_file_size
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "error": "ValidationError",
+                    "message": str(e),
+                    "details": {"filename": file.filename}
+                }
+            )
 
         # Validate file (uses InputDataHandleService validation)
-        is_valid, error_msg = input_service.validate_file(file_content, file.filename)
+        is_valid, error_msg = input_service.validate_upload(file.filename, file_size)
         if not is_valid:
+            temp_path.unlink(missing_ok=True)
             raise HTTPException(
                 status_code=400,
                 detail={
@@ -285,33 +360,43 @@ async def upload_pdf(
                 }
             )
 
-        # Process file and generate embeddings (with user ownership)
-        result = await process_and_embed_file(
-            file_content=file_content,
-            filename=file.filename,
-            user_id=user_id,  # NEW: Pass user_id for ownership tracking
-            input_service=input_service,
-            retrieval_service=retrieval_service,
-            file_metadata_provider=file_metadata_provider,
-            embedding_provider=embedding_provider
-        )
-
-        # Save file to disk using the already-read content
-        file_path = save_uploaded_file(file_content, file.filename, result["file_id"])
+        # Store file and queue background ingestion (with user ownership)
+        try:
+            result = await register_and_enqueue_file(
+                file_path=temp_path,
+                filename=file.filename,
+                file_size=file_size,
+                content_hash=content_hash,
+                user_id=user_id,  # NEW: Pass user_id for ownership tracking
+                input_service=input_service,
+                file_metadata_provider=file_metadata_provider,
+                job_service=job_service
+            )
+        finally:
+            temp_path.unlink(missing_ok=True)
 
-        logger.info(
-            f"File upload completed: {result['file_id']} "
-            f"({result['chunk_count']} chunks, {result['chunking_strategy']} strategy)"
-        )
+        if result["job_id"] is None:
+            logger.info(
+                f"Duplicate upload served from ingestion cache: {result['file_id']} "
+                f"({result['chunk_count']} chunks)"
+            )
+            message = "Identical file already indexed; existing chunks reused"
+        else:
+            logger.info(
+                f"File upload queued: {result['file_id']} "
+                f"(job {result['job_id']}, {result['chunking_strategy']} strategy)"
+            )
+            message = f"File uploaded and queued for indexing using {result['chunking_strategy']} chunking"
 
         # Return response
         return UploadResponse(
             file_id=result["file_id"],
-            filename=result["filename"],
-            file_size=result["file_size"],
+            filename=file.filename,
+            file_size=file_size,
             chunk_count=result["chunk_count"],
             embedding_status=result["embedding_status"],
-            message=f"File uploaded and indexed successfully using {result['chunking_strategy']} chunking"
+            job_id=result["job_id"],
+            message=message
         )
 
     except HTTPException:
@@ -326,3 +411,93 @@ async def upload_pdf(
                 "details": {}
             }
         )
+
+
+@router.get(
+    "/{file_id}/status",
+    response_model=UploadStatusResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Invalid user_id format"},
+        403: {"model": ErrorResponse, "description": "File belongs to another user"},
+        404: {"model": ErrorResponse, "description": "File not found"}
+    },
+    summary="Get ingestion status of an uploaded file",
+    description="""
+    Report the background ingestion progress of an uploaded file.
+
+    `stage` is the earliest stage still working (stages overlap while streaming);
+    `progress` holds page and chunk counters per stage.
+    """
+)
+async def get_upload_status(
+    file_id: str,
+    user_id: str = Header(..., alias="X-User-ID", description="User UUID (required)"),
+    file_metadata_provider: FileMetadataProvider = Depends(get_file_metadata_provider)
+):
+    """
+    Get ingestion status for an uploaded file (Multi-User Support)
+
+    Args:
+        file_id: File identifier returned by the upload endpoint
+        user_id: User identifier from X-User-ID header (UUID v4)
+        file_metadata_provider: File metadata provider (dependency injection)
+
+    Returns:
+        UploadStatusResponse with embedding status, job stage and progress
+
+    Raises:
+        HTTPException: 400 invalid user_id, 403 not owner, 404 not found
+
+    Example:
+        ```bash
+        curl "http://localhost:8000/api/v1/upload/file_abc123/status" \\
+          -H "X-User-ID: 550e8400-e29b-41d4-a716-446655440000"
+        ```
+    """
+    import re
+    UUID_PATTERN = r'^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$'
+    if not re.match(UUID_PATTERN, user_id, re.IGNORECASE):
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "ValidationError",
+                "message": "Invalid user_id format. Must be UUID v4.",
+                "details": {"user_id": user_id}
+            }
+        )
+
+    file_data = await file_metadata_provider.get_file(file_id)
+    if not file_data:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": "NotFound",
+                "message": f"File not found: {file_id}",
+                "details": {"file_id": file_id}
+            }
+        )
+
+    if file_data.get("user_id") != user_id:
+        raise HTTPException(
+            status_code=403,
+            detail={
+                "error": "Forbidden",
+                "message": "You can only view your own files",
+                "details": {"file_id": file_id}
+            }
+        )
+
+    job = await file_metadata_provider.get_latest_job_for_file(file_id)
+    progress = job["progress"] if job else {}
+
+    return UploadStatusResponse(
+        file_id=file_id,
+        filename=file_data["filename"],
+        embedding_status=file_data.get("embedding_status") or "pending",
+        chunk_count=file_data.get("chunk_count") or progress.get("chunks_stored", 0),
+        job_id=job["job_id"] if job else None,
+        job_status=job["status"] if job else None,
+        stage=job["stage"] if job else None,
+        progress=progress,
+        error=job["error"] if job else None
+    )
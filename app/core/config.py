@@ -51,6 +51,13 @@ class Settings(BaseSettings):
     EMBEDDING_DIMENSION: int = 384
     EMBEDDING_DEVICE: str = "cpu"  # or "cuda:0"
     EMBEDDING_NORMALIZE: bool = False
+    EMBEDDING_BATCH_TOKEN_BUDGET: int = 8192  # Padded tokens per encoder batch
+    EMBEDDING_MAX_BATCH_SIZE: int = 64  # Texts per encoder batch
+    EMBEDDING_CACHE_ENABLED: bool = True  # Local on-disk embedding cache (no Redis needed)
+    EMBEDDING_CACHE_DIR: str = "data/embedding_cache"
+    EMBEDDING_CACHE_MAX_ROWS: int = 200_000  # LRU-evicted beyond this (~300MB at 384 dims)
+    QUERY_EMBED_BATCH_WINDOW_MS: float = 5.0  # Micro-batching window for concurrent queries
+    QUERY_EMBED_MAX_BATCH: int = 32  # Flush a query batch early at this size
 
     # =============================================================================
     # Milvus Settings (Vector Database)
@@ -63,6 +70,31 @@ class Settings(BaseSettings):
     MILVUS_INDEX_TYPE: str = "IVF_FLAT"
     MILVUS_METRIC_TYPE: str = "L2"
     MILVUS_NLIST: int = 1024
+    # Full connection URI; overrides host/port (e.g. a local Milvus-lite server)
+    MILVUS_URI: Optional[str] = None
+    MILVUS_POOL_SIZE: int = 4  # Pooled connections = max concurrent Milvus requests
+    MILVUS_ACQUIRE_TIMEOUT: float = 30.0  # Seconds to wait for a free pooled connection
+    MILVUS_INSERT_BATCH_SIZE: int = 1000  # Buffered rows sent per insert call
+    MILVUS_BULK_INSERT_BATCH_SIZE: int = 10_000  # Rows per insert call during backfills
+    MILVUS_FLUSH_INTERVAL: float = 10.0  # Seconds between background flushes (0 = commit only)
+    # Collection layout for new collections: "partition_key" (user_id buckets,
+    # file_id filter) or "partition_per_file" (legacy, limited partition count)
+    MILVUS_LAYOUT: str = "partition_key"
+    MILVUS_NUM_PARTITIONS: int = 64  # user_id hash buckets (partition_key layout)
+
+    # Adaptive indexing: FLAT → HNSW → IVF_FLAT → IVF_PQ as the collection grows
+    MILVUS_INDEX_AUTO: bool = True  # False = always MILVUS_INDEX_TYPE
+    MILVUS_FLAT_MAX_ROWS: int = 100_000
+    MILVUS_HNSW_MAX_ROWS: int = 2_000_000
+    MILVUS_IVF_PQ_MIN_ROWS: int = 20_000_000
+    MILVUS_TARGET_RECALL: float = 0.95  # nprobe / ef tuned to reach this recall@TOP_K
+    MILVUS_RECALL_PROBE_SIZE: int = 100  # Stored vectors sampled as probe queries
+    MILVUS_INDEX_CHECK_INTERVAL: float = 300.0  # Seconds between row-count checks
+    # Only the process holding this lock adapts the index (one per host's workers)
+    MILVUS_INDEX_LOCK_FILE: str = "./data/milvus_index.lock"
+    # Servers allowing one index per field cannot build the new tier next to the
+    # current one; True rebuilds it with the collection released (search downtime)
+    MILVUS_INDEX_OFFLINE_REBUILD: bool = False
 
     # =============================================================================
     # MongoDB Settings (Chat History)
@@ -98,11 +130,45 @@ class Settings(BaseSettings):
     MAX_FILE_SIZE: int = 50_000_000  # 50MB
     ALLOWED_EXTENSIONS: List[str] = Field(default_factory=lambda: ["pdf"])  # PDF only for now
 
+    # =============================================================================
+    # PDF Extraction Settings
+    # =============================================================================
+    PDF_PARALLEL_EXTRACTION: bool = True  # Fan page ranges out to a process pool
+    PDF_EXTRACTION_WORKERS: int = 4  # Extraction process pool size (0 = os.cpu_count())
+    PDF_PAGES_PER_TASK: int = 16  # Pages extracted per worker task
+    PDF_PARALLEL_MIN_PAGES: int = 32  # Below this page count, extract serially
+
+    # =============================================================================
+    # Streaming Ingestion Settings
+    # =============================================================================
+    UPLOAD_READ_CHUNK_SIZE: int = 1_048_576  # Bytes read per upload chunk (1MB)
+    INGEST_CHUNK_WINDOW_CHARS: int = 20_000  # Text window chunked at a time
+    INGEST_EMBED_BATCH_SIZE: int = 64  # Chunks per embedding/vector store batch
+    INGEST_QUEUE_MAXSIZE: int = 4  # Bounded queue size between pipeline stages
+
+    # Ingestion executors (CPU-bound work is kept off the event loop)
+    INGEST_EXTRACTION_THREADS: int = 2  # Page counting, small-PDF extraction
+    INGEST_CHUNKING_EXECUTOR: str = "thread"  # "thread" or "process"
+    INGEST_CHUNKING_WORKERS: int = 2
+    INGEST_EMBEDDING_THREADS: int = 1  # Encoder calls and vector store writes
+
+    # Background ingestion job queue
+    INGEST_JOB_WORKERS: int = 2  # Max files ingested concurrently
+    INGEST_JOB_POLL_INTERVAL: float = 5.0  # Seconds between idle queue polls
+    INGEST_JOB_LEASE_SECONDS: float = 60.0  # Running jobs are requeued once their worker stops renewing
+
+    # Background re-index of files indexed under another chunking/embedding config
+    REINDEX_ENABLED: bool = True
+    REINDEX_INTERVAL: float = 30.0  # Seconds between re-indexed files (throttle)
+    REINDEX_POLL_INTERVAL: float = 300.0  # Seconds between stale-file scans when idle
+    # Only the process holding this lock re-indexes (one per host's workers)
+    REINDEX_LOCK_FILE: str = "./data/reindex.lock"
+
     # =============================================================================
     # Text Chunking Settings
     # =============================================================================
     # Default chunking strategy
-    CHUNKING_STRATEGY: str = "hierarchical"  # "hierarchical" or "recursive"
+    CHUNKING_STRATEGY: str = "hierarchical"  # "hierarchical", "recursive", "token" or "semantic"
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
     CHUNK_SEPARATORS: List[str] = Field(default_factory=lambda: ["\n\n", "\n", " ", ""])
@@ -110,7 +176,24 @@ class Settings(BaseSettings):
     # Hierarchical Indexing Settings (Multi-level chunking)
     HIERARCHICAL_CHUNK_SIZES: List[int] = Field(default_factory=lambda: [2000, 1000, 500])  # Parent, Child, Grandchild
     HIERARCHICAL_OVERLAP: int = 100
-    ENABLE_MULTIVECTOR_RETRIEVAL: bool = True  # Use MultiVectorRetriever
+    ENABLE_MULTIVECTOR_RETRIEVAL: bool = True  # Index leaf chunks only, return their parents as context
+
+    # Token-budgeted chunking (CHUNKING_STRATEGY="token"), measured with the
+    # embedding model's tokenizer so no chunk is truncated by the encoder
+    TOKEN_CHUNK_SIZE: Optional[int] = None  # Tokens per chunk (None = encoder window)
+    TOKEN_CHUNK_OVERLAP: int = 32
+
+    # Semantic chunking (CHUNKING_STRATEGY="semantic"): cut where adjacent
+    # sentences' embeddings diverge, within min/max chunk sizes (characters)
+    SEMANTIC_BREAKPOINT_PERCENTILE: float = 90.0
+    SEMANTIC_MIN_CHUNK_SIZE: int = 200
+    SEMANTIC_MAX_CHUNK_SIZE: int = 1000
+
+    # Ingest-time duplicate suppression (exact hash + SimHash): duplicates are
+    # stored as references to an indexed chunk instead of being embedded
+    CHUNK_DEDUP_ENABLED: bool = True
+    CHUNK_DEDUP_SCOPE: str = "user"  # "user" (owner's files) or "file"
+    CHUNK_DEDUP_MAX_DISTANCE: int = 0  # SimHash bits (max 3); 0 = exact duplicates only
 
     # =============================================================================
     # Query Enhancement Settings (Strategy 2: Question Expansion)
@@ -148,16 +231,22 @@ class Settings(BaseSettings):
     # =============================================================================
     # Vector Store Backend Selection
     # =============================================================================
-    VECTOR_STORE_BACKEND: str = "milvus"  # "milvus" or "faiss"
-    VECTOR_STORE_PATH: str = "./data/vector_store"  # For FAISS fallback
+    # "faiss" (per-process) or "milvus" (shared by every uvicorn worker)
+    VECTOR_STORE_BACKEND: str = "faiss"
+    VECTOR_STORE_PATH: str = "./data/vector_store"  # FAISS / Chroma storage
+    VECTOR_STORE_PERSIST: bool = True  # Save per-file FAISS stores, lazy-load after restart
+    VECTOR_STORE_MEMORY_BUDGET_MB: int = 1024  # Resident FAISS stores, LRU-evicted (0 = unlimited)
+    # FAISS layout: "per_file" (one store per file) or "global" (one shared
+    # index, multi-file queries become a single allow-list filtered search)
+    FAISS_INDEX_LAYOUT: str = "per_file"
 
     # =============================================================================
     # Computed Properties
     # =============================================================================
     @property
     def milvus_uri(self) -> str:
-        """Construct Milvus connection URI"""
-        return f"http://{self.MILVUS_HOST}:{self.MILVUS_PORT}"
+        """Milvus connection URI (MILVUS_URI, or built from host and port)"""
+        return self.MILVUS_URI or f"http://{self.MILVUS_HOST}:{self.MILVUS_PORT}"
 
     @property
     def mongodb_url(self) -> str:
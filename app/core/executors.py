@@ -0,0 +1,194 @@
+"""
+Ingestion Executors
+
+Dedicated worker pools that keep CPU-bound ingestion work off the asyncio
+event loop, so SSE chat streams keep flowing while uploads are processed.
+
+Pools (all created lazily, sized from settings):
+- extraction processes: page-parallel PDF parsing (PyPDF2 is pure Python)
+- extraction threads: page counting and small-document extraction
+- chunking: LangChain text splitting (thread or process pool)
+- embedding: encoder calls and vector store writes (torch releases the GIL)
+
+Each stage has its own pool so a burst of uploads saturating one stage
+cannot starve the others, and none of them compete with the loop's default
+executor.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionExecutors:
+    """
+    Registry of per-stage executors for the ingestion path
+
+    Usage:
+        >>> executors = get_ingestion_executors()
+        >>> text = await executors.run_extraction(parse_fn, path)
+        >>> chunks = await executors.run_chunking(chunk_fn, text)
+        >>> vectors = await executors.run_embedding(embed_fn, texts)
+    """
+
+    def __init__(self):
+        """Initialize executor registry (pools are created on first use)"""
+        self._extraction_processes: Optional[ProcessPoolExecutor] = None
+        self._extraction_threads: Optional[ThreadPoolExecutor] = None
+        self._chunking: Optional[Executor] = None
+        self._embedding: Optional[ThreadPoolExecutor] = None
+
+    # =========================================================================
+    # Pool Accessors
+    # =========================================================================
+
+    @property
+    def extraction_process_count(self) -> int:
+        """Configured extraction process count (0 means one per CPU)"""
+        return settings.PDF_EXTRACTION_WORKERS or os.cpu_count() or 1
+
+    @property
+    def extraction_processes(self) -> ProcessPoolExecutor:
+        """
+        Process pool for page-parallel PDF extraction
+
+        Uses the "spawn" start method so workers never inherit the parent's
+        threads (uvicorn loop, torch intra-op pools) in a half-initialized state.
+        """
+        if self._extraction_processes is None:
+            self._extraction_processes = ProcessPoolExecutor(
+                max_workers=self.extraction_process_count,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(
+                f"Extraction process pool started: workers={self.extraction_process_count}"
+            )
+
+        return self._extraction_processes
+
+    @property
+    def extraction_threads(self) -> ThreadPoolExecutor:
+        """Thread pool for lightweight extraction work (page counting, small PDFs)"""
+        if self._extraction_threads is None:
+            self._extraction_threads = ThreadPoolExecutor(
+                max_workers=settings.INGEST_EXTRACTION_THREADS,
+                thread_name_prefix="ingest-extract"
+            )
+
+        return self._extraction_threads
+
+    @property
+    def chunking(self) -> Executor:
+        """Thread or process pool for text chunking (INGEST_CHUNKING_EXECUTOR)"""
+        if self._chunking is None:
+            if settings.INGEST_CHUNKING_EXECUTOR == "process":
+                self._chunking = ProcessPoolExecutor(
+                    max_workers=settings.INGEST_CHUNKING_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._chunking = ThreadPoolExecutor(
+                    max_workers=settings.INGEST_CHUNKING_WORKERS,
+                    thread_name_prefix="ingest-chunk"
+                )
+            logger.info(
+                f"Chunking pool started: executor={settings.INGEST_CHUNKING_EXECUTOR}, "
+                f"workers={settings.INGEST_CHUNKING_WORKERS}"
+            )
+
+        return self._chunking
+
+    @property
+    def chunking_uses_processes(self) -> bool:
+        """Whether chunking work must be picklable (process pool)"""
+        return settings.INGEST_CHUNKING_EXECUTOR == "process"
+
+    @property
+    def embedding(self) -> ThreadPoolExecutor:
+        """
+        Thread pool for embedding and vector store writes
+
+        Threads rather than processes: the model is loaded once and shared,
+        and torch releases the GIL during inference.
+        """
+        if self._embedding is None:
+            self._embedding = ThreadPoolExecutor(
+                max_workers=settings.INGEST_EMBEDDING_THREADS,
+                thread_name_prefix="ingest-embed"
+            )
+            logger.info(f"Embedding pool started: threads={settings.INGEST_EMBEDDING_THREADS}")
+
+        return self._embedding
+
+    # =========================================================================
+    # Async Helpers
+    # =========================================================================
+
+    @staticmethod
+    async def _run(executor: Executor, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) in executor and await the result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(fn, *args, **kwargs))
+
+    async def run_extraction(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run lightweight extraction work on the extraction thread pool"""
+        return await self._run(self.extraction_threads, fn, *args, **kwargs)
+
+    async def run_chunking(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run chunking work on the chunking pool (fn must be picklable in process mode)"""
+        return await self._run(self.chunking, fn, *args, **kwargs)
+
+    async def run_embedding(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run embedding or vector store work on the embedding thread pool"""
+        return await self._run(self.embedding, fn, *args, **kwargs)
+
+    def shutdown(self):
+        """Shut down all pools (call on application shutdown)"""
+        for pool in (
+            self._extraction_processes,
+            self._extraction_threads,
+            self._chunking,
+            self._embedding
+        ):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        self._extraction_processes = None
+        self._extraction_threads = None
+        self._chunking = None
+        self._embedding = None
+        logger.info("Ingestion executors shut down")
+
+
+# Singleton instance for dependency injection
+_ingestion_executors_instance: Optional[IngestionExecutors] = None
+
+
+def get_ingestion_executors() -> IngestionExecutors:
+    """
+    Get the shared ingestion executors (Singleton)
+
+    Usage:
+        >>> executors = get_ingestion_executors()
+        >>> result = await executors.run_embedding(provider.embed_documents, texts)
+    """
+    global _ingestion_executors_instance
+
+    if _ingestion_executors_instance is None:
+        _ingestion_executors_instance = IngestionExecutors()
+
+    return _ingestion_executors_instance
+
+
+def shutdown_ingestion_executors():
+    """Shut down the shared ingestion executors if they were started"""
+    if _ingestion_executors_instance is not None:
+        _ingestion_executors_instance.shutdown()
@@ -21,7 +21,8 @@ class UploadResponse(BaseModel):
     filename: str = Field(..., description="Original filename")
     file_size: int = Field(..., description="File size in bytes")
     chunk_count: int = Field(..., description="Number of text chunks generated")
-    embedding_status: str = Field(..., description="Status: 'pending', 'completed', 'failed'")
+    embedding_status: str = Field(..., description="Status: 'pending', 'processing', 'completed', 'failed'")
+    job_id: Optional[str] = Field(None, description="Background ingestion job identifier")
     message: str = Field(default="File uploaded and indexed successfully")
 
     class Config:
@@ -30,9 +31,48 @@ class UploadResponse(BaseModel):
                 "file_id": "file_abc123def456",
                 "filename": "document.pdf",
                 "file_size": 1024000,
-                "chunk_count": 150,
-                "embedding_status": "completed",
-                "message": "File uploaded and indexed successfully"
+                "chunk_count": 0,
+                "embedding_status": "pending",
+                "job_id": "job_9f1c2e7a4b6d4e0f8a3b5c7d9e1f2a4b",
+                "message": "File uploaded and queued for indexing"
+            }
+        }
+
+
+class UploadStatusResponse(BaseModel):
+    """Response model for upload ingestion status"""
+    file_id: str = Field(..., description="File identifier")
+    filename: str = Field(..., description="Original filename")
+    embedding_status: str = Field(..., description="Status: 'pending', 'processing', 'completed', 'failed'")
+    chunk_count: int = Field(default=0, description="Number of chunks stored so far")
+    job_id: Optional[str] = Field(None, description="Latest ingestion job identifier")
+    job_status: Optional[str] = Field(None, description="Job status: 'queued', 'running', 'completed', 'failed'")
+    stage: Optional[str] = Field(
+        None,
+        description="Current stage: 'queued', 'extracting', 'chunking', 'embedding', 'storing', 'completed', 'failed'"
+    )
+    progress: Dict[str, Any] = Field(default_factory=dict, description="Per-stage progress counters")
+    error: Optional[str] = Field(None, description="Error message if ingestion failed")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "file_id": "file_abc123def456",
+                "filename": "document.pdf",
+                "embedding_status": "processing",
+                "chunk_count": 128,
+                "job_id": "job_9f1c2e7a4b6d4e0f8a3b5c7d9e1f2a4b",
+                "job_status": "running",
+                "stage": "embedding",
+                "progress": {
+                    "pages_total": 40,
+                    "pages_extracted": 40,
+                    "chunks_created": 210,
+                    "chunks_embedded": 192,
+                    "chunks_stored": 128,
+                    "batches_stored": 2
+                },
+                "error": None
             }
         }
 
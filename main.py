@@ -10,6 +10,7 @@ FastAPI application factory with:
 - Startup/Shutdown lifecycle management
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -86,6 +87,14 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"⚠️  Milvus health check failed: {str(e)}")
         logger.info("ℹ️  Application will continue, but vector search features may be limited")
+
+    # Start background ingestion workers
+    try:
+        from app.Services.ingestion_job_service import get_ingestion_job_service
+        await get_ingestion_job_service().start()
+    except Exception as e:
+        logger.error(f"Failed to start ingestion workers: {str(e)}")
+
     logger.info(" Application startup complete")
 
     yield  # Application runs here
@@ -102,6 +111,28 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"� MongoDB cleanup warning: {str(e)}")
 
+    # Stop ingestion workers before their executor pools
+    try:
+        from app.Services.ingestion_job_service import get_ingestion_job_service
+        await get_ingestion_job_service().stop()
+    except Exception as e:
+        logger.warning(f"Ingestion worker cleanup warning: {str(e)}")
+
+    # Stop ingestion worker pools
+    try:
+        from app.core.executors import shutdown_ingestion_executors
+        shutdown_ingestion_executors()
+    except Exception as e:
+        logger.warning(f"Ingestion executor cleanup warning: {str(e)}")
+
+    # Close pooled Milvus connections
+    try:
+        from app.Providers.vector_store_provider import milvus_client
+        if milvus_client._milvus_client_instance:
+            milvus_client._milvus_client_instance.disconnect()
+    except Exception as e:
+        logger.warning(f"Milvus cleanup warning: {str(e)}")
+
     logger.info(" Application shutdown complete")
 
 
@@ -227,10 +258,18 @@ def create_application() -> FastAPI:
         Returns:
             System health status
         """
+        from app.Providers.vector_store_provider.client import get_vector_store_provider
+
+        # Provider creation connects to Milvus: keep it off the event loop
+        residency = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: get_vector_store_provider().get_residency_stats()
+        )
+
         return JSONResponse(content={
             "status": "healthy",
             "app_name": settings.APP_NAME,
-            "version": settings.APP_VERSION
+            "version": settings.APP_VERSION,
+            "vector_store": residency
         })
 
     return app
@@ -125,6 +125,12 @@ class DocAIClient {
             }
 
             const result = await response.json();
+            console.log('File uploaded, waiting for indexing', result);
+
+            // Indexing runs in the background: poll until it finishes
+            const status = await this.waitForIngestion(result.file_id);
+            result.chunk_count = status.chunk_count;
+            result.embedding_status = status.embedding_status;
 
             // Store uploaded file info
             this.uploadedFiles.set(result.file_id, {
@@ -133,7 +139,7 @@ class DocAIClient {
                 chunkCount: result.chunk_count
             });
 
-            console.log('File uploaded successfully', result);
+            console.log('File indexed successfully', result);
             return result;
 
         } catch (error) {
@@ -142,6 +148,40 @@ class DocAIClient {
         }
     }
 
+    /**
+     * Poll ingestion status until the file is indexed
+     * @param {string} fileId - File ID returned by uploadFile
+     * @param {number} intervalMs - Delay between polls
+     * @returns {Promise<Object>} - Final status response
+     */
+    async waitForIngestion(fileId, intervalMs = 1000) {
+        while (true) {
+            const response = await fetch(`/api/v1/upload/${fileId}/status`, {
+                headers: {
+                    'X-User-ID': this.userId
+                }
+            });
+
+            if (!response.ok) {
+                const error = await response.json();
+                const errorMsg = error.detail?.message || error.detail || 'Status check failed';
+                throw new Error(errorMsg);
+            }
+
+            const status = await response.json();
+            console.log('[DocAI] Ingestion status:', status.stage, status.progress);
+
+            if (status.embedding_status === 'completed') {
+                return status;
+            }
+            if (status.embedding_status === 'failed') {
+                throw new Error(status.error || 'Indexing failed');
+            }
+
+            await new Promise(resolve => setTimeout(resolve, intervalMs));
+        }
+    }
+
     /**
      * Add file to UI with upload status
      * @param {string} filename - File name
@@ -0,0 +1,76 @@
+"""
+Shared test fixtures
+
+Tests run from the repository root (python -m pytest). Modules whose
+dependencies are not installed are skipped with pytest.importorskip.
+
+FakeCollection stands in for a pymilvus Collection so MilvusClient's
+buffering, commit and copy logic runs without a Milvus server.
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+MILVUS_FIELDS = ["user_id", "file_id", "chunk_index", "content", "embedding", "timestamp", "metadata"]
+
+
+class FakeCollection:
+    """In-memory stand-in for a partition_key Milvus collection"""
+
+    def __init__(self):
+        self.rows: List[Dict[str, Any]] = []
+        self.insert_calls = 0
+        self.flushes = 0
+        # file_ids whose insert raises (simulated server errors)
+        self.failing_files: set = set()
+
+    def insert(self, data: List[Any], partition_name: Optional[str] = None):
+        columns = dict(zip(MILVUS_FIELDS, data))
+        if self.failing_files & set(columns["file_id"]):
+            raise RuntimeError("insert refused")
+
+        self.insert_calls += 1
+        for values in zip(*(columns[name] for name in MILVUS_FIELDS)):
+            self.rows.append(dict(zip(MILVUS_FIELDS, values)))
+
+    def flush(self):
+        self.flushes += 1
+
+    def query(self, expr: str, output_fields: List[str], limit: Optional[int] = None, **kwargs):
+        matches = [row for row in self.rows if json.dumps(row["file_id"]) in expr]
+        return matches[:limit] if limit else matches
+
+    def delete(self, expr: str):
+        self.rows = [row for row in self.rows if json.dumps(row["file_id"]) not in expr]
+
+    def file_rows(self, file_id: str) -> List[Dict[str, Any]]:
+        return [row for row in self.rows if row["file_id"] == file_id]
+
+
+@pytest.fixture
+def fake_collection() -> FakeCollection:
+    return FakeCollection()
+
+
+@pytest.fixture
+def milvus_client(fake_collection):
+    """MilvusClient bound to a FakeCollection (partition_key layout, no server)"""
+    pytest.importorskip("numpy")
+    pytest.importorskip("pymilvus")
+    pytest.importorskip("pydantic_settings")
+    from app.Providers.vector_store_provider.milvus_client import MilvusClient
+
+    client = MilvusClient(dimension=4, pool_size=1, layout="partition_key")
+    client.insert_batch_size = 2
+    client._insert_fields = list(MILVUS_FIELDS)
+    client._has_metadata_field = True
+    client._collections["fake"] = fake_collection
+    client._pool.put("fake")
+    client._connected = True
+    return client
@@ -0,0 +1,156 @@
+"""
+Duplicate-chunk promotion tests: RetrievalService.delete_document and
+promote_chunk_references against in-memory fakes
+"""
+
+import asyncio
+import json
+
+import pytest
+
+for module in ("numpy", "fastapi", "langchain", "PyPDF2", "aiosqlite", "pydantic_settings"):
+    pytest.importorskip(module)
+
+from app.Services import retrieval_service as retrieval_module  # noqa: E402
+from app.Services.ingestion_job_service import IngestionJobService  # noqa: E402
+from app.Services.retrieval_service import RetrievalService  # noqa: E402
+
+
+class FakeMetadataProvider:
+    """Reference, manifest and file records kept in dicts"""
+
+    def __init__(self, references, manifests=None, files=None):
+        self.references = references
+        self.manifests = manifests or {}
+        self.files = files or {}
+        self.signatures = []
+        self.deleted_chunks = []
+
+    async def get_references_to(self, canonical_file_id):
+        return [r for r in self.references if r["canonical_file_id"] == canonical_file_id]
+
+    async def get_index_manifest(self, file_id):
+        fingerprint = self.manifests.get(file_id)
+        return {"config_fingerprint": fingerprint} if fingerprint else None
+
+    async def get_file(self, file_id):
+        return self.files.get(file_id)
+
+    async def add_chunk_signatures(self, rows):
+        self.signatures.extend(rows)
+
+    async def delete_file_chunks(self, file_id):
+        self.deleted_chunks.append(file_id)
+
+    async def delete_chunk_dedup(self, file_id):
+        pass
+
+
+class FakeVectorStore:
+    def __init__(self):
+        self.deleted = []
+
+    def delete_store(self, store_id):
+        self.deleted.append(store_id)
+
+
+class FakeEmbedding:
+    def embed_documents(self, texts):
+        return [[1.0, 0.0, 0.0, 0.0] for _ in texts]
+
+
+class InlineExecutors:
+    async def run_embedding(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+def _reference(file_id, chunk_index=0, canonical="file_a"):
+    return {
+        "file_id": file_id,
+        "chunk_index": chunk_index,
+        "user_id": "alice",
+        "canonical_file_id": canonical,
+        "canonical_chunk_index": 7,
+        "chunk_text": f"boilerplate of {file_id}",
+        "metadata_json": json.dumps({"page": 1, "chunk_index": chunk_index})
+    }
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(retrieval_module, "get_ingestion_executors", lambda: InlineExecutors())
+    monkeypatch.setattr(IngestionJobService, "config_fingerprint", classmethod(lambda cls: "current"))
+
+    service = RetrievalService(embedding_provider=FakeEmbedding(), vector_store_provider=FakeVectorStore())
+    service.promoted = {}
+
+    async def add_embedded_chunks(file_id, chunks, embeddings, metadata, store_id=None):
+        service.promoted.setdefault(file_id, []).extend(chunks)
+        return file_id
+
+    async def persist_document(file_id):
+        pass
+
+    monkeypatch.setattr(service, "add_embedded_chunks", add_embedded_chunks)
+    monkeypatch.setattr(service, "persist_document", persist_document)
+    return service
+
+
+def _use_metadata(monkeypatch, provider):
+    async def get_provider():
+        return provider
+
+    monkeypatch.setattr(retrieval_module, "get_file_metadata_provider", get_provider)
+
+
+def test_delete_promotes_references_before_deleting(service, monkeypatch):
+    metadata = FakeMetadataProvider([_reference("file_b")], manifests={"file_b": "current"})
+    _use_metadata(monkeypatch, metadata)
+
+    asyncio.run(service.delete_document("file_a"))
+
+    assert service.promoted == {"file_b": ["boilerplate of file_b"]}
+    # The promoted chunk is canonical for later duplicate detection
+    assert [(row["file_id"], row["chunk_index"]) for row in metadata.signatures] == [("file_b", 0)]
+    assert service.vector_store_provider.deleted == ["file_a"]
+    assert metadata.deleted_chunks == ["file_a"]
+
+
+def test_delete_is_aborted_when_promotion_fails(service, monkeypatch):
+    metadata = FakeMetadataProvider([_reference("file_b")], manifests={"file_b": "current"})
+    _use_metadata(monkeypatch, metadata)
+
+    async def failing_promotion(file_id):
+        raise RuntimeError("embedding failed")
+
+    monkeypatch.setattr(service, "promote_chunk_references", failing_promotion)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.delete_document("file_a"))
+
+    # The canonical vectors stay for file_b's references
+    assert service.vector_store_provider.deleted == []
+    assert metadata.deleted_chunks == []
+
+
+def test_promotion_skips_stores_built_under_another_config(service, monkeypatch):
+    metadata = FakeMetadataProvider(
+        [
+            _reference("stale"),
+            _reference("current"),
+            _reference("legacy"),
+            _reference("file_x__reindex")
+        ],
+        manifests={"stale": "old", "current": "current"},
+        files={
+            "stale": {"embedding_status": "completed"},
+            "current": {"embedding_status": "completed"},
+            "legacy": {"embedding_status": "completed"}
+        }
+    )
+    _use_metadata(monkeypatch, metadata)
+
+    promoted = asyncio.run(service.promote_chunk_references("file_a"))
+
+    assert promoted == 2
+    assert set(service.promoted) == {"current", "file_x__reindex"}
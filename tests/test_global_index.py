@@ -0,0 +1,106 @@
+"""
+GlobalFaissIndex share / replace relabelling and persistence tests
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("faiss")
+
+from app.Providers.vector_store_provider.global_index import GlobalFaissIndex  # noqa: E402
+
+
+def _add(index, file_id, count, user_id="alice", offset=0.0):
+    vectors = [[offset + i, 0.0, 0.0, 0.0] for i in range(count)]
+    index.add(
+        file_id,
+        [f"{file_id}-{i}" for i in range(count)],
+        vectors,
+        [{"file_id": file_id, "user_id": user_id, "chunk_index": i} for i in range(count)]
+    )
+
+
+def _search(index, file_ids, k=10):
+    return index.search([0.0, 0.0, 0.0, 0.0], file_ids, k=k)
+
+
+def test_share_copies_vectors_with_target_metadata():
+    index = GlobalFaissIndex()
+    _add(index, "source", 2)
+
+    index.share("source", "copy", user_id="bob")
+
+    hits = _search(index, ["copy"])
+    assert len(hits) == 2
+    assert {hit["metadata"]["file_id"] for hit in hits} == {"copy"}
+    assert {hit["metadata"]["user_id"] for hit in hits} == {"bob"}
+    assert {hit["metadata"]["file_id"] for hit in _search(index, ["source"])} == {"source"}
+
+
+def test_adding_to_a_shared_file_leaves_the_source_alone():
+    index = GlobalFaissIndex()
+    _add(index, "source", 2)
+    index.share("source", "copy", user_id="bob")
+
+    _add(index, "copy", 1, user_id="bob", offset=10.0)
+
+    assert len(_search(index, ["source"])) == 2
+    assert len(_search(index, ["copy"])) == 3
+
+
+def test_removing_the_source_keeps_the_copy():
+    index = GlobalFaissIndex()
+    _add(index, "source", 2)
+    index.share("source", "copy", user_id="bob")
+
+    index.remove("source")
+
+    assert not index.has_file("source")
+    assert len(_search(index, ["copy"])) == 2
+
+
+def test_replace_relabels_and_drops_the_staging_id():
+    index = GlobalFaissIndex()
+    _add(index, "file", 1)
+    _add(index, "file__reindex", 3, offset=5.0)
+
+    index.replace("file__reindex", "file", user_id="alice")
+
+    assert not index.has_file("file__reindex")
+    hits = _search(index, ["file"])
+    assert len(hits) == 3
+    assert {hit["metadata"]["file_id"] for hit in hits} == {"file"}
+    assert index.get_stats()["vectors"] == 3
+
+
+def test_search_chunks_is_restricted_to_the_listed_chunks():
+    index = GlobalFaissIndex()
+    _add(index, "file", 50)
+
+    # Chunk 40 ranks far below the top k of the whole file
+    (hits,) = index.search_chunks(np.zeros((1, 4), dtype=np.float32), {"file": [40]}, k=5)
+
+    assert [hit["metadata"]["chunk_index"] for hit in hits] == [40]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = GlobalFaissIndex()
+    _add(index, "source", 2)
+    index.share("source", "copy", user_id="bob")
+    index.save(tmp_path / "faiss_global")
+
+    loaded = GlobalFaissIndex.load(tmp_path / "faiss_global")
+
+    assert sorted(loaded.list_files()) == ["copy", "source"]
+    assert {hit["metadata"]["user_id"] for hit in _search(loaded, ["copy"])} == {"bob"}
+
+    # New ids continue after the saved ones
+    _add(loaded, "other", 1)
+    assert loaded.get_stats()["vectors"] == 5
+
+
+def test_load_without_saved_index_is_empty(tmp_path):
+    loaded = GlobalFaissIndex.load(tmp_path / "missing")
+
+    assert loaded.list_files() == []
+    assert loaded.get_stats()["vectors"] == 0
@@ -0,0 +1,88 @@
+"""
+Ingestion job queue tests: atomic claim, leases and requeue
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("pydantic_settings")
+
+from app.Providers.file_metadata_provider.client import FileMetadataProvider  # noqa: E402
+
+
+@pytest.fixture
+def provider(tmp_path):
+    provider = FileMetadataProvider(db_path=str(tmp_path / "jobs.db"))
+    yield provider
+    if provider._connection is not None:
+        asyncio.run(provider._connection.close())
+
+
+async def _enqueue(provider, job_id="job_1", file_id="file_1"):
+    await provider.initialize_database()
+    await provider.add_file(file_id=file_id, filename="doc.pdf", file_type="pdf", file_size=10)
+    await provider.enqueue_job(job_id, file_id, "doc.pdf", f"/tmp/{file_id}.pdf", 10)
+
+
+def test_a_job_is_claimed_once(provider):
+    async def scenario():
+        await _enqueue(provider)
+        first = await provider.claim_next_job("worker_a", lease_seconds=60)
+        second = await provider.claim_next_job("worker_b", lease_seconds=60)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first["job_id"] == "job_1"
+    assert first["status"] == "running"
+    assert first["worker_id"] == "worker_a"
+    assert second is None
+
+
+def test_requeue_leaves_jobs_with_a_live_lease(provider):
+    async def scenario():
+        await _enqueue(provider)
+        await provider.claim_next_job("worker_a", lease_seconds=60)
+        requeued = await provider.requeue_interrupted_jobs()
+        return requeued, await provider.get_job("job_1")
+
+    requeued, job = asyncio.run(scenario())
+
+    assert requeued == 0
+    assert job["status"] == "running"
+
+
+def test_requeue_picks_up_expired_leases(provider):
+    async def scenario():
+        await _enqueue(provider)
+        await provider.claim_next_job("worker_a", lease_seconds=-1)
+        requeued = await provider.requeue_interrupted_jobs()
+        job = await provider.get_job("job_1")
+        reclaimed = await provider.claim_next_job("worker_b", lease_seconds=60)
+        return requeued, job, reclaimed
+
+    requeued, job, reclaimed = asyncio.run(scenario())
+
+    assert requeued == 1
+    assert job["status"] == "queued"
+    assert job["worker_id"] is None
+    assert reclaimed["worker_id"] == "worker_b"
+    assert reclaimed["attempts"] == 2
+
+
+def test_only_the_lease_holder_renews(provider):
+    async def scenario():
+        await _enqueue(provider)
+        await provider.claim_next_job("worker_a", lease_seconds=-1)
+        stolen = await provider.renew_job_lease("job_1", "worker_b", 60)
+        renewed = await provider.renew_job_lease("job_1", "worker_a", 60)
+        requeued = await provider.requeue_interrupted_jobs()
+        return stolen, renewed, requeued
+
+    stolen, renewed, requeued = asyncio.run(scenario())
+
+    assert stolen is False
+    assert renewed is True
+    assert requeued == 0
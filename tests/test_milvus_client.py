@@ -0,0 +1,100 @@
+"""
+MilvusClient buffering, commit and copy tests (against FakeCollection)
+"""
+
+import pytest
+
+
+def _vectors(count):
+    return [[float(i), 0.0, 0.0, 1.0] for i in range(count)]
+
+
+def test_rows_are_buffered_until_batch_size(milvus_client, fake_collection):
+    milvus_client.insert_vectors("file_a", ["one"], _vectors(1))
+
+    assert fake_collection.insert_calls == 0
+    assert milvus_client.has_file("file_a")
+
+    milvus_client.insert_vectors("file_a", ["two"], _vectors(1))
+
+    # Batch size (2) reached: sent, but not flushed
+    assert len(fake_collection.file_rows("file_a")) == 2
+    assert fake_collection.flushes == 0
+
+
+def test_commit_sends_and_flushes(milvus_client, fake_collection):
+    milvus_client.insert_vectors("file_a", ["one"], _vectors(1))
+    milvus_client.commit()
+
+    assert len(fake_collection.file_rows("file_a")) == 1
+    assert fake_collection.flushes == 1
+
+    # Nothing new: no second flush
+    milvus_client.commit()
+    assert fake_collection.flushes == 1
+
+
+def test_failed_send_keeps_every_unsent_row(milvus_client, fake_collection):
+    milvus_client.insert_batch_size = 10
+    milvus_client.insert_vectors("file_a", ["a1", "a2"], _vectors(2))
+    milvus_client.insert_vectors("file_b", ["b1"], _vectors(1))
+    milvus_client.insert_vectors("file_c", ["c1"], _vectors(1))
+
+    fake_collection.failing_files = {"file_b"}
+    with pytest.raises(RuntimeError):
+        milvus_client.commit()
+
+    # file_a was sent; file_b and the file after it are kept for a retry
+    assert len(fake_collection.file_rows("file_a")) == 2
+    assert set(milvus_client._buffer) == {"file_b", "file_c"}
+    assert milvus_client._buffered_rows == 2
+
+    fake_collection.failing_files = set()
+    milvus_client.commit()
+
+    assert [row["content"] for row in fake_collection.file_rows("file_b")] == ["b1"]
+    assert [row["content"] for row in fake_collection.file_rows("file_c")] == ["c1"]
+    assert milvus_client._buffered_rows == 0
+
+
+def test_share_copies_rows_owned_by_target(milvus_client, fake_collection, monkeypatch):
+    milvus_client.insert_vectors(
+        "source", ["chunk"], _vectors(1),
+        metadatas=[{"file_id": "source", "user_id": "alice", "page": 3}]
+    )
+    milvus_client.commit()
+
+    # query_iterator is not faked: serve the stored rows directly
+    monkeypatch.setattr(
+        milvus_client, "iter_file_rows",
+        lambda file_id, **kwargs: iter([fake_collection.file_rows(file_id)])
+    )
+
+    milvus_client.share("source", "copy", user_id="bob")
+
+    (copied,) = fake_collection.file_rows("copy")
+    assert copied["user_id"] == "bob"
+    assert copied["metadata"] == {"file_id": "copy", "user_id": "bob", "page": 3}
+    # The source is untouched
+    assert fake_collection.file_rows("source")[0]["metadata"]["user_id"] == "alice"
+
+
+def test_owned_metadata_drops_owner_of_anonymous_copy():
+    pytest.importorskip("pymilvus")
+    from app.Providers.vector_store_provider.milvus_client import MilvusClient
+
+    metadata = MilvusClient._owned_metadata({"file_id": "a", "user_id": "alice"}, "b", None)
+
+    assert metadata == {"file_id": "b"}
+
+
+def test_chunk_filter_selects_chunks_per_file():
+    pytest.importorskip("pymilvus")
+    from app.Providers.vector_store_provider.milvus_client import MilvusClient
+
+    expr = MilvusClient.chunk_filter({"a": [3, 1, 3], "b": [0]})
+
+    assert expr == (
+        '(file_id == "a" and chunk_index in [1, 3]) or '
+        '(file_id == "b" and chunk_index in [0])'
+    )